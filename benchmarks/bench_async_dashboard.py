@@ -0,0 +1,138 @@
+# benchmarks/bench_async_dashboard.py
+"""
+Dashboard latency: what the frontend fetches today over WSGI (the
+summary, by-category and the first page of transactions, one request
+after the other) against the single ASGI overview request, where those
+queries run concurrently. Both apps are served from this process against
+the same test database, with the response cache and DEBUG turned off.
+
+    pip install uvicorn
+    python -m benchmarks.bench_async_dashboard [transactions] [concurrent_clients]
+"""
+import json
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.harness import make_user, report, test_database, timed
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _serve_wsgi():
+    from django.core.wsgi import get_wsgi_application
+
+    port = _free_port()
+    server = make_server("127.0.0.1", port, get_wsgi_application(),
+                         server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}", server.shutdown
+
+
+def _serve_asgi():
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        get_asgi_application(), host="127.0.0.1", port=port, log_level="warning", lifespan="off",
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return f"http://127.0.0.1:{port}", stop
+
+
+def _get(url, token):
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def main(transactions=50000, clients=8):
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from finance import rollups
+    from finance.models import Category, Transaction
+
+    served = override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        ALLOWED_HOSTS=["127.0.0.1"],
+        DEBUG=False,
+    )
+    with test_database(), served:
+        user = make_user("bench")
+        categories = [Category.objects.create(user=user, name=f"Category {i}") for i in range(20)]
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    user=user, category=categories[i % len(categories)], type="E" if i % 4 else "I",
+                    amount=Decimal(i % 300 + 1), date=date(2020, 1, 1) + timedelta(days=i % 1800),
+                )
+                for i in range(transactions)
+            ),
+            batch_size=5000,
+        )
+        rollups.rebuild([user.pk])
+        token = str(AccessToken.for_user(user))
+
+        wsgi, stop_wsgi = _serve_wsgi()
+        asgi, stop_asgi = _serve_asgi()
+        try:
+            def sync_dashboard():
+                _get(f"{wsgi}/api/dashboard/", token)
+                _get(f"{wsgi}/api/transactions/by-category/", token)
+                _get(f"{wsgi}/api/transactions/?ordering=-date", token)
+
+            def async_overview():
+                _get(f"{asgi}/api/async/dashboard/overview/", token)
+
+            def under_load(fn):
+                def run():
+                    with ThreadPoolExecutor(clients) as pool:
+                        list(pool.map(lambda _: fn(), range(clients * 4)))
+                return run
+
+            sync_dashboard(), async_overview()  # warm up connections and imports
+            print(f"{transactions} transactions, one user")
+            slow = report("WSGI: 3 sequential requests", timed(sync_dashboard, repeat=10))
+            fast = report("ASGI: /async/dashboard/overview/", timed(async_overview, repeat=10))
+            print(f"latency speed-up: {slow / fast:.1f}x")
+            print(f"{clients} concurrent clients, {clients * 4} dashboards each run")
+            slow = report("WSGI: 3 sequential requests", timed(under_load(sync_dashboard), repeat=3))
+            fast = report("ASGI: /async/dashboard/overview/", timed(under_load(async_overview), repeat=3))
+            print(f"throughput speed-up: {slow / fast:.1f}x")
+        finally:
+            stop_asgi()
+            stop_wsgi()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,48 @@
+# benchmarks/bench_bulk_create.py
+"""
+POST /api/transactions/bulk/ against one POST /api/transactions/ per row.
+
+    python -m benchmarks.bench_bulk_create [rows]
+"""
+import sys
+
+from benchmarks.harness import api_client, make_user, report, test_database, timed
+
+
+def main(rows=2000):
+    from django.urls import reverse
+
+    from finance.models import Category, Transaction
+
+    with test_database():
+        user = make_user("bench")
+        client = api_client(user)
+        categories = [Category.objects.create(user=user, name=f"Category {i}") for i in range(10)]
+        payload = [
+            {
+                "type": "E" if i % 3 else "I",
+                "amount": f"{i % 500 + 1}.25",
+                "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "category": categories[i % len(categories)].pk,
+                "note": f"row {i}",
+            }
+            for i in range(rows)
+        ]
+        list_url = reverse("finance:transaction-list")
+        bulk_url = reverse("finance:transaction-bulk-create")
+
+        def per_item():
+            for row in payload:
+                client.post(list_url, row, format="json")
+
+        def bulk():
+            client.post(bulk_url, payload, format="json")
+
+        print(f"Inserting {rows} transactions")
+        slow = report("per-item POST /api/transactions/", timed(per_item, repeat=1), units=rows)
+        fast = report("bulk POST /api/transactions/bulk/", timed(bulk, repeat=3), units=rows)
+        print(f"speed-up: {slow / fast:.1f}x  ({Transaction.objects.count()} rows written)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
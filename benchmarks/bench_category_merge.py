@@ -0,0 +1,56 @@
+# benchmarks/bench_category_merge.py
+"""
+Merging categories: re-saving each transaction into the target, as
+clients had to through the API (before, timed on a sample and
+extrapolated), against ``merge_categories`` (after) moving ``rows``
+transactions in FINANCE_MERGE_BATCH_SIZE batches.
+
+    python -m benchmarks.bench_category_merge [rows] [batch_size]
+"""
+import sys
+import time
+
+from benchmarks.harness import make_user, report, test_database, timed
+
+
+def main(rows=1_000_000, batch_size=10_000, sample=500):
+    from django.db import connection
+
+    from finance.models import Category, Transaction
+    from finance.services import merge_categories
+
+    with test_database():
+        user = make_user("bench")
+        target = Category.objects.create(user=user, name="Target")
+        sources = [Category.objects.create(user=user, name=f"Source {i}") for i in range(4)]
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO finance_transaction (created_at, updated_at, type, amount, note, category_id, user_id, date)
+                SELECT now(), now(), 'E', (i %% 500) + 0.25, NULL, (ARRAY[%s, %s, %s, %s])[i %% 4 + 1], %s,
+                       DATE '2020-01-01' + (i %% 2000)
+                FROM generate_series(1, %s) AS i
+                """,
+                [*(c.pk for c in sources), user.pk, rows],
+            )
+            cursor.execute("ANALYZE finance_transaction")
+        print(f"Inserted {rows:,} transactions in {time.perf_counter() - started:.1f} s")
+
+        def save_each():
+            for txn in Transaction.objects.filter(category=sources[0]).select_related("category")[:sample]:
+                txn.category = target
+                txn.save()
+
+        per_row = report(f"save() x {sample}", timed(save_each, repeat=1), units=sample) / sample
+        print(f"  extrapolated to {rows:,} rows: {per_row * rows / 60:.1f} min")
+
+        started = time.perf_counter()
+        moved = merge_categories(target=target, source_ids=[c.pk for c in sources], batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"merge_categories (batch {batch_size:,}): {moved:,} rows in {elapsed:.1f} s "
+              f"({moved / elapsed:,.0f} rows/s, {per_row * rows / elapsed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
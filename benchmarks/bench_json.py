@@ -0,0 +1,58 @@
+# benchmarks/bench_json.py
+"""
+JSON encoding and decoding: DRF's ``JSONRenderer``/``JSONParser`` (before)
+against ``ORJSONRenderer``/``ORJSONParser`` (after), on a transaction
+list page and a bulk-create request body.
+
+    python -m benchmarks.bench_json [page_size]
+"""
+import io
+import sys
+
+from benchmarks.harness import report, timed
+
+
+def main(page_size=1000):
+    from datetime import date, datetime, timedelta, timezone
+    from decimal import Decimal
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer
+
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    page = {
+        "count": page_size * 10,
+        "next": "http://testserver/api/transactions/?page=2",
+        "previous": None,
+        "results": [
+            {
+                "id": i, "type": "E" if i % 3 else "I", "amount": f"{i % 500}.25",
+                "date": date(2024, 1, 1) + timedelta(days=i % 365), "note": f"row {i}",
+                "category": i % 10, "category_name": f"Category {i % 10}",
+                "running_balance": Decimal(i * 3) / 4, "created_at": created + timedelta(minutes=i),
+            }
+            for i in range(page_size)
+        ],
+    }
+    body = JSONRenderer().render([
+        {"type": "E", "amount": f"{i % 500}.25", "date": "2024-03-01", "category": i % 10, "note": f"row {i}"}
+        for i in range(page_size)
+    ])
+    assert ORJSONRenderer().render(page) == JSONRenderer().render(page)
+
+    print(f"Encoding a page of {page_size} transactions")
+    slow = report("JSONRenderer", timed(lambda: JSONRenderer().render(page), repeat=30), units=page_size)
+    fast = report("ORJSONRenderer", timed(lambda: ORJSONRenderer().render(page), repeat=30), units=page_size)
+    print(f"speed-up: {slow / fast:.1f}x")
+
+    print(f"Decoding a bulk-create body of {page_size} transactions ({len(body):,} bytes)")
+    slow = report("JSONParser", timed(lambda: JSONParser().parse(io.BytesIO(body)), repeat=30), units=page_size)
+    fast = report("ORJSONParser", timed(lambda: ORJSONParser().parse(io.BytesIO(body)), repeat=30), units=page_size)
+    print(f"speed-up: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
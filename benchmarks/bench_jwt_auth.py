@@ -0,0 +1,54 @@
+# benchmarks/bench_jwt_auth.py
+"""
+Database load of JWT authentication: simplejwt's ``JWTAuthentication``
+(before) against ``CachedJWTAuthentication`` (after), over repeated
+GET /api/categories/ requests with a Bearer token.
+
+Run it with REDIS_CACHE_URL set to measure against the shared cache
+rather than the in-process one.
+
+    python -m benchmarks.bench_jwt_auth [requests]
+"""
+import sys
+
+from benchmarks.harness import make_user, report, test_database, timed
+
+
+def main(requests=500):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from core.authentication import CachedJWTAuthentication
+    from finance.models import Category
+    from finance.views import CategoryViewSet
+
+    with test_database(), override_settings(DEBUG=False):
+        user = make_user("bench")
+        Category.objects.bulk_create([Category(user=user, name=f"Category {i}") for i in range(10)])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        url = reverse("finance:category-list")
+
+        def get_many():
+            for _ in range(requests):
+                assert client.get(url).status_code == 200
+
+        medians = []
+        authentication_classes = CategoryViewSet.authentication_classes
+        for auth_class in (JWTAuthentication, CachedJWTAuthentication):
+            CategoryViewSet.authentication_classes = [auth_class]
+            get_many()  # warm the cache
+            with CaptureQueriesContext(connection) as ctx:
+                get_many()
+            print(f"{auth_class.__name__:<40} {len(ctx.captured_queries) / requests:.2f} queries/request")
+            medians.append(report(f"  {requests} requests", timed(get_many, repeat=3), units=requests))
+        CategoryViewSet.authentication_classes = authentication_classes
+        print(f"speed-up: {medians[0] / medians[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,66 @@
+# benchmarks/bench_report_mail.py
+"""
+Report delivery throughput: one ``send_mail`` (one SMTP session) per
+message against ``core.mail.send_batched`` over a local aiosmtpd server.
+
+    pip install aiosmtpd
+    python -m benchmarks.bench_report_mail [messages] [per_connection]
+"""
+import socket
+import sys
+
+from benchmarks.harness import report, timed
+
+
+class _Sink:
+    received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        type(self).received += 1
+        return "250 OK"
+
+
+def main(messages=500, per_connection=100):
+    from aiosmtpd.controller import Controller
+    from django.core.mail import EmailMessage, send_mail
+    from django.test.utils import override_settings
+
+    from core.mail import send_batched
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(_Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        smtp = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+        )
+        smtp.enable()
+        recipients = [f"user{i}@example.com" for i in range(messages)]
+
+        def per_message():
+            for to in recipients:
+                send_mail("Weekly report", "body " * 200, "reports@example.com", [to])
+
+        def batched():
+            send_batched(
+                [EmailMessage("Weekly report", "body " * 200, "reports@example.com", [to]) for to in recipients],
+                per_connection=per_connection,
+            )
+
+        print(f"Sending {messages} messages to aiosmtpd")
+        slow = report("send_mail per message", timed(per_message, repeat=3), units=messages)
+        fast = report(f"send_batched ({per_connection}/connection)", timed(batched, repeat=3), units=messages)
+        print(f"speed-up: {slow / fast:.1f}x  ({_Sink.received} messages received)")
+        smtp.disable()
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
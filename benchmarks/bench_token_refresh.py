@@ -0,0 +1,81 @@
+# benchmarks/bench_token_refresh.py
+"""
+POST /api/auth/token/refresh/ latency on top of a multi-million-row
+token history: the database blacklist (before), the same after
+``purge_expired_tokens``, and the cache blacklist (after).
+
+``history`` outstanding tokens are inserted, every one blacklisted as
+rotation does, 90% of them already expired. Run it with REDIS_CACHE_URL
+set to time the cache blacklist against Redis.
+
+    python -m benchmarks.bench_token_refresh [history] [refreshes]
+"""
+import sys
+import time
+
+from benchmarks.harness import make_user, report, test_database, timed
+
+
+def main(history=2_000_000, refreshes=200):
+    from django.db import connection
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from core.tokens import RefreshToken, purge_expired_tokens
+
+    with test_database(), override_settings(DEBUG=False):
+        user = make_user("bench")
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO token_blacklist_outstandingtoken (user_id, jti, token, created_at, expires_at)
+                SELECT %s, md5(i::text), 'history', now() - interval '3 days',
+                       now() + CASE WHEN i %% 10 = 0 THEN interval '1 day' ELSE interval '-2 days' END
+                FROM generate_series(1, %s) AS i
+                """,
+                [user.pk, history],
+            )
+            cursor.execute(
+                "INSERT INTO token_blacklist_blacklistedtoken (token_id, blacklisted_at) "
+                "SELECT id, now() FROM token_blacklist_outstandingtoken"
+            )
+            cursor.execute("ANALYZE token_blacklist_outstandingtoken")
+            cursor.execute("ANALYZE token_blacklist_blacklistedtoken")
+        print(f"Inserted {history:,} blacklisted tokens in {time.perf_counter() - started:.1f} s")
+
+        client = APIClient()
+        url = reverse("core:token_refresh")
+        state = {}
+
+        def refresh_many():
+            token = state.get("token") or str(RefreshToken.for_user(user))
+            for _ in range(refreshes):
+                response = client.post(url, {"refresh": token}, format="json")
+                assert response.status_code == 200, response.content
+                token = response.data["refresh"]
+            state["token"] = token
+
+        medians = {}
+        with override_settings(TOKEN_BLACKLIST_BACKEND="database"):
+            medians["before"] = report(f"database, {history:,} rows", timed(refresh_many, repeat=3), units=refreshes)
+
+            state.clear()
+            started = time.perf_counter()
+            deleted = purge_expired_tokens(batch_size=10000)
+            print(f"purge_expired_tokens: {deleted:,} rows in {time.perf_counter() - started:.1f} s")
+            medians["purged"] = report("database, after purge", timed(refresh_many, repeat=3), units=refreshes)
+
+        state.clear()
+        with override_settings(TOKEN_BLACKLIST_BACKEND="cache"):
+            medians["cache"] = report("cache", timed(refresh_many, repeat=3), units=refreshes)
+
+        print(f"per refresh: database {medians['before'] / refreshes * 1000:.2f} ms, "
+              f"after purge {medians['purged'] / refreshes * 1000:.2f} ms, "
+              f"cache {medians['cache'] / refreshes * 1000:.2f} ms "
+              f"(speed-up {medians['before'] / medians['cache']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
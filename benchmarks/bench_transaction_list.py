@@ -0,0 +1,67 @@
+# benchmarks/bench_transaction_list.py
+"""
+Transaction list serialization: ``TransactionSerializer`` over model
+instances (before) against ``TransactionReadSerializer`` over
+``.values()`` rows (after), alone and through GET /api/transactions/.
+
+    python -m benchmarks.bench_transaction_list [page_size]
+"""
+import sys
+
+from benchmarks.harness import api_client, make_user, report, test_database, timed
+
+
+def main(page_size=100):
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    from django.db.models import OuterRef, Subquery
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from finance.models import Category, Transaction
+    from finance.serializers import TransactionReadSerializer, TransactionSerializer
+    from finance.views import TransactionViewSet
+
+    with test_database(), override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}, DEBUG=False
+    ):
+        user = make_user("bench")
+        categories = [Category.objects.create(user=user, name=f"Category {i}") for i in range(10)]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user, category=categories[i % 10], type="E" if i % 3 else "I",
+                amount=Decimal(f"{i % 500}.25"), date=date(2024, 1, 1) + timedelta(days=i % 365), note=f"row {i}",
+            )
+            for i in range(5000)
+        ])
+
+        instances = list(Transaction.objects.filter(user=user).select_related("category")[:page_size])
+        rows = list(
+            Transaction.objects.filter(user=user)
+            .annotate(category_name=Subquery(Category.objects.filter(pk=OuterRef("category")).values("name")[:1]))
+            .values(*TransactionReadSerializer.values_fields)[:page_size]
+        )
+        print(f"Serializing {page_size} transactions")
+        slow = report("TransactionSerializer", timed(lambda: TransactionSerializer(instances, many=True).data, repeat=50), units=page_size)
+        fast = report("TransactionReadSerializer", timed(lambda: TransactionReadSerializer(rows, many=True).data, repeat=50), units=page_size)
+        print(f"speed-up: {slow / fast:.1f}x")
+
+        client = api_client(user)
+        url = f"{reverse('finance:transaction-list')}?page_size={page_size}"
+
+        def get_page():
+            assert len(client.get(url).json()["results"]) == page_size
+
+        fast_read = TransactionViewSet.is_fast_read
+        TransactionViewSet.is_fast_read = property(lambda self: False)
+        get_page()
+        slow = report(f"GET ?page_size={page_size} (serializer)", timed(get_page, repeat=30), units=page_size)
+        TransactionViewSet.is_fast_read = fast_read
+        get_page()
+        fast = report(f"GET ?page_size={page_size} (values)", timed(get_page, repeat=30), units=page_size)
+        print(f"speed-up: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
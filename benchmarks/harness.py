@@ -0,0 +1,76 @@
+# benchmarks/harness.py
+"""
+Shared scaffolding for the scripts in this package.
+
+Each benchmark runs against a throw-away test database created with the
+project settings, e.g.::
+
+    docker-compose run --rm web python -m benchmarks.bench_bulk_create
+"""
+import contextlib
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "photocart.settings")
+django.setup()
+
+from django.test.utils import (  # noqa: E402
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextlib.contextmanager
+def test_database(aliases=None):
+    setup_test_environment()
+    config = setup_databases(verbosity=0, interactive=False, aliases=aliases)
+    try:
+        yield
+    finally:
+        teardown_databases(config, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(fn, *, repeat=5):
+    """
+    Run ``fn`` ``repeat`` times and return the list of wall-clock seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label, samples, *, units=None):
+    median = statistics.median(samples)
+    line = f"{label:<40} median {median * 1000:9.1f} ms"
+    if units:
+        line += f"   {units / median:12,.0f} rows/s"
+    print(line)
+    return median
+
+
+def make_user(username):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        username=username, email=f"{username}@example.com", password="password"
+    )
+
+
+def api_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """
+    Cached responses are keyed on user ids, which the test database
+    reuses between tests; start every test from an empty cache.
+    """
+    cache.clear()
+    yield
+    cache.clear()
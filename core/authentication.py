@@ -0,0 +1,93 @@
+# core/authentication.py
+"""
+JWT authentication that resolves the token's user from the shared cache.
+
+``JWTAuthentication`` loads the user row on every request. This class
+caches it under ``auth:user:<id>:<version>`` (see core.cache), and the
+version is bumped whenever ``is_active``, ``is_blocked``, ``role``,
+``is_staff``, ``is_superuser`` or the password of that user is saved, or
+the user is deleted (see core.signals). The bump happens both at save
+time and after commit, like the finance response cache.
+
+Maximum staleness: none for changes made through ``Model.save()`` /
+``delete()`` (the admin, ``set_password`` + ``save``, serializers). Writes
+that bypass the signals (``QuerySet.update()``, raw SQL, another client)
+are picked up after at most ``AUTH_USER_CACHE_TIMEOUT`` seconds. Other
+profile fields (email, names, ``last_login``…) can be that old on
+``request.user`` too; reload the user when a view needs them fresh.
+
+The password hash is never cached: the entry holds the other fields and,
+for token revocation, the MD5 of the hash simplejwt compares against. A
+cached user comes back with ``password`` deferred, loaded from the
+database if anything reads it.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import bump_version, get_version
+
+NAMESPACE = "auth"
+
+# Fields that decide whether, and as whom, a token authenticates
+AUTH_FIELDS = ("password", "is_active", "is_blocked", "role", "is_staff", "is_superuser")
+
+
+def user_key(user_id):
+    return f"{NAMESPACE}:user:{user_id}:{get_version(NAMESPACE, user_id)}"
+
+
+def invalidate_user(user_id):
+    bump_version(NAMESPACE, user_id)
+    transaction.on_commit(lambda: bump_version(NAMESPACE, user_id))
+
+
+def _cached_fields():
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != 'password']
+
+
+def _to_cache(user):
+    return {
+        'db': user._state.db,
+        'values': [getattr(user, name) for name in _cached_fields()],
+        'password_hash': get_md5_hash_password(user.password),
+    }
+
+
+def _from_cache(entry):
+    return get_user_model().from_db(entry['db'], _cached_fields(), entry['values'])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` with the user served from the cache: two cache
+    reads instead of a query per request.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = user_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            # Raises for unknown / inactive users, which are not cached
+            user = super().get_user(validated_token)
+            cache.set(key, _to_cache(user), timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user = _from_cache(entry)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry['password_hash']:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
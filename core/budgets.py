@@ -0,0 +1,47 @@
+# core/budgets.py
+"""
+Per-endpoint performance budgets.
+
+Every API view declares a ``query_budgets`` mapping from viewset action
+(``'list'``, ``'retrieve'``, ``'by_category'``…) or, for plain API views,
+lower-case HTTP method (``'post'``) to a ``QueryBudget``. Function views
+use the ``query_budgets`` decorator instead.
+
+``core/tests/test_core_query_budgets.py`` seeds realistic data, calls
+every route in ``finance.urls`` and ``core.urls`` and fails when an
+endpoint has no budget or goes over it, so new endpoints have to opt in.
+"""
+
+
+class QueryBudget:
+    """
+    At most ``queries`` SQL queries per request, and a 95th percentile
+    latency of at most ``p95_ms`` milliseconds on the test database.
+    """
+    def __init__(self, queries, p95_ms):
+        self.queries = queries
+        self.p95_ms = p95_ms
+
+    def __repr__(self):
+        return f"QueryBudget(queries={self.queries}, p95_ms={self.p95_ms})"
+
+
+def query_budgets(**budgets):
+    """
+    Declare the budgets of a function view, keyed by lower-case method.
+    """
+    def decorate(view):
+        view.query_budgets = budgets
+        return view
+    return decorate
+
+
+def budget_for(callback, method):
+    """
+    The ``QueryBudget`` declared for ``method`` on a resolved URL
+    ``callback`` (as returned by ``as_view()``), or ``None``.
+    """
+    actions = getattr(callback, 'actions', None)
+    view = getattr(callback, 'cls', callback)
+    key = actions.get(method) if actions else method
+    return getattr(view, 'query_budgets', {}).get(key)
@@ -0,0 +1,48 @@
+# core/cache.py
+"""
+Per-owner versioned cache keys.
+
+Every cached value for an owner embeds the owner's current version in
+its key, so invalidating everything that owner has cached is a single
+``INCR`` — stale entries are simply never read again and age out.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace, owner_id):
+    return f"{namespace}:version:{owner_id}"
+
+
+def get_version(namespace, owner_id):
+    """
+    Current version for ``owner_id``. A missing (or evicted) counter is
+    seeded from the clock so it can never fall back to a version whose
+    entries are still cached.
+    """
+    key = _version_key(namespace, owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, owner_id):
+    key = _version_key(namespace, owner_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def incr_counter(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
@@ -0,0 +1,52 @@
+# core/mail.py
+"""
+Batched email delivery over reused connections.
+
+``send_mail`` opens and closes a connection (for SMTP: connect, EHLO,
+STARTTLS, AUTH, QUIT) for every message. ``send_batched`` opens one per
+``EMAIL_MESSAGES_PER_CONNECTION`` messages and hands back the messages
+that failed, so callers can retry just those.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def send_batched(messages, *, per_connection=None):
+    """
+    Send ``messages`` (``EmailMessage`` instances) with one connection per
+    ``per_connection`` of them. A failure is logged and the message
+    skipped; the connection is reopened for the rest of its batch in case
+    the failure took it down. Returns the messages that were not sent.
+    """
+    per_connection = per_connection or settings.EMAIL_MESSAGES_PER_CONNECTION
+    failed = []
+    for offset in range(0, len(messages), per_connection):
+        batch = messages[offset:offset + per_connection]
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error(f"send_batched: could not open a mail connection: {e}")
+            failed.extend(batch)
+            continue
+        try:
+            for position, message in enumerate(batch):
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    logger.error(f"send_batched: failed to send '{message.subject}' to {', '.join(message.to)}: {e}")
+                    failed.append(message)
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        logger.error(f"send_batched: could not reopen the mail connection: {e}")
+                        failed.extend(batch[position + 1:])
+                        break
+        finally:
+            connection.close()
+    return failed
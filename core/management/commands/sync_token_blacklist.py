@@ -0,0 +1,12 @@
+# core/management/commands/sync_token_blacklist.py
+from django.core.management.base import BaseCommand
+
+from core import tokens
+
+
+class Command(BaseCommand):
+    help = "Copy unexpired blacklisted refresh tokens from the database into the cache blacklist."
+
+    def handle(self, *args, **options):
+        copied = tokens.copy_blacklist_to_cache()
+        self.stdout.write(self.style.SUCCESS(f"Copied {copied} blacklisted tokens to the cache."))
@@ -0,0 +1,102 @@
+# core/middleware.py
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import CachedJWTAuthentication
+from .routers import (
+    is_pinned, pin_to_primary, read_from_replica, replicas, shards, use_shard_of, writes_frozen,
+)
+
+
+def request_user_id(request):
+    """
+    Id of the user a request authenticates as, read from its JWT (signature
+    and expiry checked, no database access) or else its session; ``None``
+    for anonymous or invalid credentials, which DRF then turns away.
+    """
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    if header is not None:
+        raw_token = auth.get_raw_token(header)
+        if raw_token is not None:
+            try:
+                return auth.get_validated_token(raw_token).get(jwt_settings.USER_ID_CLAIM)
+            except (InvalidToken, TokenError):
+                return None
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def replica_action(request):
+    """
+    Whether ``request`` goes to a viewset action listed in the view's
+    ``replica_actions``.
+    """
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return False
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    return action is not None and action in getattr(getattr(match.func, 'cls', None), 'replica_actions', ())
+
+
+class ReplicaMiddleware:
+    """
+    Serve the safe-method requests of the viewset actions listed in the
+    view's ``replica_actions`` from a read replica (core.routers), unless
+    the user wrote something within the last REPLICA_PIN_SECONDS; any
+    unsafe-method request pins its user to the primary for that long.
+
+    Goes after AuthenticationMiddleware. Does nothing without replicas.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+
+        if request.method in SAFE_METHODS:
+            if replica_action(request):
+                user_id = request_user_id(request)
+                if user_id is not None and not is_pinned(user_id):
+                    with read_from_replica():
+                        return self.get_response(request)
+            return self.get_response(request)
+
+        # Pin before the write, so no read racing it goes to a replica that
+        # misses it, and again after, for REPLICA_PIN_SECONDS from its end
+        user_id = request_user_id(request)
+        pin_to_primary(user_id)
+        response = self.get_response(request)
+        pin_to_primary(user_id)
+        return response
+
+
+class ShardMiddleware:
+    """
+    Run each authenticated request inside ``use_shard_of`` its user
+    (core.routers), so every ``finance`` query it makes goes to their
+    shard. Does nothing without FINANCE_SHARDS.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not shards():
+            return self.get_response(request)
+        user_id = request_user_id(request)
+        if user_id is None:
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS and writes_frozen(user_id):
+            response = JsonResponse(
+                {"detail": "Your data is being moved; try again in a moment."}, status=503
+            )
+            response['Retry-After'] = '30'
+            return response
+        with use_shard_of(user_id):
+            return self.get_response(request)
@@ -24,6 +24,19 @@ class User(AbstractUser):
     
     def __str__(self):
         return self.email  
+
+
+class UserShard(models.Model):
+    """
+    The database holding a user's ``finance`` data when FINANCE_SHARDS is
+    set (see core.routers). Users without a row are on ``default``.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='shard')
+    alias = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} → {self.alias}"
     
 
     
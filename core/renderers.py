@@ -0,0 +1,35 @@
+# core/renderers.py
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# date/datetime/time go through DRF's encoder too (it writes UTC as "Z"),
+# so the output is the same as JSONRenderer's
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# Whatever orjson can't encode natively (Decimal, lazy strings, dates,
+# UUIDs, querysets…) is converted exactly as DRF's JSONEncoder would
+orjson_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on orjson, with the same output: compact UTF-8,
+    ``\\u2028``/``\\u2029`` escaped, bare ``Decimal`` as a number (serializer
+    ``DecimalField`` values are already two-decimal strings).
+    Indents other than 2, which orjson can't produce, fall back to the
+    stdlib renderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 2) or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        options = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        ret = orjson.dumps(data, default=orjson_default, option=options)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,249 @@
+# core/routers.py
+"""
+Read replicas and user shards.
+
+Replicas: every query goes to ``default`` (the primary) unless the code
+running it asked for a replica with ``read_from_replica``:
+``ReplicaMiddleware`` does so for the safe-method API actions a viewset
+lists in ``replica_actions``, and the report tasks in ``core.tasks``
+always do. Replicas are the DATABASE_REPLICAS aliases; with none
+configured, every read stays on the primary. Replicas lag behind the
+primary, so a user who has just written is pinned to the primary for
+REPLICA_PIN_SECONDS (``pin_to_primary``) and reads back what they wrote.
+
+Shards: with FINANCE_SHARDS set, each user's ``finance`` rows live on one
+database, recorded in ``core.models.UserShard`` (new users are placed by
+a stable hash of their id; users without a row are on ``default``).
+Inside ``use_shard_of(user_id)`` every ``finance`` query goes to that
+user's shard; ``ShardMiddleware`` opens it for each authenticated
+request and the Celery tasks for the user or shard they work on.
+Everything else, users included, stays on ``default``; each shard keeps
+a copy of its users' rows for its foreign keys. Replicas then only serve
+the unsharded apps. Shards need a cache every process shares (Redis): the
+user-to-shard mapping and the write freeze of a move live there
+(``check_shared_cache``).
+"""
+import random
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+from .cache import bump_version, get_version
+
+SHARDED_APPS = ('finance',)
+# How long a user's shard stays cached; a move bumps the key's version,
+# this only bounds how long a lost update could linger
+SHARD_CACHE_TIMEOUT = 60 * 60
+
+_replica = ContextVar('replica', default=None)
+_shard = ContextVar('shard', default=None)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def shards():
+    return list(getattr(settings, 'FINANCE_SHARDS', ()))
+
+
+def is_sharded(model):
+    return bool(shards()) and model._meta.app_label in SHARDED_APPS
+
+
+@contextmanager
+def read_from_replica(alias=None):
+    """
+    Send the reads made inside the block (or the decorated function) to
+    ``alias``, or to a random replica. A no-op without replicas.
+    """
+    if alias is None and replicas():
+        alias = random.choice(replicas())
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+def reads_from_replica(model):
+    """
+    Whether reads of ``model`` go to a replica here. Their results may be
+    behind the primary, so they mustn't be cached for everyone.
+    """
+    return router.db_for_read(model) in replicas()
+
+
+def _pin_key(user_id):
+    return f"db:pinned:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """
+    Keep ``user_id``'s requests on the primary for REPLICA_PIN_SECONDS,
+    long enough for the replicas to catch up with their latest write.
+    """
+    if user_id is not None and replicas():
+        cache.set(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(cache.get(_pin_key(user_id)))
+
+
+def check_shared_cache():
+    """
+    Refuse FINANCE_SHARDS with a per-process cache: other workers would
+    never see a move's write freeze or the user's new shard, and would
+    keep writing to the shard being emptied.
+    """
+    if shards() and isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            "FINANCE_SHARDS needs a cache shared by every process (set REDIS_CACHE_URL)."
+        )
+
+
+def every_shard():
+    """
+    ``default`` followed by the other FINANCE_SHARDS, in the order that
+    gives each its id range (see finance.shards); append new shards only.
+    """
+    return [DEFAULT_DB_ALIAS] + [alias for alias in shards() if alias != DEFAULT_DB_ALIAS]
+
+
+def hashed_shard(user_id):
+    """
+    Where a new user goes: a stable hash of the id over FINANCE_SHARDS.
+    """
+    return shards()[zlib.crc32(str(user_id).encode()) % len(shards())]
+
+
+def _shard_key(user_id):
+    # Versioned, bumped by assign_shard
+    return f"db:shard:{user_id}:{get_version('db-shard', user_id)}"
+
+
+def shard_for(user_id):
+    """
+    The alias holding ``user_id``'s finance data, from ``UserShard``
+    (cached until the user moves).
+    """
+    if not shards() or user_id is None:
+        return DEFAULT_DB_ALIAS
+    # The key is taken before the lookup, so a move in between leaves the
+    # old alias under the old version
+    key = _shard_key(user_id)
+    alias = cache.get(key)
+    if alias is None:
+        from core.models import UserShard
+
+        alias = (
+            UserShard.objects.filter(user_id=user_id).values_list('alias', flat=True).first()
+            or DEFAULT_DB_ALIAS
+        )
+        cache.set(key, alias, timeout=SHARD_CACHE_TIMEOUT)
+    return alias
+
+
+def assign_shard(user_id, alias):
+    """
+    Record ``alias`` as ``user_id``'s shard (the data has to be there).
+    """
+    from core.models import UserShard
+
+    UserShard.objects.update_or_create(user_id=user_id, defaults={'alias': alias})
+    bump_version('db-shard', user_id)
+
+
+def _moving_key(user_id):
+    return f"db:moving:{user_id}"
+
+
+def freeze_writes(user_id, timeout):
+    """
+    Have ``ShardMiddleware`` turn away ``user_id``'s unsafe-method
+    requests (503) while their data is copied to another shard; reads
+    carry on.
+    """
+    cache.set(_moving_key(user_id), True, timeout=timeout)
+
+
+def thaw_writes(user_id):
+    cache.delete(_moving_key(user_id))
+
+
+def writes_frozen(user_id):
+    return bool(cache.get(_moving_key(user_id)))
+
+
+@contextmanager
+def use_shard(alias):
+    """
+    Send every ``finance`` query made inside the block to ``alias``.
+    """
+    token = _shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _shard.reset(token)
+
+
+def use_shard_of(user_id):
+    """
+    ``use_shard`` for the shard of ``user_id``; a no-op without shards.
+    """
+    return use_shard(shard_for(user_id) if shards() else None)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica chosen by ``read_from_replica``, if any;
+    writes always go to the primary, including saves of instances that
+    were loaded from a replica.
+    """
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        # Inside a transaction on the primary, read what it has written
+        if alias is None or is_sharded(model) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if is_sharded(model):
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary, and shards copies of
+        # their users
+        return True
+
+
+class ShardRouter:
+    """
+    ``finance`` models go to the shard opened by ``use_shard``, or else to
+    the database the instance at hand came from; everything else to the
+    primary. Only active with FINANCE_SHARDS set.
+    """
+    def _route(self, model, **hints):
+        if not shards():
+            return None
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+        alias = _shard.get()
+        if alias is not None:
+            return alias
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    db_for_read = _route
+    db_for_write = _route
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from .tokens import RefreshToken
 # from .models import Product, Order, OrderItem
 
 
@@ -43,6 +46,14 @@ class LogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField(
         help_text="The refresh token to blacklist (as returned by /api/token/)."
     )
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
         
 # class ProductSerializer(serializers.ModelSerializer):
 #     class Meta:
@@ -0,0 +1,31 @@
+# core/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.authentication import AUTH_FIELDS, invalidate_user
+
+User = get_user_model()
+
+
+def _auth_state(instance):
+    # __dict__ so deferred fields are not loaded just to be compared
+    return tuple(instance.__dict__.get(field) for field in AUTH_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_auth_state(sender, instance, **kwargs):
+    instance._auth_state = _auth_state(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(sender, instance, created, **kwargs):
+    state = _auth_state(instance)
+    if not created and state != instance._auth_state:
+        invalidate_user(instance.pk)
+    instance._auth_state = state
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -1,14 +1,21 @@
 # photocart/core/tasks.py
 import logging
+from collections import defaultdict
+from decimal import Decimal
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.conf import settings
+from django.db.models import F, Q, Sum, Window
+from django.db.models.functions import RowNumber
 from datetime import datetime, timedelta, date
-from django.db.models import Sum
-from decimal import Decimal # <--- IMPORT THIS
 
 from django.contrib.auth import get_user_model
-from finance.models import Transaction, Category
+from core import tokens
+from core.mail import send_batched
+from core.routers import every_shard, read_from_replica, shard_for, use_shard, use_shard_of
+from finance import archive, partitions
+from finance.models import DailyRollup, Transaction, Category
+from finance.services import financial_summary
 
 logger = logging.getLogger(__name__)
 
@@ -24,50 +31,30 @@ def debug_task(name="World"):
     print(message)
     return message
 
-@shared_task
-def send_user_summary_report(user_id, period="weekly"):
-    """
-    Celery task to send a user's financial summary report via email.
+REPORT_PERIODS = {
+    "weekly": 7,
+    "monthly": 30,
+}
 
-    Args:
-        user_id (int): The ID of the user for whom to generate the report.
-        period (str): The reporting period ('weekly' or 'monthly').
-    """
-    try:
-        user = User.objects.get(id=user_id)
-        user_email = user.email
-    except User.DoesNotExist:
-        logger.error(f"send_user_summary_report: User with ID {user_id} not found. Skipping email report.")
-        return
-
-    subject = f"Your {period.capitalize()} Financial Summary Report - PhotoCart"
-    to_email = [user_email]
-
-    end_date = date.today()
-    start_date = None
-
-    if period == "weekly":
-        start_date = end_date - timedelta(days=7)
-    elif period == "monthly":
-        start_date = end_date - timedelta(days=30)
-    else:
-        logger.warning(f"send_user_summary_report: Unknown period '{period}' for user {user_id}. No report generated.")
-        return
 
-    transactions_in_period = Transaction.objects.filter(
-        category__user=user,
-        date__range=[start_date, end_date]
-    )
+def report_range(period, end_date=None):
+    """
+    ``(start_date, end_date)`` covered by a ``period`` report, or ``None``
+    for an unknown period.
+    """
+    if period not in REPORT_PERIODS:
+        return None
+    end_date = end_date or date.today()
+    return end_date - timedelta(days=REPORT_PERIODS[period]), end_date
 
-    # Ensure fallbacks are Decimal objects
-    total_income = transactions_in_period.filter(
-        type=Transaction.TransactionType.INCOME
-    ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00') # <--- CHANGED HERE
-    
-    total_expense = transactions_in_period.filter(
-        type=Transaction.TransactionType.EXPENSE
-    ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00') # <--- CHANGED HERE
 
+def compose_summary_email(user, period, start_date, end_date, total_income, total_expense, recent_transactions):
+    """
+    Subject and body of a summary report. ``recent_transactions`` are
+    the (at most five) latest transactions in the period, with their
+    categories loaded.
+    """
+    subject = f"Your {period.capitalize()} Financial Summary Report - PhotoCart"
     net_balance_change = total_income - total_expense
 
     email_body = f"""
@@ -82,8 +69,7 @@ Net Balance Change (Income - Expenses): ${net_balance_change:.2f}
 ---------------------------------------------------
 
 """
-    recent_transactions = transactions_in_period.order_by('-date')[:5]
-    if recent_transactions.exists():
+    if recent_transactions:
         email_body += "\nRecent Transactions:\n"
         for trans in recent_transactions:
             category_name = trans.category.name if trans.category else "Uncategorized"
@@ -98,31 +84,207 @@ Thank you for using PhotoCart!
 Best regards,
 The PhotoCart Team
 """
+    return subject, email_body
+
+
+def report_message(user, subject, email_body):
+    return EmailMessage(subject, email_body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
 
+# The report tasks only read, and do so from a replica when there is one
+# (core.routers); a report a few seconds behind the primary is fine
+@shared_task
+@read_from_replica()
+def send_user_summary_report(user_id, period="weekly"):
+    """
+    Celery task to send a user's financial summary report via email.
+
+    Args:
+        user_id (int): The ID of the user for whom to generate the report.
+        period (str): The reporting period ('weekly' or 'monthly').
+    """
     try:
-        send_mail(
-            subject,
-            email_body,
-            settings.DEFAULT_FROM_EMAIL,
-            to_email,
-            fail_silently=False,
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        logger.error(f"send_user_summary_report: User with ID {user_id} not found. Skipping email report.")
+        return
+
+    date_range = report_range(period)
+    if date_range is None:
+        logger.warning(f"send_user_summary_report: Unknown period '{period}' for user {user_id}. No report generated.")
+        return
+    start_date, end_date = date_range
+
+    with use_shard_of(user_id):
+        # Totals come from the daily rollups rather than summing every transaction
+        summary = financial_summary(user=user, start=start_date, end=end_date)
+        recent_transactions = list(
+            Transaction.objects.filter(user=user, date__range=[start_date, end_date])
+            .select_related('category')
+            .order_by('-date', '-id')[:5]
         )
-        logger.info(f"send_user_summary_report: Successfully sent {period} summary report to {user_email}")
-        print(f"Successfully sent {period} summary report to {user_email}")
-    except Exception as e:
-        logger.error(f"send_user_summary_report: Failed to send {period} summary report to {user_email}: {e}")
-        print(f"Failed to send {period} summary report to {user_email}: {e}")
 
+    subject, email_body = compose_summary_email(
+        user, period, start_date, end_date,
+        summary["total_income"], summary["total_expense"], recent_transactions,
+    )
+    if send_batched([report_message(user, subject, email_body)]):
+        logger.error(f"send_user_summary_report: Failed to send {period} summary report to {user.email}")
+    else:
+        logger.info(f"send_user_summary_report: Successfully sent {period} summary report to {user.email}")
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=5 * 60)
+@read_from_replica()
+def send_summary_reports_chunk(self, user_ids, period, start_date, end_date):
+    """
+    Send the ``period`` report to a chunk of users with three queries for
+    the whole chunk: the users, their totals (grouped over the daily
+    rollups) and their five latest transactions (``ROW_NUMBER()`` per
+    user, filtered to ``<= 5``); with FINANCE_SHARDS, the last two once
+    per shard the chunk's users are on. Returns the number of reports sent.
+
+    Delivery reuses one mail connection per EMAIL_MESSAGES_PER_CONNECTION
+    messages; the task is retried for the users whose report failed only.
+    """
+    iso_start, iso_end = start_date, end_date
+    start_date, end_date = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    users = User.objects.filter(id__in=user_ids, is_active=True).only('id', 'email', 'first_name')
+
+    by_shard = defaultdict(list)
+    for user_id in user_ids:
+        by_shard[shard_for(user_id)].append(user_id)
+
+    totals = {}
+    recent = defaultdict(list)
+    for alias, shard_user_ids in by_shard.items():
+        with use_shard(alias):
+            totals.update(
+                (row['user'], (row['income'] or Decimal('0'), row['expense'] or Decimal('0')))
+                for row in DailyRollup.objects.filter(user__in=shard_user_ids, date__range=[start_date, end_date])
+                .order_by()
+                .values('user')
+                .annotate(
+                    income=Sum('total', filter=Q(type=Transaction.TransactionType.INCOME)),
+                    expense=Sum('total', filter=Q(type=Transaction.TransactionType.EXPENSE)),
+                )
+            )
+
+            latest = (
+                Transaction.objects.filter(user__in=shard_user_ids, date__range=[start_date, end_date])
+                .select_related('category')
+                .annotate(
+                    recency=Window(RowNumber(), partition_by=[F('user')], order_by=[F('date').desc(), F('id').desc()])
+                )
+                .filter(recency__lte=5)
+                .order_by('user', 'recency')
+            )
+            for trans in latest:
+                recent[trans.user_id].append(trans)
+
+    messages = {}
+    for user in users:
+        total_income, total_expense = totals.get(user.pk, (Decimal('0'), Decimal('0')))
+        subject, email_body = compose_summary_email(
+            user, period, start_date, end_date, total_income, total_expense, recent[user.pk],
+        )
+        messages[user.pk] = report_message(user, subject, email_body)
+
+    failed = send_batched(list(messages.values()))
+    sent = len(messages) - len(failed)
+    logger.info(f"send_summary_reports_chunk: sent {sent} of {len(messages)} {period} summary reports")
+    if failed:
+        failed_ids = [user_id for user_id, message in messages.items() if message in failed]
+        if self.request.retries >= self.max_retries:
+            logger.error(f"send_summary_reports_chunk: giving up on {period} reports for users {failed_ids}")
+        else:
+            raise self.retry(args=[failed_ids, period, iso_start, iso_end])
+    return sent
 
 
 ## for all the users send the summary report 
 @shared_task
-def enqueue_weekly_reports():
+@read_from_replica()
+def enqueue_weekly_reports(period="weekly", chunk_size=None):
+    """
+    Fan the ``period`` report out to every active user with activity in
+    the period, ``chunk_size`` users per ``send_summary_reports_chunk``.
+
+    Users with no transactions in the period are skipped up front (found
+    with one query over the daily rollups of each shard). Returns the fan-out counts,
+    including what the previous one-task-per-active-user fan-out would
+    have cost (one task and message and about five queries per user).
+    """
+    chunk_size = chunk_size or settings.REPORT_CHUNK_SIZE
+    start_date, end_date = report_range(period)
+    user_ids = []
+    for alias in every_shard():
+        with use_shard(alias):
+            # On a shard, ``is_active`` is its copy's; the chunks check the user itself
+            user_ids.extend(
+                DailyRollup.objects.filter(date__range=[start_date, end_date], user__is_active=True, count__gt=0)
+                .order_by('user')
+                .values_list('user', flat=True)
+                .distinct()
+            )
+
+    tasks = 0
+    for offset in range(0, len(user_ids), chunk_size):
+        send_summary_reports_chunk.delay(
+            user_ids[offset:offset + chunk_size], period, start_date.isoformat(), end_date.isoformat()
+        )
+        tasks += 1
+
+    active_users = User.objects.filter(is_active=True).count()
+    stats = {
+        "active_users": active_users,
+        "users_with_activity": len(user_ids),
+        "tasks": tasks,
+        "queries": 2 + 3 * tasks,
+        "tasks_saved": active_users - tasks,
+        "messages_saved": active_users - tasks,
+        "queries_saved": (1 + 5 * active_users) - (2 + 3 * tasks),
+    }
+    logger.info(f"enqueue_weekly_reports: {stats}")
+    return stats
+
+
+@shared_task
+def purge_expired_tokens(batch_size=None):
+    """
+    Delete expired refresh tokens from simplejwt's outstanding/blacklist
+    tables, which nothing else prunes. Under the cache blacklist only
+    tokens issued before the switch are left there.
+    """
+    deleted = tokens.purge_expired_tokens(batch_size or settings.TOKEN_PURGE_BATCH_SIZE)
+    logger.info(f"purge_expired_tokens: deleted {deleted} expired tokens")
+    return deleted
+
+
+@shared_task
+def create_transaction_partitions(ahead=None):
+    """
+    Create the finance_transaction partitions for the current and the
+    next FINANCE_PARTITIONS_AHEAD months (or years) that don't exist yet,
+    on every shard.
+    """
+    created = []
+    for alias in every_shard():
+        created.extend(partitions.ensure_future_partitions(ahead=ahead, using=alias))
+    return created
+
+
+@shared_task
+def archive_old_transactions(months=None):
     """
-    Find all active users and fire off one send_user_summary_report per user.
+    Move transactions older than FINANCE_ARCHIVE_AFTER_MONTHS months to
+    the archive table, then drop the partitions that left empty, on every
+    shard.
     """
-    qs = User.objects.filter(is_active=True).values_list('id', flat=True)
-    for uid in qs:
-        send_user_summary_report.delay(uid, 'weekly')
\ No newline at end of file
+    cutoff = archive.archive_cutoff(months=months)
+    archived = 0
+    for alias in every_shard():
+        with use_shard(alias):
+            archived += archive.archive_before(cutoff)
+        partitions.drop_empty_partitions(cutoff, using=alias)
+    return archived
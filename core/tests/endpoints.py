@@ -0,0 +1,190 @@
+"""
+Every route in finance.urls and core.urls, with the seeded data and
+the request used to exercise it. Shared by the endpoint-wide suites
+(query budgets, JSON rendering).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+import core.urls
+import finance.urls
+from finance import async_views, rollups
+from finance.models import Category, ImportJob, Transaction
+
+User = get_user_model()
+
+# Routes that never touch the database and have nothing to budget
+EXEMPT = {"finance:api-root"}
+
+
+def iter_routes(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            if "format" in pattern.pattern.regex.groupindex:
+                continue  # .json / .api suffix variants of the same view
+            callback = pattern.callback
+            if getattr(callback, "actions", None):
+                methods = callback.actions
+            elif getattr(callback, "cls", None):
+                methods = [m for m in callback.cls.http_method_names if m not in ("head", "options") and hasattr(callback.cls, m)]
+            else:
+                methods = list(getattr(callback, "query_budgets", None) or ["get"])
+            for method in methods:
+                yield f"{namespace}:{pattern.name}", method, callback
+
+
+ROUTES = sorted(
+    [*iter_routes(finance.urls.urlpatterns, "finance"), *iter_routes(core.urls.urlpatterns, "core")],
+    key=lambda route: (route[0], route[1]),
+)
+
+
+# ------------------------------------------------------------------ data
+
+class Seed:
+    """
+    One user with a couple of years of history across a dozen
+    categories, plus a second user whose rows must never be touched.
+    """
+    def __init__(self, transactions=600):
+        self.user = User.objects.create_user(username="budget", email="budget@example.com", password="password123")
+        self.categories = [Category.objects.create(user=self.user, name=f"Category {i}") for i in range(12)]
+        start = date.today() - timedelta(days=730)
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, category=self.categories[i % len(self.categories)],
+                type="I" if i % 5 == 0 else "E", amount=Decimal(i % 200 + 1),
+                date=start + timedelta(days=i * 730 // transactions), note=f"transaction {i}",
+            )
+            for i in range(transactions)
+        ])
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        other_category = Category.objects.create(user=other, name="Category 0")
+        Transaction.objects.bulk_create([
+            Transaction(user=other, category=other_category, type="E", amount=Decimal("1.00"), date=start)
+            for _ in range(50)
+        ])
+        rollups.rebuild()
+        self.job = ImportJob.objects.create(user=self.user, file="imports/seed.csv", format="csv", bytes_total=10)
+        self.counter = 0
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def transaction(self):
+        return Transaction.objects.create(category=self.categories[0], type="E", amount=Decimal("9.99"), date=date.today())
+
+    def category(self):
+        return Category.objects.create(user=self.user, name=f"Scratch {self.unique()}")
+
+    def category_in_use(self, transactions=20):
+        category = self.category()
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, category=category, type="E", amount=Decimal("1.00"), date=date.today())
+            for _ in range(transactions)
+        ])
+        return category
+
+    def refresh_token(self):
+        return str(RefreshToken.for_user(self.user))
+
+
+def transaction_body(seed):
+    return {"type": "E", "amount": "12.50", "date": "2025-01-15", "category": seed.categories[1].pk, "note": "budget"}
+
+
+# How to call each (route, method): returns (url kwargs, body, request format).
+# A new route needs an entry here as well as a declared budget.
+SCENARIOS = {
+    ("finance:category-list", "get"): lambda s: ({}, None, None),
+    ("finance:category-list", "post"): lambda s: ({}, {"name": f"New {s.unique()}"}, "json"),
+    ("finance:category-detail", "get"): lambda s: ({"pk": s.categories[0].pk}, None, None),
+    ("finance:category-detail", "put"): lambda s: ({"pk": s.category().pk}, {"name": f"Renamed {s.unique()}"}, "json"),
+    ("finance:category-detail", "patch"): lambda s: ({"pk": s.category().pk}, {"name": f"Patched {s.unique()}"}, "json"),
+    ("finance:category-detail", "delete"): lambda s: ({"pk": s.category().pk}, None, None),
+    ("finance:category-merge", "post"): lambda s: (
+        {"pk": s.category().pk}, {"sources": [s.category_in_use().pk, s.category_in_use().pk]}, "json"
+    ),
+    ("finance:transaction-list", "get"): lambda s: ({}, {"ordering": "-date"}, None),
+    ("finance:transaction-list", "post"): lambda s: ({}, transaction_body(s), "json"),
+    ("finance:transaction-detail", "get"): lambda s: ({"pk": s.transaction().pk}, None, None),
+    ("finance:transaction-detail", "put"): lambda s: ({"pk": s.transaction().pk}, transaction_body(s), "json"),
+    ("finance:transaction-detail", "patch"): lambda s: ({"pk": s.transaction().pk}, {"amount": "3.00"}, "json"),
+    ("finance:transaction-detail", "delete"): lambda s: ({"pk": s.transaction().pk}, None, None),
+    ("finance:transaction-by-category", "get"): lambda s: ({}, None, None),
+    ("finance:transaction-timeseries", "get"): lambda s: ({}, {"bucket": "week"}, None),
+    ("finance:transaction-bulk-create", "post"): lambda s: ({}, [transaction_body(s)] * 50, "json"),
+    ("finance:transaction-export", "get"): lambda s: ({}, {"output": "csv"}, None),
+    ("finance:dashboard-list", "get"): lambda s: ({}, None, None),
+    ("finance:dashboard-cache-stats", "get"): lambda s: ({}, None, None),
+    ("finance:import-list", "get"): lambda s: ({}, None, None),
+    ("finance:import-list", "post"): lambda s: (
+        {}, {"file": SimpleUploadedFile("statement.csv", b"date,amount\n2025-01-01,-5.00\n")}, "multipart"
+    ),
+    ("finance:import-detail", "get"): lambda s: ({"pk": s.job.pk}, None, None),
+    ("finance:async-dashboard", "get"): lambda s: ({}, None, None),
+    ("finance:async-dashboard-overview", "get"): lambda s: ({}, None, None),
+    ("finance:async-transaction-by-category", "get"): lambda s: ({}, None, None),
+    ("core:user-register", "post"): lambda s: (
+        {}, {"username": f"new{s.unique()}", "email": f"new{s.counter}@example.com", "password": "password123"}, "json"
+    ),
+    ("core:token_obtain_pair", "post"): lambda s: ({}, {"username": "budget", "password": "password123"}, "json"),
+    ("core:token_refresh", "post"): lambda s: ({}, {"refresh": s.refresh_token()}, "json"),
+    ("core:logout", "post"): lambda s: ({}, {"refresh": s.refresh_token()}, "json"),
+}
+
+# Password hashing dominates these; fewer samples keep the suite quick
+SLOW_ROUTES = {"core:user-register", "core:token_obtain_pair"}
+
+
+async def serially(*fns):
+    # Same queries as finance.async_views.run_concurrently, but on the
+    # test's own connection so they see its data and are captured
+    return [await sync_to_async(fn)() for fn in fns]
+
+
+def prepare(monkeypatch, settings, tmp_path):
+    """
+    Seed the data and return ``(seed, client)``, the client logged in as
+    the seeded (staff, for cache-stats) user. Uploads land in ``tmp_path``,
+    no import job is queued and the async views run their queries on the
+    test connection.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    settings.DEBUG_TOOLBAR_CONFIG = {"SHOW_TOOLBAR_CALLBACK": lambda request: False}
+    monkeypatch.setattr(async_views, "run_concurrently", serially)
+    monkeypatch.setattr("finance.views.process_import_job.delay", lambda job_id, user_id=None: None)
+
+    seed = Seed()
+    seed.user.is_staff = True
+    seed.user.save(update_fields=["is_staff"])
+    client = APIClient()
+    client.force_authenticate(seed.user)
+    return seed, client
+
+
+def request_for(seed, name, method):
+    """
+    Set up the scenario for (``name``, ``method``) and return a callable
+    that makes its request with a client, reading a streamed body to the
+    end. The setup's own queries happen here, not in the request.
+    """
+    kwargs, body, fmt = SCENARIOS[(name, method)](seed)
+    url = reverse(name, kwargs=kwargs)
+
+    def send(client):
+        response = getattr(client, method)(url, body, format=fmt) if fmt else getattr(client, method)(url, body)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+    return send
@@ -0,0 +1,93 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import CachedJWTAuthentication, user_key
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    cache.clear()
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+
+
+def authenticate(user):
+    request = APIClient().get("/").wsgi_request
+    request.META["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+    return CachedJWTAuthentication().authenticate(request)
+
+
+def test_second_request_reads_the_user_from_cache(user):
+    authenticate(user)
+    with CaptureQueriesContext(connection) as ctx:
+        cached, _ = authenticate(user)
+    assert len(ctx.captured_queries) == 0
+    assert cached == user and cached.email == "alice@example.com"
+
+
+@pytest.mark.parametrize("field, value", [
+    ("is_blocked", True),
+    ("role", User.Role.ROLE_ADMIN),
+    ("is_staff", True),
+])
+def test_auth_field_change_invalidates(user, field, value):
+    authenticate(user)
+    setattr(user, field, value)
+    user.save()
+    cached, _ = authenticate(user)
+    assert getattr(cached, field) == value
+
+
+def test_password_hash_is_not_cached(user):
+    authenticate(user)
+    assert user.password not in repr(cache.get(user_key(user.pk)))
+
+    cached, _ = authenticate(user)
+    assert "password" in cached.get_deferred_fields()
+    cached.first_name = "Alice"
+    cached.save()
+    user.refresh_from_db()
+    assert user.first_name == "Alice" and user.check_password("password123")
+    assert cached.check_password("password123")
+
+
+def test_password_change_invalidates(user):
+    authenticate(user)
+    user.set_password("new-password")
+    user.save()
+    cached, _ = authenticate(user)
+    assert cached.check_password("new-password")
+
+
+def test_other_fields_do_not_invalidate(user):
+    authenticate(user)
+    user.first_name = "Alice"
+    user.save()
+    with CaptureQueriesContext(connection) as ctx:
+        authenticate(user)
+    assert len(ctx.captured_queries) == 0
+
+
+def test_deactivated_and_deleted_users_are_rejected(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    url = reverse("finance:category-list")
+    assert client.get(url).status_code == 200
+
+    user.is_active = False
+    user.save()
+    assert client.get(url).status_code == 401
+
+    user.is_active = True
+    user.save()
+    assert client.get(url).status_code == 200
+
+    User.objects.filter(pk=user.pk).first().delete()
+    assert client.get(url).status_code == 401
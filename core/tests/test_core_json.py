@@ -0,0 +1,72 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from endpoints import EXEMPT, ROUTES, prepare, request_for
+
+PAYLOAD = {
+    "amount": "12.50",
+    "total_income": Decimal("1234.50"),
+    "tiny": Decimal("0.01"),
+    "date": date(2025, 1, 31),
+    "utc": datetime(2025, 1, 31, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    "offset": datetime(2025, 1, 31, 8, 30, tzinfo=dt_timezone(timedelta(hours=1))),
+    "naive": datetime(2025, 1, 31, 8, 30),
+    "time": time(9, 15),
+    "lazy": gettext_lazy("This field is required."),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "separators": "a b c",
+    "unicode": "café ✓",
+    "nested": ReturnDict({"ids": (1, 2), "none": None, "flag": True, "ratio": 0.6667}, serializer=None),
+    2025: "int key",
+}
+
+
+@pytest.mark.parametrize("media_type", [None, "application/json; indent=2", "application/json; indent=4"])
+def test_renderer_matches_drf(media_type):
+    assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+
+def test_renderer_empty_body():
+    assert ORJSONRenderer().render(None) == b""
+
+
+def test_parser_matches_drf():
+    body = '{"items": [{"amount": "12.50", "qty": 2, "price": 1.25, "note": "café"}], "ok": true}'.encode()
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+def test_parser_decodes_other_charsets():
+    body = '{"note": "café"}'.encode("latin-1")
+    assert ORJSONParser().parse(io.BytesIO(body), parser_context={"encoding": "latin-1"}) == {"note": "café"}
+
+
+@pytest.mark.parametrize("body", [b"{not json", b'{"amount": NaN}', b"[1, 2", b'{"a": Infinity}'])
+def test_parser_rejects_what_drf_rejects(body):
+    with pytest.raises(ParseError):
+        JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.parametrize("name, method, callback", ROUTES, ids=[f"{m.upper()} {n}" for n, m, _ in ROUTES])
+@pytest.mark.django_db
+def test_endpoint_payload_renders_like_drf(name, method, callback, monkeypatch, settings, tmp_path):
+    if name in EXEMPT:
+        pytest.skip("no database access")
+    seed, client = prepare(monkeypatch, settings, tmp_path)
+    response = request_for(seed, name, method)(client)
+    assert response.status_code < 400
+    if response.streaming or not hasattr(response, "data"):
+        pytest.skip("not rendered by a DRF renderer")
+    assert response.content == JSONRenderer().render(response.data)
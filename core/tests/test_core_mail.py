@@ -0,0 +1,61 @@
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+
+from core import mail as core_mail
+
+
+class RecordingBackend(EmailBackend):
+    """
+    locmem backend that counts connections and refuses some recipients.
+    """
+    opened = 0
+    refuse = set()
+
+    def open(self):
+        type(self).opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.refuse:
+                raise OSError("connection reset")
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    RecordingBackend.opened = 0
+    RecordingBackend.refuse = set()
+    monkeypatch.setattr(core_mail, "get_connection", lambda **kwargs: RecordingBackend(**kwargs))
+    return RecordingBackend
+
+
+def messages(count):
+    return [EmailMessage("Report", "body", "from@example.com", [f"user{i}@example.com"]) for i in range(count)]
+
+
+def test_reuses_one_connection_per_batch(backend):
+    assert core_mail.send_batched(messages(25), per_connection=10) == []
+    assert len(mail.outbox) == 25
+    assert backend.opened == 3
+
+
+def test_failed_messages_are_returned_and_the_rest_still_sent(backend):
+    backend.refuse = {"user3@example.com", "user7@example.com"}
+    batch = messages(10)
+    failed = core_mail.send_batched(batch, per_connection=10)
+    assert failed == [batch[3], batch[7]]
+    assert len(mail.outbox) == 8
+    # one connection for the batch, reopened after each failure
+    assert backend.opened == 3
+
+
+def test_unreachable_server_fails_the_whole_batch(backend, monkeypatch):
+    def refuse(self):
+        raise OSError("connection refused")
+    monkeypatch.setattr(backend, "open", refuse)
+    batch = messages(3)
+    assert core_mail.send_batched(batch) == batch
+    assert mail.outbox == []
@@ -0,0 +1,66 @@
+"""
+Query-count and latency budgets for every route in finance.urls and
+core.urls (see core/budgets.py).
+
+Each endpoint is called ITERATIONS times against seeded data, from a
+cold response cache. The worst query count must stay within the declared
+budget, and the 95th percentile latency within the budget multiplied
+by QUERY_BUDGET_LATENCY_SCALE (environment variable). The default of 3
+leaves room for slower machines than the one the budgets were set on;
+raise it on slow CI, or set 0 to skip the latency check.
+"""
+import math
+import os
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.budgets import budget_for
+from endpoints import EXEMPT, ROUTES, SCENARIOS, SLOW_ROUTES, prepare, request_for
+
+ITERATIONS = 20
+LATENCY_SCALE = float(os.environ.get("QUERY_BUDGET_LATENCY_SCALE", 3))
+
+
+def p95(samples):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+
+
+@pytest.mark.parametrize("name, method, callback", ROUTES, ids=[f"{m.upper()} {n}" for n, m, _ in ROUTES])
+@pytest.mark.django_db
+def test_endpoint_within_budget(name, method, callback, monkeypatch, settings, tmp_path):
+    if name in EXEMPT:
+        pytest.skip("no database access")
+    budget = budget_for(callback, method)
+    assert budget is not None, f"{method.upper()} {name} declares no QueryBudget (see core/budgets.py)"
+    assert (name, method) in SCENARIOS, f"{method.upper()} {name} has no scenario in this harness"
+
+    seed, client = prepare(monkeypatch, settings, tmp_path)
+    iterations = 5 if name in SLOW_ROUTES else ITERATIONS
+    latencies, query_counts = [], []
+    for _ in range(iterations):
+        send = request_for(seed, name, method)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = send(client)
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code < 400, (name, method, response.status_code, getattr(response, "content", b"")[:500])
+        query_counts.append(len(ctx.captured_queries))
+
+    assert max(query_counts) <= budget.queries, (
+        f"{method.upper()} {name}: {max(query_counts)} queries, budget {budget.queries}:\n"
+        + "\n".join(q["sql"] for q in ctx.captured_queries)
+    )
+    assert not LATENCY_SCALE or p95(latencies) <= budget.p95_ms * LATENCY_SCALE, (
+        f"{method.upper()} {name}: p95 {p95(latencies):.1f} ms, budget {budget.p95_ms} ms x {LATENCY_SCALE}"
+    )
+
+
+def test_every_scenario_matches_a_route():
+    routes = {(name, method) for name, method, _ in ROUTES}
+    assert set(SCENARIOS) <= routes
@@ -0,0 +1,132 @@
+"""
+The replica router and middleware against two local databases: 'default'
+as the primary and 'replica' as a replica that has fallen behind it.
+"""
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import tasks
+from core.routers import is_pinned, read_from_replica
+from finance.models import Category, Transaction
+from finance.views import TransactionViewSet
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+@pytest.fixture
+def user():
+    """
+    Alice with a category on both databases, and a transaction that has
+    not reached the replica yet.
+    """
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    salary = Category.objects.create(user=alice, name="Salary")
+    alice.save(using="replica")
+    salary.save(using="replica")
+    Transaction.objects.create(category=salary, type="I", amount=Decimal("100.00"))
+    return alice
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+def test_reads_follow_read_from_replica(replica, user):
+    assert router.db_for_read(Transaction) == "default"
+    with read_from_replica():
+        assert router.db_for_read(Transaction) == "replica"
+        assert router.db_for_write(Transaction) == "default"
+        assert not Transaction.objects.exists()
+        # Inside a transaction on the primary, reads stay with it
+        with transaction.atomic():
+            assert router.db_for_read(Transaction) == "default"
+    assert Transaction.objects.exists()
+
+
+def test_no_replicas_means_primary(user, settings):
+    settings.DATABASE_REPLICAS = []
+    with read_from_replica() as alias:
+        assert alias is None
+        assert router.db_for_read(Transaction) == "default"
+
+
+def test_listed_actions_read_from_the_replica(replica, client):
+    assert client.get(reverse("finance:transaction-list")).json()["count"] == 0
+    assert client.get(reverse("finance:dashboard-list")).json()["total_income"] == 0
+    assert client.get(reverse("finance:transaction-by-category")).json() == []
+
+
+def test_other_actions_read_from_the_primary(replica, client, user):
+    pk = Transaction.objects.get(user=user).pk
+    assert client.get(reverse("finance:transaction-detail", args=[pk])).status_code == 200
+
+
+def test_a_write_pins_the_user_to_the_primary(replica, client, user):
+    category = Category.objects.get(user=user)
+    response = client.post(
+        reverse("finance:transaction-list"),
+        {"category": category.pk, "type": "E", "amount": "30.00"},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert is_pinned(user.pk)
+    assert client.get(reverse("finance:transaction-list")).json()["count"] == 2
+
+
+def test_without_replicas_everything_reads_the_primary(client, settings):
+    settings.DATABASE_REPLICAS = []
+    assert client.get(reverse("finance:transaction-list")).json()["count"] == 1
+
+
+def test_report_tasks_read_from_the_replica(replica, user):
+    with CaptureQueriesContext(connections["default"]) as primary, \
+            CaptureQueriesContext(connections["replica"]) as replica_queries:
+        tasks.send_user_summary_report(user.pk)
+    assert not primary.captured_queries
+    assert replica_queries.captured_queries
+
+
+def test_a_write_pins_the_user_before_it_runs(replica, client, user, monkeypatch):
+    pinned = []
+    perform_create = TransactionViewSet.perform_create
+
+    def record_pin(view, serializer):
+        pinned.append(is_pinned(user.pk))
+        perform_create(view, serializer)
+
+    monkeypatch.setattr(TransactionViewSet, "perform_create", record_pin)
+    category = Category.objects.get(user=user)
+    response = client.post(
+        reverse("finance:transaction-list"),
+        {"category": category.pk, "type": "E", "amount": "30.00"},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert pinned == [True]
+
+
+def test_replica_reads_are_not_cached(replica, client, settings):
+    assert client.get(reverse("finance:dashboard-list")).json()["total_income"] == 0
+    assert client.get(reverse("finance:transaction-by-category")).json() == []
+
+    settings.DATABASE_REPLICAS = []
+    assert Decimal(str(client.get(reverse("finance:dashboard-list")).json()["total_income"])) == Decimal("100.00")
+    assert len(client.get(reverse("finance:transaction-by-category")).json()) == 1
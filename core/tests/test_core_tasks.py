@@ -0,0 +1,119 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.mail.backends.locmem import EmailBackend
+
+from core import mail as core_mail
+from core import tasks
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+def make_user(name, **kwargs):
+    return User.objects.create_user(username=name, email=f"{name}@example.com", password="password", **kwargs)
+
+
+def add(user, type_, amount, day, note=None):
+    category, _ = Category.objects.get_or_create(user=user, name="General")
+    return Transaction.objects.create(category=category, type=type_, amount=Decimal(amount), date=day, note=note)
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tasks.send_summary_reports_chunk, "delay", lambda *args: calls.append(args))
+    return calls
+
+
+@pytest.mark.django_db
+def test_fan_out_skips_inactive_and_idle_users(queued):
+    today = date.today()
+    busy = [make_user(f"busy{i}") for i in range(5)]
+    for user in busy:
+        add(user, "E", "1.00", today)
+    make_user("idle")
+    old = make_user("old")
+    add(old, "E", "1.00", today - timedelta(days=30))
+    gone = make_user("gone", is_active=False)
+    add(gone, "E", "1.00", today)
+
+    stats = tasks.enqueue_weekly_reports(chunk_size=2)
+
+    assert [ids for ids, *_ in queued] == [[u.pk for u in busy[:2]], [u.pk for u in busy[2:4]], [busy[4].pk]]
+    assert queued[0][1:] == ("weekly", (today - timedelta(days=7)).isoformat(), today.isoformat())
+    assert stats["active_users"] == 7
+    assert stats["users_with_activity"] == 5
+    assert stats["tasks"] == 3
+    assert stats["messages_saved"] == 4
+    assert stats["queries_saved"] == (1 + 5 * 7) - (2 + 3 * 3)
+
+
+@pytest.mark.django_db
+def test_chunk_sends_reports_with_three_queries(mailoutbox, django_assert_num_queries):
+    today = date.today()
+    alice, bob = make_user("alice"), make_user("bob")
+    add(alice, "I", "100.00", today - timedelta(days=1))
+    for i in range(7):
+        add(alice, "E", f"{i + 1}.00", today - timedelta(days=2), note=f"item {i}")
+    add(alice, "E", "999.00", today - timedelta(days=20))   # outside the week
+    add(bob, "E", "5.00", today)
+
+    start, end = tasks.report_range("weekly")
+    with django_assert_num_queries(3):
+        sent = tasks.send_summary_reports_chunk([alice.pk, bob.pk], "weekly", start.isoformat(), end.isoformat())
+
+    assert sent == 2
+    bodies = {mail.to[0]: mail.body for mail in mailoutbox}
+    alice_body = bodies["alice@example.com"]
+    assert "Total Income: $100.00" in alice_body
+    assert "Total Expenses: $28.00" in alice_body
+    assert alice_body.count("\n- ") == 5
+    assert "item 6" in alice_body and "item 1" not in alice_body and "999.00" not in alice_body
+    assert "Total Expenses: $5.00" in bodies["bob@example.com"]
+
+
+@pytest.mark.django_db
+def test_chunk_matches_single_user_report(mailoutbox):
+    today = date.today()
+    user = make_user("carol")
+    add(user, "I", "50.00", today)
+    add(user, "E", "20.00", today, note="lunch")
+
+    tasks.send_user_summary_report(user.pk)
+    start, end = tasks.report_range("weekly")
+    tasks.send_summary_reports_chunk([user.pk], "weekly", start.isoformat(), end.isoformat())
+
+    single, chunked = mailoutbox
+    assert (single.subject, single.body) == (chunked.subject, chunked.body)
+
+
+@pytest.mark.django_db
+def test_chunk_retries_only_failed_recipients(mailoutbox, monkeypatch):
+    today = date.today()
+    users = [make_user(f"user{i}") for i in range(4)]
+    for user in users:
+        add(user, "E", "1.00", today)
+
+    class FlakyBackend(EmailBackend):
+        def send_messages(self, messages):
+            if any(to == "user2@example.com" for message in messages for to in message.to):
+                raise OSError("mailbox unavailable")
+            return super().send_messages(messages)
+
+    retried = []
+
+    def retry(**kwargs):
+        retried.append(kwargs["args"])
+        return RuntimeError("retry")
+
+    monkeypatch.setattr(core_mail, "get_connection", lambda **kwargs: FlakyBackend(**kwargs))
+    monkeypatch.setattr(tasks.send_summary_reports_chunk, "retry", retry)
+
+    start, end = tasks.report_range("weekly")
+    with pytest.raises(RuntimeError):
+        tasks.send_summary_reports_chunk([u.pk for u in users], "weekly", start.isoformat(), end.isoformat())
+
+    assert sorted(mail.to[0] for mail in mailoutbox) == ["user0@example.com", "user1@example.com", "user3@example.com"]
+    assert retried == [[[users[2].pk], "weekly", start.isoformat(), end.isoformat()]]
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core import tasks, tokens
+from core.tokens import RefreshToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    cache.clear()
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+
+
+@pytest.fixture
+def cache_backend(settings):
+    settings.TOKEN_BLACKLIST_BACKEND = "cache"
+
+
+def refresh(token):
+    return APIClient().post(reverse("core:token_refresh"), {"refresh": str(token)}, format="json")
+
+
+@pytest.mark.parametrize("backend", ["cache", "database"])
+def test_rotated_token_is_rejected(user, settings, backend):
+    settings.TOKEN_BLACKLIST_BACKEND = backend
+    token = RefreshToken.for_user(user)
+    response = refresh(token)
+    assert response.status_code == 200
+    assert refresh(token).status_code == 401
+    assert refresh(response.data["refresh"]).status_code == 200
+
+
+def test_cache_backend_refresh_touches_no_token_tables(user, cache_backend):
+    token = RefreshToken.for_user(user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert refresh(token).status_code == 200
+    assert len(ctx.captured_queries) == 1  # the user lookup
+    assert not OutstandingToken.objects.exists()
+
+
+def test_blacklist_expires_with_the_token(user, cache_backend, monkeypatch):
+    timeouts = []
+    monkeypatch.setattr(tokens.cache, "set", lambda key, value, timeout: timeouts.append(timeout))
+    token = RefreshToken.for_user(user)
+    token.set_exp(lifetime=timedelta(minutes=10))
+    token.blacklist()
+    assert 599 <= timeouts[0] <= 601
+
+
+def test_logout_blacklists_in_cache(user, cache_backend):
+    token = RefreshToken.for_user(user)
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.post(reverse("core:logout"), {"refresh": str(token)}, format="json").status_code == 205
+    assert refresh(token).status_code == 401
+
+
+def test_sync_copies_database_blacklist(user, settings):
+    token = RefreshToken.for_user(user)
+    token.blacklist()
+    settings.TOKEN_BLACKLIST_BACKEND = "cache"
+    assert refresh(token).status_code == 200  # not in the cache yet
+
+    token = RefreshToken.for_user(user)
+    settings.TOKEN_BLACKLIST_BACKEND = "database"
+    token.blacklist()
+    settings.TOKEN_BLACKLIST_BACKEND = "cache"
+    call_command("sync_token_blacklist", stdout=StringIO())
+    assert refresh(token).status_code == 401
+
+
+def test_purge_deletes_expired_tokens_in_batches(user):
+    now = timezone.now()
+    for i in range(5):
+        expired = OutstandingToken.objects.create(
+            user=user, jti=f"expired-{i}", token="x", created_at=now - timedelta(days=2), expires_at=now - timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(token=expired)
+    live = OutstandingToken.objects.create(
+        user=user, jti="live", token="x", created_at=now, expires_at=now + timedelta(days=1)
+    )
+    BlacklistedToken.objects.create(token=live)
+
+    assert tasks.purge_expired_tokens(batch_size=2) == 5
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["live"]
+    assert list(BlacklistedToken.objects.values_list("token__jti", flat=True)) == ["live"]
@@ -0,0 +1,107 @@
+# core/tokens.py
+"""
+Refresh tokens with a cache-backed blacklist.
+
+simplejwt's blacklist app records every issued refresh token in
+``OutstandingToken`` and every rotated or logged-out one in
+``BlacklistedToken``, and never deletes either. With
+``TOKEN_BLACKLIST_BACKEND = 'cache'`` this ``RefreshToken`` instead
+stores blacklisted JTIs in the cache (Redis), each with a timeout equal
+to the token's remaining lifetime, so entries expire together with the
+token they block. No outstanding list is kept in that mode; the admin's
+token pages only show tokens issued under the database backend.
+
+The cache backend is only safe with a cache shared by every worker and
+persisted like the rest of Redis; the default is ``'database'`` unless
+``REDIS_CACHE_URL`` is set. Under the database backend
+``purge_expired_tokens`` (core.tasks, daily) deletes expired rows in
+batches. After switching to the cache backend, run
+``manage.py sync_token_blacklist`` once so that tokens blacklisted in the
+database stay rejected until they expire.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+def blacklist_key(jti):
+    return f"jwt:blacklist:{jti}"
+
+
+def cache_backend():
+    return settings.TOKEN_BLACKLIST_BACKEND == "cache"
+
+
+def blacklist_jti(jti, exp):
+    """
+    Blacklist ``jti`` in the cache until ``exp`` (epoch seconds).
+    """
+    remaining = int(exp - time.time()) + 1
+    if remaining > 0:
+        cache.set(blacklist_key(jti), True, timeout=remaining)
+
+
+class RefreshToken(BaseRefreshToken):
+    def check_blacklist(self):
+        if not cache_backend():
+            return super().check_blacklist()
+        if cache.get(blacklist_key(self.payload[api_settings.JTI_CLAIM])):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        if not cache_backend():
+            return super().blacklist()
+        blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+
+    def outstand(self):
+        if not cache_backend():
+            return super().outstand()
+
+    @classmethod
+    def for_user(cls, user):
+        if not cache_backend():
+            return super().for_user(user)
+        # Skip BlacklistMixin.for_user, which records an OutstandingToken
+        return super(BlacklistMixin, cls).for_user(user)
+
+
+def copy_blacklist_to_cache():
+    """
+    Copy the unexpired database blacklist into the cache. Returns the
+    number of tokens copied.
+    """
+    rows = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()).values_list(
+        "token__jti", "token__expires_at"
+    )
+    copied = 0
+    for jti, expires_at in rows.iterator(chunk_size=2000):
+        blacklist_jti(jti, expires_at.timestamp())
+        copied += 1
+    return copied
+
+
+def purge_expired_tokens(batch_size):
+    """
+    Delete expired outstanding tokens (and their blacklist entries),
+    ``batch_size`` rows per statement so no single DELETE holds locks for
+    long. Returns the number of outstanding tokens deleted.
+    """
+    now = aware_utcnow()
+    deleted = 0
+    while True:
+        # Expired tokens are the oldest, so walking the primary key stops early
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        _, per_model = OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += per_model.get(OutstandingToken._meta.label, 0)
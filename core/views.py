@@ -5,16 +5,19 @@ from rest_framework.views import APIView
 
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
-from .serializers import UserSerializer
+from .serializers import TokenObtainPairSerializer, TokenRefreshSerializer, UserSerializer
 from .permissions import IsAdminOrReadOnly
 from .serializers import LogoutSerializer
+from .budgets import QueryBudget
+from .tokens import RefreshToken
 User = get_user_model()
 class UserRegisterView(generics.CreateAPIView):
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
     permission_classes=[AllowAny]
+    # Latency is dominated by password hashing
+    query_budgets = {'post': QueryBudget(queries=4, p95_ms=2000)}
     
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -23,13 +26,20 @@ class RegisterView(generics.CreateAPIView):
 
 class LoginView(TokenObtainPairView):
     permission_classes = [AllowAny]
+    serializer_class = TokenObtainPairSerializer
+    query_budgets = {'post': QueryBudget(queries=2, p95_ms=2000)}
 
 class RefreshTokenView(TokenRefreshView):
     permission_classes = [AllowAny]
+    serializer_class = TokenRefreshSerializer
+    # Rotation + blacklisting: outstanding/blacklisted token lookups and inserts
+    # under the database blacklist; a single user lookup under the cache one
+    query_budgets = {'post': QueryBudget(queries=13, p95_ms=100)}
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = LogoutSerializer
+    query_budgets = {'post': QueryBudget(queries=7, p95_ms=75)}
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -0,0 +1,132 @@
+# finance/archive.py
+"""
+Cold storage for old transactions.
+
+``archive_before`` moves every transaction dated before a cutoff out of
+``Transaction`` into ``ArchivedTransaction`` (same ids, same timestamps),
+so the live table and its indexes only carry recent history. It works in
+batches of FINANCE_ARCHIVE_BATCH_SIZE rows, each in its own short
+database transaction; rows another transaction has locked are skipped
+and picked up by the next run.
+
+Archived rows keep their daily rollups, so ``financial_summary`` and
+running balances stay exact over any range. Per-category figures come
+from ``YearlyCategoryTotal``, which gets one row per user, category, year
+and type as rows are archived. Archived rows are read back through
+``?include_archived=true`` on the transaction list and detail endpoints.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from finance.cache import invalidate_user
+from finance.models import ArchivedTransaction, Transaction, YearlyCategoryTotal
+from finance.rollups import upsert_totals
+
+logger = logging.getLogger(__name__)
+
+# Copied as they are, in ArchivedTransaction's field order
+FIELDS = ('id', 'type', 'amount', 'note', 'category_id', 'user_id', 'date', 'created_at', 'updated_at')
+YEARLY_KEY = ('user_id', 'category_id', 'year', 'type')
+
+
+def archive_cutoff(today=None, months=None):
+    """
+    First day of the month ``months`` (FINANCE_ARCHIVE_AFTER_MONTHS)
+    months before ``today``; transactions dated before it get archived.
+    """
+    today = today or timezone.localdate()
+    months = settings.FINANCE_ARCHIVE_AFTER_MONTHS if months is None else months
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _delete_live(ids, cutoff):
+    """
+    Delete the archived ``ids`` from the live table without going through
+    ``QuerySet.delete()``, whose ``post_delete`` handling would take the
+    rows out of the rollups (finance.signals).
+    """
+    connection = connections[router.db_for_write(Transaction)]
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        # The date bound lets a partitioned table skip the recent partitions
+        cursor.execute(
+            f"DELETE FROM {qn(Transaction._meta.db_table)} WHERE {qn('date')} < %s AND {qn('id')} IN ({placeholders})",
+            [cutoff, *ids],
+        )
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Archive up to ``batch_size`` transactions dated before ``cutoff`` in
+    one database transaction. Returns the ids of the owners concerned and
+    the number of rows moved.
+    """
+    with transaction.atomic(using=router.db_for_write(Transaction)):
+        rows = list(
+            Transaction.objects.filter(date__lt=cutoff)
+            .order_by()
+            .select_for_update(skip_locked=True)
+            .values(*FIELDS)[:batch_size]
+        )
+        if not rows:
+            return set(), 0
+
+        ArchivedTransaction.objects.bulk_create(ArchivedTransaction(**row) for row in rows)
+        deltas = defaultdict(lambda: (Decimal("0"), 0))
+        for row in rows:
+            key = (row['user_id'], row['category_id'], row['date'].year, row['type'])
+            total, count = deltas[key]
+            deltas[key] = (total + row['amount'], count + 1)
+        upsert_totals(YearlyCategoryTotal, YEARLY_KEY, deltas)
+        _delete_live([row['id'] for row in rows], cutoff)
+
+    return {row['user_id'] for row in rows}, len(rows)
+
+
+def archive_before(cutoff, *, batch_size=None):
+    """
+    Archive every transaction dated before ``cutoff``, ``batch_size``
+    (FINANCE_ARCHIVE_BATCH_SIZE) rows at a time. Returns the number of
+    transactions archived.
+    """
+    batch_size = batch_size or settings.FINANCE_ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        user_ids, moved = archive_batch(cutoff, batch_size)
+        for user_id in user_ids:
+            invalidate_user(user_id)
+        archived += moved
+        if moved < batch_size:
+            break
+    if archived:
+        logger.info(f"archive_before: archived {archived} transactions dated before {cutoff}")
+    return archived
+
+
+def move_yearly_totals(source_ids, target):
+    """
+    Fold the yearly totals of the ``source_ids`` categories into those of
+    ``target`` (a category merge, see finance.services).
+    """
+    sources = YearlyCategoryTotal.objects.filter(category_id__in=source_ids)
+    grouped = (
+        sources.order_by()
+        .values_list('user', 'year', 'type')
+        .annotate(sum_total=Sum('total'), sum_count=Sum('count'))
+    )
+    deltas = {
+        (user_id, target.pk, year, type_): (total, count)
+        for user_id, year, type_, total, count in grouped
+    }
+    if deltas:
+        upsert_totals(YearlyCategoryTotal, YEARLY_KEY, deltas)
+        sources.delete()
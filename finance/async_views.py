@@ -0,0 +1,151 @@
+# finance/async_views.py
+"""
+Async (ASGI) read endpoints for the dashboard.
+
+DRF views are synchronous, so these are plain Django async views that
+authenticate with the same DRF authentication classes and render with
+the project's JSON renderer, returning the same payloads as their sync
+counterparts.
+
+Django's async ORM methods (``aaggregate``, ``async for``) run their
+queries one at a time on a single shared thread. So each view runs one
+query through the async ORM and starts the others alongside it with
+``run_concurrently``, which gives each of them its own worker thread and
+database connection. A request then takes about as long as its slowest
+query, not the sum of all of them.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.budgets import QueryBudget, query_budgets
+from core.renderers import ORJSONRenderer
+
+from .models import Transaction
+from .serializers import TransactionSerializer
+from .services import (
+    category_totals_queries,
+    category_totals_rows,
+    summary_from_sums,
+    summary_rollups,
+)
+
+RECENT_TRANSACTIONS = 5
+
+
+def _in_own_connection(fn):
+    def run():
+        try:
+            return fn()
+        finally:
+            # Worker threads don't go through request_finished, so apply
+            # CONN_MAX_AGE here instead of leaking one connection per thread
+            close_old_connections()
+    return run
+
+
+async def run_concurrently(*fns):
+    """
+    Run the blocking callables ``fns`` at the same time, each on its own
+    thread (and so its own connection), and return their results in order.
+    """
+    return await asyncio.gather(
+        *(sync_to_async(_in_own_connection(fn), thread_sensitive=False)() for fn in fns)
+    )
+
+
+async def authenticate(request):
+    """
+    The user authenticated by ``DEFAULT_AUTHENTICATION_CLASSES`` (JWT or
+    session), or ``None``.
+    """
+    drf_request = Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    user = await sync_to_async(lambda: drf_request.user)()
+    return user if user.is_authenticated else None
+
+
+def api_view(view):
+    """
+    Authenticate (401 otherwise) and render the returned data as DRF would.
+    """
+    @require_GET
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except APIException as exc:
+            return JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        data = await view(request, user, *args, **kwargs)
+        return HttpResponse(ORJSONRenderer().render(data), content_type=ORJSONRenderer.media_type)
+    return wrapper
+
+
+def _recent_transactions(user):
+    recent = (
+        Transaction.objects.filter(user=user)
+        .select_related('category')
+        .order_by('-date', '-id')[:RECENT_TRANSACTIONS]
+    )
+    return TransactionSerializer(recent, many=True).data
+
+
+@query_budgets(get=QueryBudget(queries=1, p95_ms=50))
+@api_view
+async def dashboard(request, user):
+    """
+    GET /async/dashboard/  →  same payload as /dashboard/
+    """
+    qs, aggregates = summary_rollups(user=user)
+    return summary_from_sums(await qs.aaggregate(**aggregates))
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+@query_budgets(get=QueryBudget(queries=2, p95_ms=50))
+@api_view
+async def by_category(request, user):
+    """
+    GET /async/transactions/by-category/  →  same payload as /transactions/by-category/
+    """
+    grouped, names = category_totals_queries(user)
+    grouped, (names,) = await asyncio.gather(_alist(grouped), run_concurrently(lambda: list(names)))
+    return category_totals_rows(grouped, names)
+
+
+@query_budgets(get=QueryBudget(queries=4, p95_ms=100))
+@api_view
+async def overview(request, user):
+    """
+    GET /async/dashboard/overview/  →  {'summary', 'by_category', 'recent'}
+
+    The summary, the two by-category queries and the recent transactions
+    all run concurrently.
+    """
+    qs, aggregates = summary_rollups(user=user)
+    grouped, names = category_totals_queries(user)
+    sums, (grouped, names, recent) = await asyncio.gather(
+        qs.aaggregate(**aggregates),
+        run_concurrently(
+            lambda: list(grouped),
+            lambda: list(names),
+            lambda: _recent_transactions(user),
+        ),
+    )
+    return {
+        "summary": summary_from_sums(sums),
+        "by_category": category_totals_rows(grouped, names),
+        "recent": recent,
+    }
@@ -0,0 +1,76 @@
+# finance/cache.py
+"""
+Shared response cache for the per-user aggregate endpoints
+(dashboard, by-category).
+
+Entries are keyed on the user's data version, which is bumped on every
+Category/Transaction write for that user (see finance.signals).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+
+from core.cache import bump_version, get_version, incr_counter
+from core.routers import reads_from_replica
+
+from .models import Transaction
+
+NAMESPACE = "finance"
+HITS_KEY = "finance:response-cache:hits"
+MISSES_KEY = "finance:response-cache:misses"
+
+
+def user_version(user_id):
+    return get_version(NAMESPACE, user_id)
+
+
+def invalidate_user(user_id):
+    """
+    Bump now so the writer's own reads miss, and again after commit so a
+    concurrent reader can't leave pre-commit data behind under the new version.
+    """
+    if user_id is None:
+        return
+    bump_version(NAMESPACE, user_id)
+    # After the commit of the database holding the user's data (their shard)
+    transaction.on_commit(lambda: bump_version(NAMESPACE, user_id), using=router.db_for_write(Transaction))
+
+
+def response_key(name, request):
+    params = sorted(request.query_params.lists())
+    digest = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+    user_id = request.user.pk
+    return f"{NAMESPACE}:response:{name}:{user_id}:{user_version(user_id)}:{digest}"
+
+
+def cached_response(name, request, compute):
+    """
+    Return the cached payload for this endpoint, user and query string,
+    calling ``compute()`` and storing its result on a miss, unless it
+    was read from a replica.
+    """
+    key = response_key(name, request)
+    data = cache.get(key)
+    if data is not None:
+        incr_counter(HITS_KEY)
+        return data
+
+    incr_counter(MISSES_KEY)
+    data = compute()
+    if not reads_from_replica(Transaction):
+        cache.set(key, data, timeout=settings.FINANCE_RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def cache_stats():
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
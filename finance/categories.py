@@ -0,0 +1,69 @@
+# finance/categories.py
+"""
+Per-user category map: ``{id: Category}`` for every category a user owns.
+
+Ownership checks (transaction serializers, the ``category`` filter, bulk
+create) and name uniqueness (``CategorySerializer``) are answered from
+it instead of one query per call site. The map is kept on the request,
+so one request loads it at most once, and in the shared cache under a
+per-user version that every Category write bumps (see finance.signals;
+the statement importer bumps it after creating categories in bulk).
+Transaction writes leave it alone.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+
+from core.cache import bump_version, get_version
+from core.routers import reads_from_replica
+
+from .models import Category
+
+NAMESPACE = "finance-categories"
+
+# Loaded fields, in Category's concrete field order (see Model.from_db)
+FIELDS = ('id', 'name', 'user_id')
+
+
+def invalidate_categories(user_id):
+    bump_version(NAMESPACE, user_id)
+    transaction.on_commit(lambda: bump_version(NAMESPACE, user_id), using=router.db_for_write(Category))
+
+
+def _rows(user_id):
+    key = f"{NAMESPACE}:{user_id}:{get_version(NAMESPACE, user_id)}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(Category.objects.filter(user_id=user_id).order_by('id').values_list(*FIELDS))
+        # A replica may be behind the version in the key
+        if not reads_from_replica(Category):
+            cache.set(key, rows, timeout=settings.FINANCE_RESPONSE_CACHE_TIMEOUT)
+    return rows
+
+
+def category_map(user, request=None):
+    """
+    ``{id: Category}`` for ``user``'s categories. The instances carry
+    ``id``, ``name`` and ``user_id``; other fields are deferred. Pass the
+    ``request`` to share one map between everything serving it.
+    """
+    if request is not None and getattr(request, '_category_map_user', None) == user.pk:
+        return request._category_map
+    db = Category.objects.db
+    categories = {row[0]: Category.from_db(db, FIELDS, row) for row in _rows(user.pk)}
+    if request is not None:
+        request._category_map_user = user.pk
+        request._category_map = categories
+    return categories
+
+
+def find_by_name(categories, name, exclude=None):
+    """
+    The category in ``categories`` named ``name`` (case-insensitively),
+    ignoring ``exclude``, or ``None``.
+    """
+    folded = name.casefold()
+    for category in categories.values():
+        if category.name.casefold() == folded and category != exclude:
+            return category
+    return None
@@ -0,0 +1,52 @@
+# finance/exports.py
+"""
+Row generators for the streaming transaction export.
+
+Rows are pulled with ``.values_list().iterator(chunk_size=…)``, which on
+Postgres reads through a server-side cursor, so memory use is bounded
+by the chunk size whatever the size of the user's history.
+"""
+import csv
+import json
+
+EXPORT_COLUMNS = ('id', 'type', 'amount', 'date', 'note', 'category', 'category_name')
+_QUERY_COLUMNS = ('id', 'type', 'amount', 'date', 'note', 'category_id', 'category__name')
+
+
+class _Echo:
+    """
+    File-like object whose ``write`` just hands the line back, so
+    ``csv.writer`` can be driven one row at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, chunk_size):
+    return queryset.values_list(*_QUERY_COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def csv_lines(queryset, *, chunk_size):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for pk, type_, amount, day, note, category_id, category_name in _rows(queryset, chunk_size):
+        yield writer.writerow((pk, type_, f"{amount:.2f}", day.isoformat(), note or "", category_id, category_name))
+
+
+def ndjson_lines(queryset, *, chunk_size):
+    for pk, type_, amount, day, note, category_id, category_name in _rows(queryset, chunk_size):
+        yield json.dumps({
+            'id': pk,
+            'type': type_,
+            'amount': f"{amount:.2f}",
+            'date': day.isoformat(),
+            'note': note,
+            'category': category_id,
+            'category_name': category_name,
+        }) + "\n"
+
+
+FORMATS = {
+    'csv': (csv_lines, 'text/csv', 'csv'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson', 'ndjson'),
+}
@@ -1,7 +1,43 @@
 # transactions/filters.py
 
 import django_filters
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .categories import category_map
 from .models import Transaction, Category
+from .search import search_transactions
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    ``ModelChoiceField`` that looks the submitted id up in the request's
+    category map (finance.categories) instead of querying the queryset,
+    which is only used to list the choices.
+    """
+    def __init__(self, *args, request=None, **kwargs):
+        self.request = request
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if self.request is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            category = category_map(self.request.user, self.request).get(int(value))
+        except (TypeError, ValueError):
+            category = None
+        if category is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value}
+            )
+        return category
+
+
+class CategoryFilter(django_filters.ModelChoiceFilter):
+    field_class = CategoryChoiceField
+
 
 class TransactionFilter(django_filters.FilterSet):
     # Date range
@@ -28,7 +64,7 @@ class TransactionFilter(django_filters.FilterSet):
     )
 
     # Category is declared up-front with no choices
-    category = django_filters.ModelChoiceFilter(
+    category = CategoryFilter(
         field_name='category',
         queryset=Category.objects.none(),
         label='Category'
@@ -46,6 +82,12 @@ class TransactionFilter(django_filters.FilterSet):
         label='Note contains'
     )
 
+    # Ranked search over note and category name (trigram-indexed on Postgres)
+    search = django_filters.CharFilter(
+        method='filter_search',
+        label='Search note and category name'
+    )
+
     class Meta:
         model = Transaction
         fields = [
@@ -54,15 +96,21 @@ class TransactionFilter(django_filters.FilterSet):
             'type',
             'category', 'category_name',
             'note',
+            'search',
         ]
 
     def __init__(self, data=None, queryset=None, *, request=None, prefix=None):
         """
         Override __init__ to inject only this user's categories into the
         `category` filter's queryset. DjangoFilterBackend will pass
-        `request=` when it instantiates this FilterSet.
+        `request=` when it instantiates this FilterSet; the submitted id is
+        checked against that request's category map.
         """
         super().__init__(data=data, queryset=queryset, request=request, prefix=prefix)
         user = getattr(request, 'user', None)
         if user and not user.is_anonymous:
             self.filters['category'].queryset = Category.objects.filter(user=user)
+            self.filters['category'].extra['request'] = request
+
+    def filter_search(self, queryset, name, value):
+        return search_transactions(queryset, value, user=self.request.user)
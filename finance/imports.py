@@ -0,0 +1,287 @@
+# finance/imports.py
+"""
+Streaming CSV / OFX statement import behind ``ImportJob``.
+
+The file is parsed as a stream of records; every ``chunk_size`` records
+are inserted with ``bulk_create`` in one transaction that also applies
+the rollup deltas and advances the job's ``rows_processed`` marker.
+A job picked up again after a crash skips the rows already committed.
+"""
+import csv
+import re
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from core.routers import pin_to_primary
+from finance import rollups
+from finance.cache import invalidate_user
+from finance.categories import invalidate_categories
+from finance.models import Category, ImportJob, Transaction
+
+
+class ImportFileError(ValueError):
+    """
+    The file as a whole can't be imported (bad header, unreadable).
+    """
+
+
+class RowError(ValueError):
+    """
+    A single record is invalid; it is reported and skipped.
+    """
+
+
+class _ByteCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, data):
+        self.count += len(data)
+        return data
+
+
+# ---------------------------------------------------------------- parsers
+
+CSV_REQUIRED_COLUMNS = {'date', 'amount'}
+
+
+def csv_records(fileobj, counter):
+    """
+    Rows of a CSV with a header containing at least ``date`` and
+    ``amount`` and optionally ``type``, ``category`` and ``note``.
+    """
+    reader = csv.DictReader(_csv_lines(fileobj, counter))
+    try:
+        columns = {(name or '').strip().lower() for name in (reader.fieldnames or [])}
+        missing = CSV_REQUIRED_COLUMNS - columns
+        if missing:
+            raise ImportFileError(f"CSV header is missing column(s): {', '.join(sorted(missing))}.")
+        for row in reader:
+            yield {(key or '').strip().lower(): (value or '').strip() for key, value in row.items() if key}
+    except csv.Error as exc:
+        raise ImportFileError(f"CSV is malformed after line {reader.line_num}: {exc}.")
+
+
+def _csv_lines(fileobj, counter):
+    for line_number, raw in enumerate(fileobj, start=1):
+        try:
+            yield counter(raw).decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ImportFileError(f"Line {line_number} is not valid UTF-8; save the file as UTF-8 and upload it again.")
+
+
+_OFX_FIELDS = {'DTPOSTED': 'date', 'TRNAMT': 'amount', 'NAME': 'note', 'MEMO': 'memo'}
+
+
+def ofx_records(fileobj, counter, *, read_size=64 * 1024):
+    """
+    ``<STMTTRN>`` blocks of an OFX (SGML or XML flavour) statement,
+    tokenised on ``<`` so it doesn't matter how tags are laid out on lines.
+    """
+    buffer = ''
+    current = None
+    while True:
+        data = fileobj.read(read_size)
+        if data:
+            buffer += counter(data).decode('utf-8', errors='replace')
+        parts = buffer.split('<')
+        # The last piece may be a tag cut in half by the read boundary
+        buffer = parts.pop() if data else ''
+        for part in parts:
+            tag, _, value = part.partition('>')
+            tag = tag.strip().upper()
+            if tag == 'STMTTRN':
+                current = {}
+            elif tag == '/STMTTRN' and current is not None:
+                record = {field: current.get(key, '') for key, field in _OFX_FIELDS.items()}
+                if record['memo'] and record['memo'] != record['note']:
+                    record['note'] = f"{record['note']} - {record['memo']}".strip(' -')
+                del record['memo']
+                yield record
+                current = None
+            elif current is not None and not tag.startswith('/'):
+                current[tag] = value.strip()
+        if not data:
+            return
+
+
+PARSERS = {
+    ImportJob.Format.CSV: csv_records,
+    ImportJob.Format.OFX: ofx_records,
+}
+
+
+# ------------------------------------------------------------ row checks
+
+_TYPE_ALIASES = {
+    'i': Transaction.TransactionType.INCOME,
+    'income': Transaction.TransactionType.INCOME,
+    'credit': Transaction.TransactionType.INCOME,
+    'e': Transaction.TransactionType.EXPENSE,
+    'expense': Transaction.TransactionType.EXPENSE,
+    'debit': Transaction.TransactionType.EXPENSE,
+}
+_MAX_AMOUNT = Decimal('99999999.99')  # Transaction.amount is max_digits=10, decimal_places=2
+
+
+def _parse_date(value):
+    value = value.strip()
+    digits = re.match(r'\d{8}', value)
+    try:
+        if digits and '-' not in value[:8]:
+            return datetime.strptime(digits.group(), '%Y%m%d').date()
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise RowError(f"Invalid date '{value}'.")
+
+
+def clean_record(record):
+    """
+    Normalise a parsed record to ``(date, type, amount, category_name, note)``.
+    Without an explicit type, the sign of the amount decides.
+    """
+    day = _parse_date(record.get('date', ''))
+    try:
+        amount = Decimal(record.get('amount', '').replace(',', ''))
+    except InvalidOperation:
+        raise RowError(f"Invalid amount '{record.get('amount')}'.")
+
+    raw_type = record.get('type', '').strip().lower()
+    if raw_type:
+        if raw_type not in _TYPE_ALIASES:
+            raise RowError(f"Unknown type '{record.get('type')}'.")
+        type_ = _TYPE_ALIASES[raw_type]
+    else:
+        type_ = Transaction.TransactionType.EXPENSE if amount < 0 else Transaction.TransactionType.INCOME
+
+    amount = abs(amount).quantize(Decimal('0.01'))
+    if not Decimal('0.01') <= amount <= _MAX_AMOUNT:
+        raise RowError(f"Amount must be between 0.01 and {_MAX_AMOUNT}.")
+
+    category_name = (record.get('category') or settings.FINANCE_IMPORT_DEFAULT_CATEGORY)[:100]
+    note = record.get('note') or None
+    return day, type_, amount, category_name, note
+
+
+# ----------------------------------------------------------- categories
+
+class CategoryResolver:
+    """
+    Name → Category for one user, loaded once and topped up chunk by chunk
+    with a single ``bulk_create`` for the names not seen before.
+    """
+    def __init__(self, user):
+        self.user = user
+        self.by_name = {}
+        for category in Category.objects.filter(user=user).only('id', 'name', 'user'):
+            self.by_name.setdefault(category.name.casefold(), category)
+
+    def resolve(self, names):
+        missing = {name.casefold(): name for name in names if name.casefold() not in self.by_name}
+        if missing:
+            Category.objects.bulk_create(
+                [Category(user=self.user, name=name) for name in missing.values()],
+                ignore_conflicts=True,
+            )
+            # bulk_create sends no post_save
+            invalidate_categories(self.user.pk)
+            for category in Category.objects.filter(user=self.user, name__in=missing.values()):
+                self.by_name.setdefault(category.name.casefold(), category)
+        return {name: self.by_name[name.casefold()] for name in names}
+
+
+# ---------------------------------------------------------------- runner
+
+def _commit_chunk(job, chunk, resolver, bytes_processed):
+    """
+    Insert one chunk of ``(row_number, record)`` pairs and advance the
+    job marker in the same transaction. Returns False if another worker
+    has already committed this chunk.
+    """
+    cleaned, errors = [], []
+    for row_number, record in chunk:
+        try:
+            cleaned.append(clean_record(record))
+        except RowError as exc:
+            errors.append({'row': row_number, 'error': str(exc)})
+
+    with transaction.atomic(using=router.db_for_write(ImportJob)):
+        locked = ImportJob.objects.select_for_update().get(pk=job.pk)
+        if locked.rows_processed != chunk[0][0] - 1:
+            return False
+
+        categories = resolver.resolve({name for _, _, _, name, _ in cleaned})
+        transactions = [
+            Transaction(user_id=job.user_id, category=categories[name], type=type_, amount=amount, date=day, note=note)
+            for day, type_, amount, name, note in cleaned
+        ]
+        Transaction.objects.bulk_create(transactions)
+
+        deltas = defaultdict(lambda: (Decimal('0'), 0))
+        for txn in transactions:
+            total, count = deltas[(job.user_id, txn.date, txn.type)]
+            deltas[(job.user_id, txn.date, txn.type)] = (total + txn.amount, count + 1)
+        rollups.apply_deltas(deltas)
+
+        room = max(settings.FINANCE_IMPORT_MAX_ERRORS - len(locked.errors), 0)
+        job.rows_processed = chunk[-1][0]
+        job.rows_imported = locked.rows_imported + len(transactions)
+        job.rows_failed = locked.rows_failed + len(errors)
+        job.errors = locked.errors + errors[:room]
+        job.bytes_processed = max(bytes_processed, locked.bytes_processed)
+        job.save(update_fields=['rows_processed', 'rows_imported', 'rows_failed', 'errors', 'bytes_processed', 'updated_at'])
+
+    if transactions:
+        invalidate_user(job.user_id)
+    # Keep the user's reads off the replicas while the import runs
+    pin_to_primary(job.user_id)
+    return True
+
+
+def run_import(job_id, *, chunk_size=None):
+    """
+    Process (or resume) an import job. Returns the job.
+    """
+    chunk_size = chunk_size or settings.FINANCE_IMPORT_CHUNK_SIZE
+    job = ImportJob.objects.select_related('user').get(pk=job_id)
+    if job.status in (ImportJob.Status.COMPLETED, ImportJob.Status.FAILED):
+        return job
+
+    pin_to_primary(job.user_id)
+    job.status = ImportJob.Status.RUNNING
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    resolver = CategoryResolver(job.user)
+    counter = _ByteCounter()
+    already_done = job.rows_processed
+    try:
+        with job.file.open('rb') as fileobj:
+            chunk = []
+            for row_number, record in enumerate(PARSERS[job.format](fileobj, counter), start=1):
+                if row_number <= already_done:
+                    continue
+                chunk.append((row_number, record))
+                if len(chunk) >= chunk_size:
+                    if not _commit_chunk(job, chunk, resolver, counter.count):
+                        return job
+                    chunk = []
+            if chunk and not _commit_chunk(job, chunk, resolver, counter.count):
+                return job
+    except ImportFileError as exc:
+        job.status = ImportJob.Status.FAILED
+        job.errors = job.errors + [{'row': None, 'error': str(exc)}]
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'errors', 'finished_at', 'updated_at'])
+        return job
+
+    job.status = ImportJob.Status.COMPLETED
+    job.bytes_processed = job.bytes_total
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'bytes_processed', 'finished_at', 'updated_at'])
+    return job
@@ -0,0 +1,49 @@
+# finance/management/commands/check_rollups.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.routers import every_shard, use_shard
+from finance import rollups
+
+
+class Command(BaseCommand):
+    help = "Compare the daily rollups with the transactions they summarise."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", dest="user_ids", type=int, action="append",
+            help="Only check this user's rollups (repeatable). Defaults to every user.",
+        )
+        parser.add_argument(
+            "--fix", action="store_true",
+            help="Rebuild the rollups of every user that has drifted.",
+        )
+        parser.add_argument(
+            "--database", dest="databases", action="append",
+            help="Only check this shard (repeatable). Defaults to every shard.",
+        )
+
+    def handle(self, *args, user_ids=None, fix=False, databases=None, **options):
+        drifted = fixed = 0
+        for alias in databases or every_shard():
+            with use_shard(alias):
+                drift = rollups.find_drift(user_ids)
+                for row in drift:
+                    self.stdout.write(
+                        f"database={alias} user={row['user_id']} date={row['date']} type={row['type']}: "
+                        f"expected {row['expected_total']} ({row['expected_count']}), "
+                        f"found {row['actual_total']} ({row['actual_count']})"
+                    )
+                if drift and fix:
+                    drifted_users = sorted({row["user_id"] for row in drift})
+                    rollups.rebuild(drifted_users)
+                    fixed += len(drifted_users)
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Rebuilt rollups for {len(drifted_users)} user(s) on {alias}."
+                    ))
+                elif drift:
+                    drifted += len(drift)
+
+        if drifted:
+            raise CommandError(f"{drifted} rollup bucket(s) out of sync.")
+        if not fixed:
+            self.stdout.write(self.style.SUCCESS("Rollups are consistent."))
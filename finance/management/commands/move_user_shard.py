@@ -0,0 +1,25 @@
+# finance/management/commands/move_user_shard.py
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import shards
+
+
+class Command(BaseCommand):
+    help = "Move a user's finance data to another of FINANCE_SHARDS, turning their writes away meanwhile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_id", type=int)
+        parser.add_argument("target", help="Database alias of the shard to move the user to.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--grace", type=float, default=None,
+            help="Seconds to wait for requests in flight. Defaults to FINANCE_SHARD_MOVE_GRACE_SECONDS.",
+        )
+
+    def handle(self, *args, user_id, target, batch_size=1000, grace=None, **options):
+        try:
+            moved = shards.move_user(user_id, target, batch_size=batch_size, grace=grace)
+        except shards.ShardMoveError as exc:
+            raise CommandError(str(exc))
+        rows = ", ".join(f"{count} {name}" for name, count in moved.items())
+        self.stdout.write(self.style.SUCCESS(f"Moved user {user_id} to {target} ({rows})."))
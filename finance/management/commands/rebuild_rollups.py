@@ -0,0 +1,27 @@
+# finance/management/commands/rebuild_rollups.py
+from django.core.management.base import BaseCommand
+
+from core.routers import every_shard, use_shard
+from finance import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily rollups behind financial_summary from the transactions table and the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", dest="user_ids", type=int, action="append",
+            help="Only rebuild this user's rollups (repeatable). Defaults to every user.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--database", dest="databases", action="append",
+            help="Only rebuild on this shard (repeatable). Defaults to every shard.",
+        )
+
+    def handle(self, *args, user_ids=None, batch_size=1000, databases=None, **options):
+        written = 0
+        for alias in databases or every_shard():
+            with use_shard(alias):
+                written += rollups.rebuild(user_ids, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows."))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    DailyRollup = apps.get_model('finance', 'DailyRollup')
+    grouped = (
+        Transaction.objects.using(schema_editor.connection.alias)
+        .order_by()
+        .values_list('category__user', 'date', 'type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    DailyRollup.objects.using(schema_editor.connection.alias).bulk_create(
+        (
+            DailyRollup(user_id=user_id, date=day, type=type_, total=total, count=count)
+            for user_id, day, type_, total, count in grouped.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_alter_transaction_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('type', models.CharField(choices=[('I', 'Income'), ('E', 'Expense')], max_length=1)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date', 'type')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:30
+
+from django.db import migrations, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def backfill_transaction_user(apps, schema_editor):
+    """
+    Copy ``category.user`` onto each transaction in primary-key ranges,
+    committing after every batch so no lock is held for long.
+    """
+    alias = schema_editor.connection.alias
+    Transaction = apps.get_model('finance', 'Transaction')
+    Category = apps.get_model('finance', 'Category')
+
+    bounds = Transaction.objects.using(alias).aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return
+
+    owner = Category.objects.using(alias).filter(pk=OuterRef('category_id')).values('user_id')[:1]
+    for start in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=alias):
+            Transaction.objects.using(alias).filter(
+                pk__gte=start, pk__lt=start + BATCH_SIZE, user__isnull=True,
+            ).update(user_id=Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finance', '0005_transaction_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_transaction_user, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:30
+
+import copy
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# SET NOT NULL on its own scans the whole table under an ACCESS EXCLUSIVE
+# lock, and an AlterField would also drop and re-add the foreign key. On
+# Postgres the column gets a CHECK (user_id IS NOT NULL) NOT VALID first
+# (catalog only), validated in its own step (scans, but lets reads and
+# writes through); SET NOT NULL then trusts the validated check instead of
+# scanning, and the check is dropped. The AlterField only updates
+# Django's state.
+
+TABLE = 'finance_transaction'
+CHECK = 'finance_transaction_user_id_not_null'
+
+
+def set_not_null(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        Transaction = apps.get_model('finance', 'Transaction')
+        old_field = Transaction._meta.get_field('user')
+        new_field = copy.copy(old_field)
+        new_field.null = False
+        schema_editor.alter_field(Transaction, old_field, new_field)
+        return
+    # Outside a transaction (atomic = False): each statement commits, and
+    # holds its lock, on its own
+    with connection.cursor() as cursor:
+        # Left behind by a run that failed half-way
+        cursor.execute(f'ALTER TABLE "{TABLE}" DROP CONSTRAINT IF EXISTS "{CHECK}"')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{CHECK}" CHECK ("user_id" IS NOT NULL) NOT VALID'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" VALIDATE CONSTRAINT "{CHECK}"')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN "user_id" SET NOT NULL')
+        cursor.execute(f'ALTER TABLE "{TABLE}" DROP CONSTRAINT "{CHECK}"')
+
+
+def drop_not_null(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        Transaction = apps.get_model('finance', 'Transaction')
+        old_field = Transaction._meta.get_field('user')
+        new_field = copy.copy(old_field)
+        new_field.null = True
+        schema_editor.alter_field(Transaction, old_field, new_field)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN "user_id" DROP NOT NULL')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finance', '0006_backfill_transaction_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(set_not_null, drop_not_null)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        # Built without blocking writes to the table
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date'], name='finance_txn_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_transaction_user_not_null'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('file', models.FileField(upload_to='imports/%Y/%m/')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('ofx', 'OFX')], max_length=3)),
+                ('status', models.CharField(choices=[('P', 'Pending'), ('R', 'Running'), ('C', 'Completed'), ('F', 'Failed')], default='P', max_length=1)),
+                ('bytes_total', models.BigIntegerField(default=0)),
+                ('bytes_processed', models.BigIntegerField(default=0)),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('rows_imported', models.IntegerField(default=0)),
+                ('rows_failed', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
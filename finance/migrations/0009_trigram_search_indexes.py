@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:30
+
+from django.db import migrations
+
+# Expression indexes matching what ``icontains`` compiles to on Postgres
+# (``UPPER(col::text) LIKE UPPER(%s)``), so both the search filter and the
+# existing ``note`` / ``category_name`` filters can use them.
+INDEXES = [
+    ('finance_txn_note_trgm', 'finance_transaction', 'note'),
+    ('finance_category_name_trgm', 'finance_category', 'name'),
+]
+
+
+def _trigram_installable(cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if not _trigram_installable(cursor):
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in INDEXES:
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for name, _, _ in INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finance', '0008_importjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:05
+
+from django.db import migrations
+
+# Convert finance_transaction into a table partitioned by RANGE (date), see
+# finance/partitions.py. Postgres requires the partition key in every
+# unique constraint, so the primary key becomes (id, date); ``id`` stays
+# unique through its identity sequence and Django keeps treating it as the
+# primary key. Rows are copied in this migration, in one transaction that
+# starts by renaming the table: the RENAME takes an ACCESS EXCLUSIVE lock
+# held until the copy and the index builds commit, so reads of
+# transactions wait as well as writes. On a large table run it in a
+# maintenance window with the API stopped.
+
+TABLE = 'finance_transaction'
+OLD = 'finance_transaction_heap'
+
+# Indexes and foreign keys under the names Django created them with
+INDEXES = [
+    ('finance_transaction_category_id_f48294d6', '("category_id")'),
+    ('finance_txn_user_date_idx', '("user_id", "date")'),
+]
+FOREIGN_KEYS = [
+    ('finance_transaction_category_id_f48294d6_fk_finance_category_id', 'category_id', 'finance_category'),
+    ('finance_transaction_user_id_6c085a0b_fk_core_user_id', 'user_id', 'core_user'),
+]
+TRIGRAM_INDEX = 'finance_txn_note_trgm'
+
+
+def _build(cursor, primary_key):
+    """
+    Indexes, constraints and identity sequence for the new TABLE, once
+    its rows are in (faster than maintaining the indexes row by row).
+    """
+    cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY ({primary_key})')
+    for name, columns in INDEXES:
+        cursor.execute(f'CREATE INDEX "{name}" ON "{TABLE}" {columns}')
+    for name, column, target in FOREIGN_KEYS:
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" FOREIGN KEY ("{column}") '
+            f'REFERENCES "{target}" ("id") DEFERRABLE INITIALLY DEFERRED'
+        )
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if cursor.fetchone():
+        cursor.execute(
+            f'CREATE INDEX "{TRIGRAM_INDEX}" ON "{TABLE}" USING gin ((UPPER("note"::text)) gin_trgm_ops)'
+        )
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+        f"COALESCE((SELECT max(id) FROM \"{TABLE}\"), 0) + 1, false)"
+    )
+
+
+def partition(apps, schema_editor):
+    from finance import partitions
+
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{OLD}" INCLUDING DEFAULTS INCLUDING IDENTITY) PARTITION BY RANGE (date)'
+        )
+        cursor.execute(f'CREATE TABLE "{partitions.DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+        cursor.execute(f'SELECT min(date), max(date) FROM "{OLD}"')
+        first, last = cursor.fetchone()
+        if first is not None:
+            partitions.ensure_partitions(first, last, using=connection.alias)
+        partitions.ensure_future_partitions(using=connection.alias)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD}"')
+        cursor.execute(f'DROP TABLE "{OLD}"')
+        _build(cursor, '"id", "date"')
+
+
+def unpartition(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD}"')
+        cursor.execute(f'CREATE TABLE "{TABLE}" (LIKE "{OLD}" INCLUDING DEFAULTS INCLUDING IDENTITY)')
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD}"')
+        cursor.execute(f'DROP TABLE "{OLD}"')  # and every partition
+        _build(cursor, '"id"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
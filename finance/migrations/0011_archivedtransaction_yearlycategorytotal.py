@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_partition_transactions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('I', 'Income'), ('E', 'Expense')], max_length=1)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('note', models.TextField(blank=True, null=True)),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='finance.category')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='finance_archive_user_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='YearlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('type', models.CharField(choices=[('I', 'Income'), ('E', 'Expense')], max_length=1)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='yearly_totals', to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='yearly_category_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category', 'year', 'type')},
+            },
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# The new indexes are built without blocking writes to transactions. A
+# partitioned table can't take CREATE INDEX CONCURRENTLY itself, so on
+# Postgres each index is created invalid ON ONLY the parent, built
+# CONCURRENTLY on every partition and attached there; the parent index
+# turns valid once the last partition's is attached, and partitions
+# created later get theirs on ATTACH. Re-running after a failure rebuilds
+# partition indexes left invalid. Other databases create them plainly.
+#
+# The foreign key's own index on category_id is dropped last
+# (finance_txn_cat_date_idx takes its place), leaving the constraint
+# alone: an AlterField would drop and re-add the foreign key, checking
+# every row. On an unpartitioned table the index is dropped
+# CONCURRENTLY. Postgres can't do that to a partitioned index: the DROP
+# waits for queries on transactions to finish and holds them off while
+# it runs, which only takes a catalog update.
+
+TABLE = 'finance_transaction'
+
+INDEXES = [
+    models.Index(fields=['user', '-created_at'], name='finance_txn_user_created_idx'),
+    models.Index(fields=['user', 'amount'], name='finance_txn_user_amount_idx'),
+    models.Index(fields=['user', 'type', 'id'], name='finance_txn_user_type_idx'),
+    models.Index(fields=['category', 'date'], name='finance_txn_cat_date_idx'),
+]
+# The index Django gave the category foreign key (see migration 0010)
+FK_INDEX = models.Index(fields=['category'], name='finance_transaction_category_id_f48294d6')
+
+
+def _columns(model, index):
+    columns = []
+    for field_name in index.fields:
+        column = model._meta.get_field(field_name.lstrip('-')).column
+        columns.append(f'"{column}" DESC' if field_name.startswith('-') else f'"{column}"')
+    return f"({', '.join(columns)})"
+
+
+def _partitions(cursor):
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(%s) ORDER BY child.relname",
+        [TABLE],
+    )
+    return [name for (name,) in cursor.fetchall()]
+
+
+def _create_concurrently(cursor, name, table, columns):
+    # CONCURRENTLY leaves an invalid index behind when it fails
+    cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [f'"{name}"'])
+    row = cursor.fetchone()
+    if row is not None and not row[0]:
+        cursor.execute(f'DROP INDEX CONCURRENTLY "{name}"')
+    cursor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" {columns}')
+
+
+def _create(Transaction, schema_editor, indexes):
+    from finance import partitions
+
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        for index in indexes:
+            schema_editor.add_index(Transaction, index)
+        return
+
+    partitioned = partitions.is_partitioned(using=connection.alias)
+    with connection.cursor() as cursor:
+        for index in indexes:
+            columns = _columns(Transaction, index)
+            if not partitioned:
+                _create_concurrently(cursor, index.name, TABLE, columns)
+                continue
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS "{index.name}" ON ONLY "{TABLE}" {columns}')
+            for partition in _partitions(cursor):
+                # finance_transaction_p2024_01 -> <index name>_p2024_01
+                name = f"{index.name}_{partition[len(TABLE) + 1:]}"
+                _create_concurrently(cursor, name, partition, columns)
+                cursor.execute(f'ALTER INDEX "{index.name}" ATTACH PARTITION "{name}"')
+
+
+def _drop(Transaction, schema_editor, indexes):
+    from finance import partitions
+
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        for index in indexes:
+            schema_editor.remove_index(Transaction, index)
+        return
+    # With the partitions' indexes; not concurrently on a partitioned table
+    concurrently = '' if partitions.is_partitioned(using=connection.alias) else ' CONCURRENTLY'
+    with connection.cursor() as cursor:
+        for index in indexes:
+            cursor.execute(f'DROP INDEX{concurrently} IF EXISTS "{index.name}"')
+
+
+def create_indexes(apps, schema_editor):
+    _create(apps.get_model('finance', 'Transaction'), schema_editor, INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    _drop(apps.get_model('finance', 'Transaction'), schema_editor, INDEXES)
+
+
+def drop_fk_index(apps, schema_editor):
+    _drop(apps.get_model('finance', 'Transaction'), schema_editor, [FK_INDEX])
+
+
+def create_fk_index(apps, schema_editor):
+    _create(apps.get_model('finance', 'Transaction'), schema_editor, [FK_INDEX])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finance', '0011_archivedtransaction_yearlycategorytotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes)],
+            state_operations=[
+                migrations.AddIndex(model_name='transaction', index=index.clone()) for index in INDEXES
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(drop_fk_index, create_fk_index)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='category',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='finance.category'),
+                ),
+            ],
+        ),
+    ]
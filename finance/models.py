@@ -1,6 +1,6 @@
 from django.conf import settings
 from core.mixins import TimeStampedModel
-from django.db import models
+from django.db import models, router, transaction as db_transaction
 from django.utils import timezone
 from datetime import date
 # Create your models here.
@@ -23,11 +23,69 @@ class Transaction(TimeStampedModel):
     type = models.CharField(max_length=1, choices=TransactionType.choices)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     note = models.TextField(blank=True, null=True)
-    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='transactions')
+    # Indexed by finance_txn_cat_date_idx
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='transactions', db_index=False)
+    # Owner copied from ``category.user`` on every save so reads filter on one column
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions',
+        editable=False, db_index=False,
+    )
     date = models.DateField(default= timezone.localdate, null=False, blank=True)
     class Meta:
+        # On Postgres the table is partitioned by range of ``date`` (see
+        # finance/partitions.py); its primary key there is (id, date)
         ordering = ['-created_at']
+        # One index per filter and ordering of the transaction list (see
+        # TransactionFilter and TransactionViewSet.ordering_fields), checked
+        # against query plans by finance/tests/test_finance_indexes.py
+        indexes = [
+            # Also serves as the index on the ``user`` foreign key
+            models.Index(fields=['user', 'date'], name='finance_txn_user_date_idx'),
+            # The default ordering, and cursor pages in it
+            models.Index(fields=['user', '-created_at'], name='finance_txn_user_created_idx'),
+            models.Index(fields=['user', 'amount'], name='finance_txn_user_amount_idx'),
+            # ``type`` filter and ordering. Two types leave ties everywhere,
+            # so cursor pages (ordered by type, id) need ``id`` in the index
+            models.Index(fields=['user', 'type', 'id'], name='finance_txn_user_type_idx'),
+            # ``category`` filter, also serving as the foreign key's index
+            models.Index(fields=['category', 'date'], name='finance_txn_cat_date_idx'),
+        ]
 
+    # Fields that feed the daily rollups (see finance.rollups)
+    ROLLUP_FIELDS = ('user_id', 'date', 'type', 'amount')
+
+    def save(self, *args, **kwargs):
+        from finance import rollups
+
+        using = kwargs.get('using') or router.db_for_write(Transaction, instance=self)
+        if self.category_id is not None:
+            self.user_id = self.category.user_id
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {self._meta.get_field(name).attname for name in update_fields}
+            if 'category_id' in update_fields:
+                update_fields.add('user_id')
+            kwargs['update_fields'] = update_fields
+            if not update_fields & set(self.ROLLUP_FIELDS):
+                return super().save(*args, **kwargs)
+
+        with db_transaction.atomic(using=using):
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                # The row as committed, locked until this save commits: what
+                # was loaded may have been changed by a concurrent save since,
+                # and moving that stale amount would leave the rollups off
+                previous = (
+                    Transaction.objects.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list(*self.ROLLUP_FIELDS)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            current = tuple(getattr(self, name) for name in self.ROLLUP_FIELDS)
+            rollups.record_change(previous, current, using=self._state.db)
         
     @property
     def is_income(self):
@@ -45,6 +103,116 @@ class Transaction(TimeStampedModel):
     
     def __str__(self):
         return f"{self.get_type_display()}: {self.amount} ({self.date})"
-    
 
-    
\ No newline at end of file
+
+class DailyRollup(models.Model):
+    """
+    One row per user, day and transaction type holding the running
+    total and count of that day's transactions. Kept in step with
+    ``Transaction`` writes by ``finance.rollups``.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    type = models.CharField(max_length=1, choices=Transaction.TransactionType.choices)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'date', 'type')
+
+    def __str__(self):
+        return f"{self.user_id} {self.date} {self.get_type_display()}: {self.total} ({self.count})"
+
+
+class ArchivedTransaction(models.Model):
+    """
+    A transaction moved out of ``Transaction`` by ``finance.archive``,
+    under the same id and with its timestamps as they were. Archived rows
+    still count in the daily rollups and in ``YearlyCategoryTotal``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    type = models.CharField(max_length=1, choices=Transaction.TransactionType.choices)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    note = models.TextField(blank=True, null=True)
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='archived_transactions')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_transactions', db_index=False,
+    )
+    date = models.DateField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date'], name='finance_archive_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_type_display()}: {self.amount} ({self.date}, archived)"
+
+
+class YearlyCategoryTotal(models.Model):
+    """
+    Total and count of a user's archived transactions per category, year
+    and type, kept by ``finance.archive`` as rows are archived.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='yearly_category_totals')
+    # Totals only exist alongside archived rows, which protect the category
+    # (merges move both), so deleting a category has nothing to cascade to
+    category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, related_name='yearly_totals')
+    year = models.IntegerField()
+    type = models.CharField(max_length=1, choices=Transaction.TransactionType.choices)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'category', 'year', 'type')
+
+    def __str__(self):
+        return f"{self.user_id} {self.category_id} {self.year} {self.get_type_display()}: {self.total} ({self.count})"
+
+
+class ImportJob(TimeStampedModel):
+    """
+    A bank statement uploaded for background import (see finance.imports).
+    ``rows_processed`` only advances together with the rows it covers, so
+    a restarted job resumes from the last committed chunk.
+    """
+    class Format(models.TextChoices):
+        CSV = 'csv', 'CSV'
+        OFX = 'ofx', 'OFX'
+
+    class Status(models.TextChoices):
+        PENDING = 'P', 'Pending'
+        RUNNING = 'R', 'Running'
+        COMPLETED = 'C', 'Completed'
+        FAILED = 'F', 'Failed'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='import_jobs')
+    file = models.FileField(upload_to='imports/%Y/%m/')
+    format = models.CharField(max_length=3, choices=Format.choices)
+    status = models.CharField(max_length=1, choices=Status.choices, default=Status.PENDING)
+
+    bytes_total = models.BigIntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    rows_imported = models.IntegerField(default=0)
+    rows_failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def progress(self):
+        if self.status == self.Status.COMPLETED:
+            return 1.0
+        if not self.bytes_total:
+            return 0.0
+        return round(min(self.bytes_processed / self.bytes_total, 1.0), 4)
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.get_format_display()}, {self.get_status_display()})"
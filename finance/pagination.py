@@ -0,0 +1,137 @@
+# finance/pagination.py
+import base64
+import json
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor ("keyset") pagination for deep walks through a user's history.
+
+    Rows are ordered by the requested ``?ordering=`` (or ``default_ordering``)
+    with ``id`` appended as a tiebreaker. The cursor carries the sort key of
+    the last row served, and the next page is fetched with
+    ``WHERE (key) > (cursor) … LIMIT n`` — page N costs the same as page 1
+    and no ``COUNT(*)`` is issued.
+    """
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    default_ordering = ('-created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # One extra row tells us whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        The ordering chosen through the view's ``OrderingFilter`` (so every
+        ``ordering_fields`` choice works), made total by appending ``id``.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = [term for term in (ordering or self.default_ordering) if term.lstrip('-') not in ('id', 'pk')]
+        tiebreaker = '-id' if ordering and ordering[-1].startswith('-') else 'id'
+        return tuple(ordering) + (tiebreaker,)
+
+    def after(self, position):
+        """
+        Rows strictly after ``position`` in (possibly mixed-direction)
+        lexicographic order:
+        ``(a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z)``.
+        """
+        condition = Q()
+        equal_so_far = {}
+        for term, value in zip(self.ordering, position):
+            name = term.lstrip('-')
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            condition |= Q(**equal_so_far, **{f'{name}__{lookup}': value})
+            equal_so_far[name] = value
+        return condition
+
+    def encode_cursor(self, row):
+        values = []
+        for term in self.ordering:
+            name = term.lstrip('-')
+            value = row[name] if isinstance(row, Mapping) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        payload = json.dumps({'o': self.ordering, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if tuple(payload['o']) != self.ordering:
+                raise ValueError('cursor was issued for a different ordering')
+            return [
+                self.model._meta.get_field(term.lstrip('-')).to_python(value)
+                for term, value in zip(self.ordering, payload['v'], strict=True)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': 'http://api.example.org/transactions/?pagination=cursor&{cursor_query_param}=eyJvIjpb'.format(
+                        cursor_query_param=self.cursor_query_param)
+                },
+                'results': schema,
+            },
+        }
+
@@ -0,0 +1,164 @@
+# finance/partitions.py
+"""
+Date-range partitions of ``finance_transaction`` (Postgres declarative
+partitioning, see migration 0010).
+
+The table is ``PARTITION BY RANGE (date)`` with one partition per
+FINANCE_PARTITION_INTERVAL ('month' or 'year') named
+``finance_transaction_p<YYYY>_<MM>`` / ``finance_transaction_p<YYYY>``,
+plus ``finance_transaction_default`` for dates no partition covers, so an
+insert never fails for want of a partition. Queries filtered on ``date``
+(``date__range``, ``date__gte``/``__lte``) only scan the partitions that
+overlap the range.
+
+``ensure_future_partitions`` (run daily by ``core.tasks``) keeps
+FINANCE_PARTITIONS_AHEAD intervals created in advance. A new partition
+takes over any rows the default partition already holds for its range.
+Once their rows are archived (finance.archive), ``drop_empty_partitions``
+removes old partitions altogether.
+"""
+import logging
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'finance_transaction'
+DEFAULT_PARTITION = f'{TABLE}_default'
+INTERVALS = ('month', 'year')
+
+_BOUND = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+def partition_range(day, interval):
+    """
+    ``(start, end)`` of the ``interval`` containing ``day``, end exclusive.
+    """
+    if interval == 'year':
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    if interval == 'month':
+        start = date(day.year, day.month, 1)
+        end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+        return start, end
+    raise ValueError(f"Unsupported partition interval {interval!r}; choose one of {', '.join(INTERVALS)}.")
+
+
+def partition_name(start, interval):
+    suffix = f"{start:%Y}" if interval == 'year' else f"{start:%Y_%m}"
+    return f"{TABLE}_p{suffix}"
+
+
+def is_partitioned(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(using=DEFAULT_DB_ALIAS):
+    """
+    ``[(name, start, end)]`` of the range partitions, default excluded.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [TABLE],
+        )
+        partitions = []
+        for name, bound in cursor.fetchall():
+            match = _BOUND.search(bound)
+            if match:
+                partitions.append((name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(start, end, name, using=DEFAULT_DB_ALIAS):
+    """
+    Create and attach the partition for ``[start, end)``, moving in the
+    rows the default partition holds for that range (attaching would
+    fail otherwise).
+    """
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [start, end])
+
+
+def ensure_partitions(start, end, interval=None, using=DEFAULT_DB_ALIAS):
+    """
+    Create the missing partitions covering ``start`` through ``end``
+    (inclusive). Ranges that would overlap an existing partition (say,
+    after FINANCE_PARTITION_INTERVAL changed) are left to it. Returns the
+    names created; a no-op unless the table is partitioned.
+    """
+    if not is_partitioned(using):
+        return []
+    interval = interval or settings.FINANCE_PARTITION_INTERVAL
+    existing = existing_partitions(using)
+    created = []
+    day = start
+    while day <= end:
+        lower, upper = partition_range(day, interval)
+        if not any(lower < other_end and other_start < upper for _, other_start, other_end in existing):
+            name = partition_name(lower, interval)
+            create_partition(lower, upper, name, using=using)
+            existing.append((name, lower, upper))
+            created.append(name)
+        day = upper
+    return created
+
+
+def ensure_future_partitions(ahead=None, today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Partitions from the current interval through ``ahead`` intervals
+    (FINANCE_PARTITIONS_AHEAD) after it.
+    """
+    interval = settings.FINANCE_PARTITION_INTERVAL
+    ahead = settings.FINANCE_PARTITIONS_AHEAD if ahead is None else ahead
+    start = today or timezone.localdate()
+    end = start
+    for _ in range(ahead):
+        end = partition_range(end, interval)[1]
+    created = ensure_partitions(start, end, interval=interval, using=using)
+    if created:
+        logger.info(f"ensure_future_partitions: created {', '.join(created)}")
+    return created
+
+
+def drop_empty_partitions(before, using=DEFAULT_DB_ALIAS):
+    """
+    Drop the partitions ending on or before ``before`` that hold no rows.
+    Rows later inserted for their dates land in the default partition.
+    Returns the names dropped; a no-op unless the table is partitioned.
+    """
+    if not is_partitioned(using):
+        return []
+    dropped = []
+    for name, _, end in existing_partitions(using):
+        if end > before:
+            break
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            # Locked before the check so no insert can slip in between
+            cursor.execute(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{name}")')
+            if cursor.fetchone()[0]:
+                continue
+            cursor.execute(f'DROP TABLE "{name}"')
+        dropped.append(name)
+    if dropped:
+        logger.info(f"drop_empty_partitions: dropped {', '.join(dropped)}")
+    return dropped
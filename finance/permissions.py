@@ -1,9 +1,14 @@
 # transactions/permissions.py
 
+from collections.abc import Mapping
+
 from rest_framework import permissions
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        # for categories: obj.user; for transactions: obj.category.user
-        owner = getattr(obj, 'user', None) or getattr(obj, 'category', None).user
-        return owner == request.user
+        # Categories and transactions both carry their owner's id directly,
+        # so the check never loads a related row. ``.values()`` rows (the
+        # transaction read path) are checked the same way.
+        if isinstance(obj, Mapping):
+            return obj.get('user_id') == request.user.pk
+        return getattr(obj, 'user_id', None) == request.user.pk
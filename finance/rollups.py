@@ -0,0 +1,162 @@
+# finance/rollups.py
+"""
+Maintenance of the per-user daily rollups (``DailyRollup``).
+
+Every write to a ``Transaction`` turns into one or two signed deltas
+against a (user, date, type) bucket; ``financial_summary`` then sums a
+handful of buckets instead of the user's whole history. Archiving a
+transaction (finance.archive) leaves its rollup in place.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+
+from finance.models import ArchivedTransaction, DailyRollup, Transaction
+
+
+def upsert_totals(model, key_fields, deltas, *, using=None):
+    """
+    Add ``{key: (amount, count)}`` deltas to the ``total`` / ``count``
+    columns of ``model``, whose rows are unique on the ``key_fields``
+    columns, with a single ``INSERT … ON CONFLICT DO UPDATE`` statement.
+    """
+    rows = [
+        (*key, Decimal(str(amount)), count)
+        for key, (amount, count) in deltas.items()
+        if amount or count
+    ]
+    if not rows:
+        return
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    keys = ", ".join(qn(name) for name in key_fields)
+    placeholders = ", ".join([f"({', '.join(['%s'] * (len(key_fields) + 2))})"] * len(rows))
+    sql = (
+        f"INSERT INTO {table} ({keys}, {qn('total')}, {qn('count')}) "
+        f"VALUES {placeholders} "
+        f"ON CONFLICT ({keys}) DO UPDATE SET "
+        f"{qn('total')} = {table}.{qn('total')} + EXCLUDED.{qn('total')}, "
+        f"{qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}"
+    )
+    params = [value for row in rows for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def apply_deltas(deltas, *, using=None):
+    """
+    Add ``{(user_id, date, type): (amount, count)}`` deltas to the rollups.
+    """
+    upsert_totals(DailyRollup, ('user_id', 'date', 'type'), deltas, using=using)
+
+
+def record_change(previous, current, *, using=None):
+    """
+    Move a transaction's contribution from ``previous`` to ``current``.
+    Both are ``(user_id, date, type, amount)`` tuples, or ``None`` for
+    a create (no previous) or a delete (no current).
+    """
+    deltas = defaultdict(lambda: (Decimal("0"), 0))
+    if previous is not None:
+        user_id, day, type_, amount = previous
+        total, count = deltas[(user_id, day, type_)]
+        deltas[(user_id, day, type_)] = (total - Decimal(str(amount)), count - 1)
+    if current is not None:
+        user_id, day, type_, amount = current
+        total, count = deltas[(user_id, day, type_)]
+        deltas[(user_id, day, type_)] = (total + Decimal(str(amount)), count + 1)
+    apply_deltas(deltas, using=using)
+
+
+def _aggregate_transactions(user_ids=None):
+    """
+    Ground truth straight from the transactions table and the archive
+    (finance.archive): ``{(user_id, date, type): (total, count)}``.
+    """
+    truth = {}
+    for model in (Transaction, ArchivedTransaction):
+        qs = model.objects.all()
+        if user_ids is not None:
+            qs = qs.filter(user__in=user_ids)
+        grouped = (
+            qs.order_by()
+            .values_list('user', 'date', 'type')
+            .annotate(total=Sum('amount'), count=Count('id'))
+        )
+        for user_id, day, type_, total, count in grouped:
+            previous_total, previous_count = truth.get((user_id, day, type_), (Decimal("0"), 0))
+            truth[(user_id, day, type_)] = (previous_total + total, previous_count + count)
+    return truth
+
+
+def rebuild(user_ids=None, *, batch_size=1000):
+    """
+    Recompute the rollups for ``user_ids`` (every user when ``None``)
+    from scratch. Returns the number of rollup rows written.
+
+    Every transaction write upserts its rollup delta in its own database
+    transaction (``record_change``, ``apply_deltas``). The rollup table is
+    locked against those upserts (reads carry on) before the
+    transactions are summed: a write that upserted earlier has committed
+    and is in the sums, and a later one waits and adds its delta to the
+    rebuilt rows, neither lost nor counted twice.
+    """
+    using = router.db_for_write(DailyRollup)
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {connection.ops.quote_name(DailyRollup._meta.db_table)} IN SHARE ROW EXCLUSIVE MODE"
+                )
+        truth = _aggregate_transactions(user_ids)
+        stale = DailyRollup.objects.all()
+        if user_ids is not None:
+            stale = stale.filter(user__in=user_ids)
+        stale.delete()
+        DailyRollup.objects.bulk_create(
+            (
+                DailyRollup(user_id=user_id, date=day, type=type_, total=total, count=count)
+                for (user_id, day, type_), (total, count) in truth.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(truth)
+
+
+def find_drift(user_ids=None):
+    """
+    Compare the rollups against the transactions they summarise and
+    return one dict per (user, date, type) bucket that disagrees.
+    """
+    truth = _aggregate_transactions(user_ids)
+    stored_qs = DailyRollup.objects.all()
+    if user_ids is not None:
+        stored_qs = stored_qs.filter(user__in=user_ids)
+    stored = {
+        (user_id, day, type_): (total, count)
+        for user_id, day, type_, total, count in stored_qs.values_list('user', 'date', 'type', 'total', 'count')
+        # Buckets emptied by deletes are kept at zero rather than removed
+        if total or count
+    }
+
+    drift = []
+    for key in sorted(truth.keys() | stored.keys(), key=lambda k: (k[0], k[1], k[2])):
+        expected = truth.get(key, (Decimal("0"), 0))
+        actual = stored.get(key, (Decimal("0"), 0))
+        if expected != actual:
+            user_id, day, type_ = key
+            drift.append({
+                "user_id": user_id,
+                "date": day,
+                "type": type_,
+                "expected_total": expected[0],
+                "expected_count": expected[1],
+                "actual_total": actual[0],
+                "actual_count": actual[1],
+            })
+    return drift
@@ -0,0 +1,57 @@
+# finance/search.py
+"""
+Note / category-name search for transactions.
+
+On Postgres with ``pg_trgm`` installed (migration 0009 creates it along
+with GIN trigram indexes on ``UPPER(note)`` and ``UPPER(category.name)``)
+the ``icontains`` matches are served from those indexes and results are
+ranked by trigram word similarity. Elsewhere the same filter runs as a
+plain ``icontains`` scan without ranking.
+"""
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from finance.models import Category
+
+_trigram_available = {}
+
+
+def trigram_search_available(using):
+    if using not in _trigram_available:
+        connection = connections[using]
+        available = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        _trigram_available[using] = available
+    return _trigram_available[using]
+
+
+def search_transactions(queryset, term, *, user):
+    """
+    ``user``'s transactions in ``queryset`` whose note or category name
+    contains ``term``, best matches first where the database can rank them.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    # Resolve matching categories first so the note match and the
+    # category match can each use their own index (no join needed); only
+    # the user's, rather than every user's matching name.
+    categories = Category.objects.filter(user=user, name__icontains=term).values('id')
+    queryset = queryset.filter(Q(note__icontains=term) | Q(category__in=categories))
+
+    if not trigram_search_available(queryset.db):
+        return queryset
+
+    zero = Value(0.0, output_field=FloatField())
+    return queryset.annotate(
+        search_rank=Greatest(
+            Coalesce(TrigramWordSimilarity(term, 'note'), zero),
+            Coalesce(TrigramWordSimilarity(term, 'category__name'), zero),
+        )
+    ).order_by('-search_rank', '-date', '-id')
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
-from .models import Transaction, Category
+from rest_framework.settings import api_settings
+from .categories import category_map, find_by_name
+from .models import Transaction, Category, ImportJob
 
 class CategorySerializer(serializers.ModelSerializer):
     """
@@ -23,19 +25,14 @@ class CategorySerializer(serializers.ModelSerializer):
             'max_length': 100         # Mirror model's max_length
         }
     }
-                # enforce uniqueness at the serializer layer too
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Category.objects.all(),
-                fields=['user', 'name'],
-                message="You already have a category with this name."
-            )
-        ]
+        # Uniqueness per user is checked by validate_name against the
+        # category map, instead of the default UniqueTogetherValidator query
+        validators = []
         
     
     def validate_name(self, value):
-        user =  self.context['request'].user
-        if Category.objects.filter(user=user, name__iexact=value).exists():
+        request = self.context['request']
+        if find_by_name(category_map(request.user, request), value, exclude=self.instance):
             raise serializers.ValidationError("You already have a category with this name.")
         return value
     
@@ -45,6 +42,34 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
     
     
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    A category id of the requesting user, resolved against the per-user
+    category map (``context['category_map']``, else the request's map)
+    rather than with a query per value.
+    """
+    def get_queryset(self):
+        # Only used for the browsable API's choices
+        request = self.context.get('request')
+        return Category.objects.filter(user=request.user) if request else Category.objects.none()
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        categories = self.context.get('category_map')
+        if categories is None:
+            request = self.context['request']
+            categories = category_map(request.user, request)
+        category = categories.get(pk)
+        if category is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     """
     - Validates that the category belongs to the requesting user.
@@ -54,9 +79,7 @@ class TransactionSerializer(serializers.ModelSerializer):
     
 
     # date = serializers.DateField(input_formats=["%m-%d-%y"]) 
-    category = serializers.PrimaryKeyRelatedField(
-         queryset=Category.objects.none()
-    )
+    category = UserCategoryField()
     
     category_name = serializers.CharField(
         source='category.name', read_only=True
@@ -98,25 +121,12 @@ class TransactionSerializer(serializers.ModelSerializer):
         }
     }
         
-    def get_fields(self):
-        fields = super().get_fields()
-
-        # Check if user categories are already passed in the context
-        if 'user_categories' in self.context:
-            fields['category'].queryset = self.context['user_categories']
-        # else:
-        #     # If not, dynamically filter categories based on the logged-in user (This will not happen)
-        #     user = self.context['request'].user
-        #     fields['category'].queryset = Category.objects.filter(user=user)
-        
-        return fields
-
     def validate_category(self, category):
         """
         Ensure user isn't assigning someone else's category.
         """
         user = self.context['request'].user
-        if category.user != user:
+        if category.user_id != user.pk:
             raise serializers.ValidationError("Cannot use a category you don’t own.")
         return category
 
@@ -129,6 +139,124 @@ class TransactionSerializer(serializers.ModelSerializer):
         return value
 
 
+class TransactionReadSerializer:
+    """
+    Read-only fast path with the same output as ``TransactionSerializer``,
+    built straight from ``.values(*values_fields)`` rows instead of
+    instantiating a serializer and its fields for every transaction.
+    Used by ``TransactionViewSet`` for ``list`` and ``retrieve``, which
+    annotate ``category_name``.
+
+    ``user_id`` (for ``IsOwner``) and ``created_at`` (for keyset cursors)
+    are fetched but not rendered.
+    """
+    values_fields = ('id', 'type', 'amount', 'date', 'note', 'category', 'category_name', 'user_id', 'created_at')
+
+    def __init__(self, instance=None, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @staticmethod
+    def _decimal(value):
+        if value is None or not api_settings.COERCE_DECIMAL_TO_STRING:
+            return value
+        return f"{value:.2f}"
+
+    def to_representation(self, row):
+        data = {
+            'id': row['id'],
+            'type': row['type'],
+            'amount': self._decimal(row['amount']),
+            'date': row['date'].isoformat() if row['date'] is not None else None,
+            'note': row['note'],
+            'category': row['category'],
+            'category_name': row['category_name'],
+        }
+        if self.context.get('running_balance'):
+            data['running_balance'] = self._decimal(row.get('running_balance'))
+        return data
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class BulkTransactionItemSerializer(TransactionSerializer):
+    """
+    One item of a bulk create. ``category`` is resolved against the
+    user's ``category_map`` in the context instead of one lookup per item.
+    """
+    category = serializers.IntegerField()
+
+    def validate_category(self, category_id):
+        category = self.context['category_map'].get(category_id)
+        if category is None:
+            raise serializers.ValidationError("Cannot use a category you don’t own.")
+        return category
+
+
+class CategoryMergeSerializer(serializers.Serializer):
+    """
+    ``sources``: ids of the requesting user's categories to merge into
+    the target category (``context['target']``).
+    """
+    sources = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_sources(self, value):
+        request = self.context['request']
+        categories = category_map(request.user, request)
+        unknown = [pk for pk in value if pk not in categories]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown categories: {', '.join(map(str, unknown))}.")
+        if self.context['target'].pk in value:
+            raise serializers.ValidationError("A category cannot be merged into itself.")
+        return list(dict.fromkeys(value))
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Upload a statement (``file``) and follow the background import.
+    ``format`` defaults from the file extension (.ofx/.qfx → OFX, else CSV).
+    """
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=ImportJob.Format.choices, required=False)
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'file', 'format', 'status', 'progress',
+            'rows_processed', 'rows_imported', 'rows_failed', 'errors',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'id', 'status', 'rows_processed', 'rows_imported', 'rows_failed', 'errors',
+            'created_at', 'started_at', 'finished_at',
+        ]
+
+    def validate_file(self, value):
+        max_bytes = settings.FINANCE_IMPORT_MAX_UPLOAD_BYTES
+        if value.size > max_bytes:
+            raise serializers.ValidationError(f"File is larger than {max_bytes} bytes.")
+        return value
+
+    def validate(self, attrs):
+        if not attrs.get('format'):
+            name = attrs['file'].name.lower()
+            attrs['format'] = (
+                ImportJob.Format.OFX if name.endswith(('.ofx', '.qfx')) else ImportJob.Format.CSV
+            )
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        validated_data['bytes_total'] = validated_data['file'].size
+        return super().create(validated_data)
+
+
 class DashboardSummarySerializer(serializers.Serializer):
     """
     Read-only representation of the user’s current financial snapshot.
@@ -1,38 +1,50 @@
 # finance/services.py
+from collections import defaultdict
+from datetime import timedelta
 from decimal import Decimal
-from django.db.models import Sum, Case, When, F, DecimalField
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum, Case, When, F, Q, DecimalField
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import serializers
 
-from finance.models import Transaction
+from finance import archive, rollups
+from finance.cache import invalidate_user
+from finance.categories import category_map
+from finance.models import ArchivedTransaction, Category, DailyRollup, Transaction, YearlyCategoryTotal
+from finance.serializers import BulkTransactionItemSerializer
 
 
-def financial_summary(*, user, start=None, end=None):
+def summary_rollups(*, user, start=None, end=None):
     """
-    Return {'total_income', 'total_expense', 'balance'} for ``user``.
-    Pass optional ``start`` / ``end`` dates to limit the range.
+    The ``DailyRollup`` rows behind ``financial_summary`` and the
+    aggregates to run over them (for ``aggregate`` or ``aaggregate``).
     """
-
-    qs = Transaction.objects.filter(category__user=user)
+    qs = DailyRollup.objects.filter(user=user)
 
     if start:
         qs = qs.filter(date__gte=start)
     if end:
         qs = qs.filter(date__lte=end)
 
-    sums = qs.aggregate(
-        income=Sum(
+    aggregates = {
+        "income": Sum(
             Case(
-                When(type=Transaction.TransactionType.INCOME, then=F("amount")),
-                output_field=DecimalField(max_digits=10, decimal_places=2),
+                When(type=Transaction.TransactionType.INCOME, then=F("total")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
             )
         ),
-        expense=Sum(
+        "expense": Sum(
             Case(
-                When(type=Transaction.TransactionType.EXPENSE, then=F("amount")),
-                output_field=DecimalField(max_digits=10, decimal_places=2),
+                When(type=Transaction.TransactionType.EXPENSE, then=F("total")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
             )
         ),
-    )
+    }
+    return qs, aggregates
+
 
+def summary_from_sums(sums):
     income  = sums["income"]  or Decimal("0")
     expense = sums["expense"] or Decimal("0")
     return {
@@ -40,3 +52,283 @@ def financial_summary(*, user, start=None, end=None):
         "total_expense": expense,
         "balance":       income - expense,
     }
+
+
+def financial_summary(*, user, start=None, end=None):
+    """
+    Return {'total_income', 'total_expense', 'balance'} for ``user``.
+    Pass optional ``start`` / ``end`` dates to limit the range.
+
+    Reads the per-day rollups, so the cost grows with the number of
+    days in range rather than the number of transactions. Archived
+    transactions keep their rollups and are included.
+    """
+    qs, aggregates = summary_rollups(user=user, start=start, end=end)
+    return summary_from_sums(qs.aggregate(**aggregates))
+
+
+def category_totals_queries(user):
+    """
+    ``(grouped, names)``: per-category totals grouped on the transactions
+    table alone (no join) together with the yearly totals of the archived
+    ones (finance.archive), and the user's category names to label them.
+    The two are independent and can run concurrently.
+    """
+    live = (
+        Transaction.objects.filter(user=user)
+        .order_by()
+        .values('category')
+        .annotate(total_amount=Sum('amount'), txn_count=Count('id'))
+    )
+    archived = (
+        YearlyCategoryTotal.objects.filter(user=user)
+        .order_by()
+        .values('category')
+        .annotate(total_amount=Sum('total'), txn_count=Sum('count'))
+    )
+    grouped = live.union(archived, all=True)
+    names = Category.objects.filter(user=user).values_list('id', 'name')
+    return grouped, names
+
+
+def category_totals_rows(grouped, names):
+    """
+    Combine the results of ``category_totals_queries`` into the
+    ``by-category`` payload, sorted by category name.
+    """
+    names = dict(names)
+    totals = {}
+    for row in grouped:
+        # A category can have both live and archived transactions
+        total, count = totals.get(row['category'], (Decimal("0"), 0))
+        totals[row['category']] = (total + row['total_amount'], count + row['txn_count'])
+    rows = [
+        {
+            'category': category,
+            'category__name': names.get(category),
+            'total_amount': total,
+            'txn_count': count,
+        }
+        for category, (total, count) in totals.items()
+    ]
+    return sorted(rows, key=lambda row: row['category__name'] or '')
+
+
+def category_totals(*, user):
+    grouped, names = category_totals_queries(user)
+    return category_totals_rows(grouped, names)
+
+
+def running_balances(*, user, keys):
+    """
+    Balance after each of the user's transactions identified by ``keys``
+    (``(id, date)`` pairs), in (date, id) order over the user's whole
+    history: ``{id: balance}``.
+
+    Everything before the earliest of those dates comes from the daily
+    rollups as one opening figure; only the rows dated within their span,
+    live and archived (finance.archive), go through the
+    ``SUM(...) OVER (ORDER BY date, id)`` window. A page therefore costs
+    about the size of the page, however deep into the history it sits and
+    whatever filters selected it.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    first = min(day for _, day in keys)
+    last = max(day for _, day in keys)
+
+    signed = DecimalField(max_digits=14, decimal_places=2)
+    opening = DailyRollup.objects.filter(user=user, date__lt=first).aggregate(
+        balance=Sum(
+            Case(
+                When(type=Transaction.TransactionType.EXPENSE, then=-F("total")),
+                default=F("total"),
+                output_field=signed,
+            )
+        ),
+    )["balance"] or Decimal("0")
+
+    # Archived rows are counted in the rollups, so the span includes them
+    # too; a combined query can't take a window, so it is wrapped in one
+    signed_amount = Case(
+        When(type=Transaction.TransactionType.EXPENSE, then=-F("amount")),
+        default=F("amount"),
+        output_field=signed,
+    )
+    live, archived = (
+        model.objects.filter(user=user, date__range=(first, last))
+        .order_by()
+        .values_list("id", "date")
+        .annotate(signed_amount=signed_amount)
+        for model in (Transaction, ArchivedTransaction)
+    )
+    span = live.union(archived, all=True)
+    sql, params = span.query.sql_with_params()
+    connection = connections[span.db]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT span.id, SUM(span.signed_amount) OVER (ORDER BY span.date, span.id) FROM ({sql}) span",
+            params,
+        )
+        window = cursor.fetchall()
+    wanted = {pk for pk, _ in keys}
+    return {pk: opening + balance for pk, balance in window if pk in wanted}
+
+
+TIMESERIES_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _first_bucket(bucket, start):
+    # Weeks start on Monday, as with ``TruncWeek``
+    if bucket == 'week':
+        return start - timedelta(days=start.weekday())
+    if bucket == 'month':
+        return start.replace(day=1)
+    return start
+
+
+def bucket_count(bucket, start, end):
+    """
+    Number of ``bucket`` periods overlapping ``start``..``end``, worked
+    out without listing them.
+    """
+    if bucket == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (end - _first_bucket(bucket, start)).days
+    return days // 7 + 1 if bucket == 'week' else days + 1
+
+
+def bucket_starts(bucket, start, end):
+    """
+    Start date of every ``bucket`` period overlapping ``start``..``end``.
+    """
+    current = _first_bucket(bucket, start)
+    starts = []
+    while current <= end:
+        starts.append(current)
+        if bucket == 'day':
+            current += timedelta(days=1)
+        elif bucket == 'week':
+            current += timedelta(weeks=1)
+        else:
+            current = (current + timedelta(days=32)).replace(day=1)
+    return starts
+
+
+def transaction_timeseries(*querysets, bucket, periods):
+    """
+    Income, expense and net per ``bucket`` period of ``querysets`` (live
+    transactions, and archived ones if asked for) together, grouped in
+    the database and returned for every date in ``periods`` (the output
+    of ``bucket_starts``), so empty periods come back as zeros.
+    """
+    totals = defaultdict(lambda: (Decimal("0"), Decimal("0")))
+    for queryset in querysets:
+        grouped = (
+            queryset.order_by()
+            .annotate(period=TIMESERIES_BUCKETS[bucket]('date'))
+            .values('period')
+            .annotate(
+                income=Sum('amount', filter=Q(type=Transaction.TransactionType.INCOME)),
+                expense=Sum('amount', filter=Q(type=Transaction.TransactionType.EXPENSE)),
+            )
+        )
+        for row in grouped:
+            income, expense = totals[row['period']]
+            totals[row['period']] = (income + (row['income'] or Decimal("0")), expense + (row['expense'] or Decimal("0")))
+
+    series = []
+    for period in periods:
+        income, expense = totals.get(period, (Decimal("0"), Decimal("0")))
+        series.append({
+            'period': period,
+            'income': income,
+            'expense': expense,
+            'net': income - expense,
+        })
+    return series
+
+
+def bulk_create_transactions(*, user, items, chunk_size):
+    """
+    Validate and insert many transactions for ``user``.
+
+    Category ownership for the whole payload is checked against the
+    user's category map (finance.categories),
+    valid rows are inserted with ``bulk_create`` in ``chunk_size`` batches
+    (each batch committed together with its rollup deltas), and invalid
+    rows are reported back instead of failing the batch.
+
+    Returns ``(created_ids, errors)`` where ``errors`` is a list of
+    ``{'index': i, 'errors': {...}}``.
+    """
+    # One child serializer validates every item, as ListSerializer does
+    child = BulkTransactionItemSerializer(context={'category_map': category_map(user)})
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            data = child.run_validation(item)
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+            continue
+        valid.append(Transaction(user=user, **data))
+
+    created_ids = []
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        deltas = defaultdict(lambda: (Decimal("0"), 0))
+        for txn in chunk:
+            total, count = deltas[(user.pk, txn.date, txn.type)]
+            deltas[(user.pk, txn.date, txn.type)] = (total + txn.amount, count + 1)
+        with transaction.atomic(using=router.db_for_write(Transaction)):
+            Transaction.objects.bulk_create(chunk)
+            rollups.apply_deltas(deltas)
+        created_ids.extend(txn.pk for txn in chunk)
+
+    if created_ids:
+        invalidate_user(user.pk)
+    return created_ids, errors
+
+
+def merge_categories(*, target, source_ids, batch_size):
+    """
+    Move every transaction in the ``source_ids`` categories into
+    ``target``, archived ones and their yearly totals included, and
+    delete the sources, all in one database transaction.
+
+    Transactions are moved with ``UPDATE ... WHERE id IN (... LIMIT
+    batch_size)`` statements so no single statement has to rewrite
+    millions of rows. The daily rollups are per user, date and type, so a
+    merge within one user leaves them as they are; the user's response
+    cache and category map are invalidated. Returns the number of
+    transactions moved.
+    """
+    with transaction.atomic(using=router.db_for_write(Transaction)):
+        # Locked first, so a concurrent insert into a source waits for the
+        # merge and then fails its foreign key check instead of being orphaned
+        sources = list(
+            Category.objects.select_for_update()
+            .filter(user_id=target.user_id, pk__in=source_ids)
+            .values_list('pk', flat=True)
+        )
+        now = timezone.now()
+        moved = 0
+        for model in (Transaction, ArchivedTransaction):
+            pending = model.objects.filter(category_id__in=sources).order_by()
+            while True:
+                batch = model.objects.filter(pk__in=pending.values('pk')[:batch_size])
+                updated = batch.update(category=target, updated_at=now)
+                moved += updated
+                if updated < batch_size:
+                    break
+        archive.move_yearly_totals(sources, target)
+        Category.objects.filter(pk__in=sources).delete()
+
+    if moved:
+        invalidate_user(target.user_id)
+    return moved
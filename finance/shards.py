@@ -0,0 +1,231 @@
+# finance/shards.py
+"""
+Placing users on shards and moving them between shards (see
+core.routers for how queries find a user's shard).
+
+A shard holds the ``finance`` rows of its users plus a copy of each of
+those users' ``auth_user`` row, which their foreign keys point at (with
+an unusable password: logins are checked on ``default``). Row ids stay
+unique across shards because each shard numbers new rows from its own
+range: the n-th alias of ``every_shard()`` from n * FINANCE_SHARD_ID_SPACE
+(``prepare_shard``, run after each ``migrate``). A moved user's rows
+therefore keep their ids on the target shard.
+
+Sequence ranges need PostgreSQL; elsewhere ``prepare_shard`` does nothing.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, Sum
+
+from core.routers import (
+    assign_shard, every_shard, freeze_writes, hashed_shard, shard_for, shards, thaw_writes, writes_frozen,
+)
+from finance.cache import invalidate_user
+from finance.categories import invalidate_categories
+from finance.models import (
+    ArchivedTransaction, Category, DailyRollup, ImportJob, Transaction, YearlyCategoryTotal,
+)
+
+logger = logging.getLogger(__name__)
+
+# A user's rows, parents before children
+USER_MODELS = (Category, Transaction, ArchivedTransaction, YearlyCategoryTotal, DailyRollup, ImportJob)
+# The amount each one carries, summed to check a copy
+SUM_FIELDS = {Transaction: 'amount', ArchivedTransaction: 'amount', YearlyCategoryTotal: 'total', DailyRollup: 'total'}
+# The ones whose ids come from a sequence
+SEQUENCED_MODELS = (Category, Transaction, YearlyCategoryTotal, DailyRollup, ImportJob)
+# How long a move may keep a user's writes frozen, should it die half-way
+FREEZE_TIMEOUT = 60 * 60
+
+
+class ShardMoveError(ValueError):
+    """A user can't be moved to the shard asked for."""
+
+
+def prepare_shard(alias):
+    """
+    Start the id sequences of ``alias`` at the beginning of its range,
+    unless they are past it already. Safe to run any number of times.
+    """
+    connection = connections[alias]
+    floor = every_shard().index(alias) * settings.FINANCE_SHARD_ID_SPACE
+    if connection.vendor != 'postgresql' or not floor:
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model in SEQUENCED_MODELS:
+            table, column = model._meta.db_table, model._meta.pk.column
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [qn(table), column])
+            (sequence,) = cursor.fetchone()
+            cursor.execute(
+                f"SELECT setval(%s, GREATEST(%s, COALESCE(pg_sequence_last_value(%s::regclass), 0), "
+                f"(SELECT COALESCE(MAX({qn(column)}), 0) FROM {qn(table)})))",
+                [sequence, floor, sequence],
+            )
+
+
+def _insert(model, objs, alias):
+    """
+    INSERT ``objs`` into ``alias`` with every field as it is: no
+    ``auto_now`` timestamps, no ``save()`` or signals, ids kept.
+    """
+    connection = connections[alias]
+    qn = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(qn(f.column) for f in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql, [[f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields] for obj in objs]
+        )
+
+
+def copy_user(user, alias):
+    """
+    Put a copy of ``user`` on ``alias`` for their rows there to point at.
+    """
+    User = get_user_model()
+    if alias == DEFAULT_DB_ALIAS or User._base_manager.using(alias).filter(pk=user.pk).exists():
+        return
+    shadow = User._base_manager.using(DEFAULT_DB_ALIAS).get(pk=user.pk)
+    shadow.password = make_password(None)
+    _insert(User, [shadow], alias)
+
+
+def copy_rows(model, source, target, batch_size, **filters):
+    """
+    Copy the ``model`` rows matching ``filters`` from ``source`` to
+    ``target``, ``batch_size`` at a time in id order. Returns how many.
+    """
+    rows = model._base_manager.using(source).filter(**filters).order_by('pk')
+    copied, last = 0, None
+    while True:
+        batch = list((rows if last is None else rows.filter(pk__gt=last))[:batch_size])
+        if not batch:
+            return copied
+        _insert(model, batch, target)
+        copied += len(batch)
+        last = batch[-1].pk
+
+
+def fingerprint(model, alias, user_id):
+    """
+    ``(count, sum)`` of ``user_id``'s ``model`` rows on ``alias``, the sum
+    over the model's SUM_FIELDS field (``None`` without one).
+    """
+    sum_field = SUM_FIELDS.get(model)
+    aggregates = {'count': Count('pk')}
+    if sum_field:
+        aggregates['sum'] = Sum(sum_field)
+    result = model._base_manager.using(alias).filter(user_id=user_id).aggregate(**aggregates)
+    return result['count'], result.get('sum')
+
+
+def delete_rows(model, alias, user_id, batch_size):
+    """
+    Delete ``user_id``'s ``model`` rows from ``alias`` with plain DELETEs
+    (``QuerySet.delete()`` would take them out of the rollups as well).
+    """
+    connection = connections[alias]
+    qn = connection.ops.quote_name
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {pk} IN (SELECT {pk} FROM {table} WHERE {qn('user_id')} = %s LIMIT %s)",
+                [user_id, batch_size],
+            )
+            if cursor.rowcount < batch_size:
+                return
+
+
+def purge_user(user_id, alias, *, batch_size=1000):
+    """
+    Delete every finance row of ``user_id`` from ``alias``, and the copy
+    of the user there unless ``alias`` is ``default``.
+    """
+    for model in reversed(USER_MODELS):
+        delete_rows(model, alias, user_id, batch_size)
+    if alias != DEFAULT_DB_ALIAS:
+        User = get_user_model()
+        # Nothing points at the copy any more
+        User._base_manager.using(alias).filter(pk=user_id).delete()
+
+
+def place_new_user(user):
+    """
+    Put a new user on the shard their id hashes to.
+    """
+    alias = hashed_shard(user.pk)
+    copy_user(user, alias)
+    assign_shard(user.pk, alias)
+    return alias
+
+
+def move_user(user_id, target, *, batch_size=1000, grace=None):
+    """
+    Move ``user_id``'s finance data to the ``target`` shard:
+
+    1. turn their writes away (``core.middleware.ShardMiddleware``) and
+       wait ``grace`` (FINANCE_SHARD_MOVE_GRACE_SECONDS) seconds for the
+       requests in flight to finish;
+    2. copy their rows, in one transaction on ``target``, then count (and
+       sum the amounts of) every table on both databases; any difference,
+       e.g. a write that was still in flight, aborts the move;
+    3. abort as well if the freeze lapsed (FREEZE_TIMEOUT) meanwhile,
+       else point ``UserShard`` at ``target`` and let writes through;
+    4. delete the rows left on the source.
+
+    An aborted move leaves nothing on ``target`` and the user on
+    ``source``. Reads carry on from the source until step 3. Returns the
+    number of rows moved per model name.
+    """
+    User = get_user_model()
+    source = shard_for(user_id)
+    if target not in shards():
+        raise ShardMoveError(f"{target!r} is not one of FINANCE_SHARDS.")
+    if target == source:
+        raise ShardMoveError(f"User {user_id} is on {target!r} already.")
+    user = User._base_manager.get(pk=user_id)
+    for model in USER_MODELS:
+        if model._base_manager.using(target).filter(user_id=user_id).exists():
+            raise ShardMoveError(f"{target!r} already has {model.__name__} rows of user {user_id}.")
+    if ImportJob._base_manager.using(source).filter(
+        user_id=user_id, status__in=[ImportJob.Status.PENDING, ImportJob.Status.RUNNING]
+    ).exists():
+        raise ShardMoveError(f"User {user_id} has an import in progress.")
+
+    prepare_shard(target)
+    freeze_writes(user_id, timeout=FREEZE_TIMEOUT)
+    try:
+        time.sleep(settings.FINANCE_SHARD_MOVE_GRACE_SECONDS if grace is None else grace)
+        moved = {}
+        with transaction.atomic(using=target):
+            copy_user(user, target)
+            for model in USER_MODELS:
+                moved[model.__name__] = copy_rows(model, source, target, batch_size, user_id=user_id)
+            for model in USER_MODELS:
+                expected, copied = fingerprint(model, source, user_id), fingerprint(model, target, user_id)
+                if copied != expected:
+                    raise ShardMoveError(
+                        f"{model.__name__} rows of user {user_id} changed during the move "
+                        f"(source {expected}, copied {copied}); nothing was moved."
+                    )
+            if not writes_frozen(user_id):
+                raise ShardMoveError(f"Writes of user {user_id} were let through before the copy ended; nothing was moved.")
+        assign_shard(user_id, target)
+    finally:
+        thaw_writes(user_id)
+
+    purge_user(user_id, source, batch_size=batch_size)
+    invalidate_user(user_id)
+    invalidate_categories(user_id)
+    logger.info(f"move_user: moved user {user_id} from {source!r} to {target!r}: {moved}")
+    return moved
@@ -0,0 +1,61 @@
+# finance/signals.py
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.routers import shard_for, shards
+from finance import rollups, shards as finance_shards
+from finance.cache import invalidate_user
+from finance.categories import invalidate_categories
+from finance.models import Category, Transaction
+
+
+@receiver(post_delete, sender=Transaction)
+def remove_transaction_from_rollup(sender, instance, using, **kwargs):
+    """
+    Runs inside the delete's own atomic block, for single deletes and
+    ``QuerySet.delete()`` alike.
+    """
+    rollups.record_change(
+        (instance.user_id, instance.date, instance.type, instance.amount), None, using=using
+    )
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Transaction)
+def invalidate_transaction_owner(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_owner(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+    invalidate_categories(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def place_new_user(sender, instance, created, using, raw=False, **kwargs):
+    if created and not raw and using == DEFAULT_DB_ALIAS and shards():
+        finance_shards.place_new_user(instance)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def purge_deleted_user_shard(sender, instance, using, **kwargs):
+    """
+    The cascade of a user's deletion only reaches ``default``; their rows
+    on a shard (and the copy of them there) go once it commits.
+    """
+    if using != DEFAULT_DB_ALIAS or not shards():
+        return
+    alias = shard_for(instance.pk)
+    if alias != DEFAULT_DB_ALIAS:
+        user_id = instance.pk
+        transaction.on_commit(lambda: finance_shards.purge_user(user_id, alias), using=using)
+
+
+@receiver(post_migrate)
+def prepare_shard(sender, app_config, using, **kwargs):
+    if app_config.label == 'finance' and using in shards():
+        finance_shards.prepare_shard(using)
@@ -0,0 +1,28 @@
+# finance/tasks.py
+import logging
+
+from celery import shared_task
+
+from core.routers import pin_to_primary, use_shard_of
+from finance.imports import run_import
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_import_job(job_id, user_id=None):
+    """
+    Import an uploaded statement. Acknowledged only once it finishes, so
+    a job whose worker dies is redelivered and resumes from its last
+    committed chunk. ``user_id`` (the job's owner) says which shard the
+    job is on.
+    """
+    with use_shard_of(user_id):
+        job = run_import(job_id)
+    # Let the user see the imported rows before the replicas catch up
+    pin_to_primary(job.user_id)
+    logger.info(
+        f"process_import_job: job {job_id} {job.get_status_display().lower()} "
+        f"({job.rows_imported} imported, {job.rows_failed} failed)"
+    )
+    return {"status": job.status, "rows_imported": job.rows_imported, "rows_failed": job.rows_failed}
@@ -0,0 +1,223 @@
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import tasks
+from finance import archive, partitions, rollups
+from finance.models import ArchivedTransaction, Category, Transaction, YearlyCategoryTotal
+from finance.services import category_totals, financial_summary, merge_categories
+
+User = get_user_model()
+
+CUTOFF = date(2024, 1, 1)
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def salary(user):
+    return Category.objects.create(user=user, name="Salary")
+
+
+@pytest.fixture
+def food(user):
+    return Category.objects.create(user=user, name="Food")
+
+
+@pytest.fixture
+def history(salary, food):
+    """
+    Income 100 and expense 30 on the 10th of every month of 2022 through
+    2024; 2022 and 2023 are before the cutoff.
+    """
+    rows = []
+    for year in (2022, 2023, 2024):
+        for month in range(1, 13):
+            rows.append(Transaction.objects.create(category=salary, type="I", amount=Decimal("100.00"), date=date(year, month, 10)))
+            rows.append(Transaction.objects.create(category=food, type="E", amount=Decimal("30.00"), date=date(year, month, 10)))
+    return rows
+
+
+def test_cutoff_is_the_first_of_the_month_n_months_back():
+    assert archive.archive_cutoff(today=date(2026, 10, 18), months=24) == date(2024, 10, 1)
+    assert archive.archive_cutoff(today=date(2026, 1, 31), months=1) == date(2025, 12, 1)
+    assert archive.archive_cutoff(today=date(2026, 3, 1), months=14) == date(2025, 1, 1)
+
+
+def test_old_rows_move_to_the_archive_in_batches(user, history):
+    old = sorted(row.pk for row in history if row.date < CUTOFF)
+
+    assert archive.archive_before(CUTOFF, batch_size=5) == len(old)
+
+    assert not Transaction.objects.filter(date__lt=CUTOFF).exists()
+    assert Transaction.objects.count() == len(history) - len(old)
+    assert sorted(ArchivedTransaction.objects.values_list("id", flat=True)) == old
+    # Nothing left to do on a second run
+    assert archive.archive_before(CUTOFF, batch_size=5) == 0
+
+
+def test_archived_row_keeps_its_fields(history):
+    original = Transaction.objects.values().get(pk=history[0].pk)
+    archive.archive_before(CUTOFF)
+    copy = ArchivedTransaction.objects.values().get(pk=history[0].pk)
+    assert copy == original
+
+
+def test_yearly_totals_per_category(user, salary, food, history):
+    archive.archive_before(CUTOFF)
+    totals = set(YearlyCategoryTotal.objects.values_list("category", "year", "type", "total", "count"))
+    assert totals == {
+        (salary.pk, 2022, "I", Decimal("1200.00"), 12),
+        (salary.pk, 2023, "I", Decimal("1200.00"), 12),
+        (food.pk, 2022, "E", Decimal("360.00"), 12),
+        (food.pk, 2023, "E", Decimal("360.00"), 12),
+    }
+
+
+def test_summaries_stay_exact(user, history):
+    summary = financial_summary(user=user)
+    in_2023 = financial_summary(user=user, start=date(2023, 3, 1), end=date(2024, 2, 28))
+    by_category = category_totals(user=user)
+
+    archive.archive_before(CUTOFF)
+
+    assert financial_summary(user=user) == summary
+    assert financial_summary(user=user, start=date(2023, 3, 1), end=date(2024, 2, 28)) == in_2023
+    assert category_totals(user=user) == by_category
+    assert rollups.find_drift() == []
+
+
+def test_list_includes_archived_rows_only_on_request(auth_client, history):
+    archive.archive_before(CUTOFF)
+    url = reverse("finance:transaction-list")
+
+    live = auth_client.get(url, {"page_size": 100}).json()
+    assert live["count"] == 24
+
+    response = auth_client.get(url, {"include_archived": "true", "page_size": 100, "type": "I"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 36
+    dates = [row["date"] for row in body["results"]]
+    assert dates == sorted(dates, reverse=True)
+    assert {row["type"] for row in body["results"]} == {"I"}
+    assert body["results"][-1]["category_name"] == "Salary"
+
+
+def test_list_with_archive_rejects_cursor_pagination(auth_client, history):
+    archive.archive_before(CUTOFF)
+    response = auth_client.get(
+        reverse("finance:transaction-list"), {"include_archived": "true", "pagination": "cursor"}
+    )
+    assert response.status_code == 400
+
+
+def test_running_balance_counts_archived_rows(auth_client, history):
+    url = reverse("finance:transaction-list")
+    params = {"running_balance": "true", "ordering": "date", "date_after": "2023-06-01", "page_size": 100}
+    before = auth_client.get(url, params).json()["results"]
+
+    archive.archive_before(CUTOFF)
+
+    after = auth_client.get(url, {**params, "include_archived": "true"}).json()["results"]
+    assert [row["running_balance"] for row in after] == [row["running_balance"] for row in before]
+
+
+def test_detail_falls_back_to_the_archive(auth_client, history):
+    archive.archive_before(CUTOFF)
+    url = reverse("finance:transaction-detail", args=[history[0].pk])
+
+    assert auth_client.get(url).status_code == 404
+    response = auth_client.get(url, {"include_archived": "true"})
+    assert response.status_code == 200
+    assert response.json()["amount"] == "100.00"
+
+
+def test_other_users_archived_rows_stay_hidden(history):
+    archive.archive_before(CUTOFF)
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    client = APIClient()
+    client.force_authenticate(other)
+
+    assert client.get(reverse("finance:transaction-list"), {"include_archived": "true"}).json()["count"] == 0
+    url = reverse("finance:transaction-detail", args=[history[0].pk])
+    assert client.get(url, {"include_archived": "true"}).status_code == 404
+
+
+def test_merge_moves_archived_rows_and_totals(user, salary, food, history):
+    archive.archive_before(CUTOFF)
+    by_category = category_totals(user=user)
+
+    merge_categories(target=salary, source_ids=[food.pk], batch_size=1000)
+
+    assert not ArchivedTransaction.objects.exclude(category=salary).exists()
+    assert set(YearlyCategoryTotal.objects.values_list("category", "year", "type", "total")) == {
+        (salary.pk, 2022, "I", Decimal("1200.00")),
+        (salary.pk, 2023, "I", Decimal("1200.00")),
+        (salary.pk, 2022, "E", Decimal("360.00")),
+        (salary.pk, 2023, "E", Decimal("360.00")),
+    }
+    merged = category_totals(user=user)
+    assert [row["category"] for row in merged] == [salary.pk]
+    assert merged[0]["txn_count"] == sum(row["txn_count"] for row in by_category)
+
+
+def test_task_archives_and_drops_emptied_partitions(history, monkeypatch):
+    partitions.ensure_partitions(date(2022, 1, 1), date(2024, 12, 31), interval="month")
+    monkeypatch.setattr(archive, "archive_cutoff", lambda months=None: CUTOFF)
+
+    assert tasks.archive_old_transactions() == 48
+
+    if partitions.is_partitioned():
+        names = {name for name, _, _ in partitions.existing_partitions()}
+        assert partitions.partition_name(date(2023, 12, 1), "month") not in names
+        assert partitions.partition_name(date(2024, 1, 1), "month") in names
+
+
+def test_search_covers_archived_rows(auth_client, history):
+    archive.archive_before(CUTOFF)
+    response = auth_client.get(
+        reverse("finance:transaction-list"), {"include_archived": "true", "search": "food", "page_size": 100}
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 36
+
+
+
+def test_export_includes_archived_rows_only_on_request(auth_client, history):
+    archive.archive_before(CUTOFF)
+    url = reverse("finance:transaction-export")
+
+    live = b"".join(auth_client.get(url, {"output": "ndjson"}).streaming_content).decode().splitlines()
+    assert len(live) == 24
+
+    response = auth_client.get(url, {"output": "ndjson", "include_archived": "true", "type": "E"})
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+    assert len(rows) == 36
+    assert {row["category_name"] for row in rows} == {"Food"}
+    assert rows[-1]["date"] == "2022-01-10"
+
+
+def test_timeseries_includes_archived_rows_only_on_request(auth_client, history):
+    url = reverse("finance:transaction-timeseries")
+    before = auth_client.get(url, {"bucket": "month"}).json()
+
+    archive.archive_before(CUTOFF)
+
+    live = auth_client.get(url, {"bucket": "month"}).json()
+    assert live["start"] == "2024-01-10"
+    assert auth_client.get(url, {"bucket": "month", "include_archived": "true"}).json() == before
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance.async_views import run_concurrently
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+# The concurrent queries run on their own connections, which only see
+# committed data
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def history(user):
+    salary = Category.objects.create(user=user, name="Salary")
+    food = Category.objects.create(user=user, name="Food")
+    Transaction.objects.create(category=salary, type="I", amount=Decimal("100.00"), date=date(2025, 1, 1))
+    for day in range(2, 9):
+        Transaction.objects.create(category=food, type="E", amount=Decimal("3.50"), date=date(2025, 1, day), note=f"day {day}")
+
+
+def async_get(url, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+
+def sync_get(user, name):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client.get(reverse(name)).json()
+
+
+def test_async_endpoints_match_sync_payloads(user, history):
+    token = AccessToken.for_user(user)
+    assert async_get(reverse("finance:async-dashboard"), token).json() == sync_get(user, "finance:dashboard-list")
+    assert (
+        async_get(reverse("finance:async-transaction-by-category"), token).json()
+        == sync_get(user, "finance:transaction-by-category")
+    )
+
+
+def test_overview_combines_summary_categories_and_recent(user, history):
+    res = async_get(reverse("finance:async-dashboard-overview"), AccessToken.for_user(user))
+    assert res.status_code == 200
+    body = res.json()
+    assert body["summary"]["balance"] == 75.5
+    assert [row["category__name"] for row in body["by_category"]] == ["Food", "Salary"]
+    assert [row["note"] for row in body["recent"]] == ["day 8", "day 7", "day 6", "day 5", "day 4"]
+
+
+def test_async_endpoints_require_authentication(user):
+    url = reverse("finance:async-dashboard-overview")
+    assert async_get(url).status_code == 401
+    assert async_get(url, "not-a-token").status_code == 401
+
+
+def test_run_concurrently_overlaps_blocking_calls():
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    started = time.perf_counter()
+    results = async_to_sync(run_concurrently)(lambda: slow(1), lambda: slow(2), lambda: slow(3))
+    assert results == [1, 2, 3]
+    assert time.perf_counter() - started < 0.5
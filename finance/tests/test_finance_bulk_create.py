@@ -0,0 +1,111 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance import rollups
+from finance.models import Category, DailyRollup, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="bob", email="bob@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Food")
+
+
+def bulk_url(**params):
+    url = reverse("finance:transaction-bulk-create")
+    if params:
+        url += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+    return url
+
+
+def item(category, **overrides):
+    data = {"type": "E", "amount": "9.99", "date": "2025-03-01", "category": category.pk, "note": "imported"}
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.django_db
+def test_bulk_create_inserts_all_valid_items(auth_client, user, category):
+    payload = [item(category, amount=str(i + 1)) for i in range(12)]
+    res = auth_client.post(bulk_url(chunk_size=5), payload, format="json")
+
+    assert res.status_code == 201, res.content
+    body = res.json()
+    assert body["created"] == 12
+    assert body["errors"] == []
+    assert set(body["ids"]) == set(Transaction.objects.filter(user=user).values_list("id", flat=True))
+    assert DailyRollup.objects.get(user=user, date=date(2025, 3, 1), type="E").total == Decimal(sum(range(1, 13)))
+    assert rollups.find_drift() == []
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_per_item_errors(auth_client, user, category, other_user):
+    foreign = Category.objects.create(user=other_user, name="Theirs")
+    payload = {
+        "transactions": [
+            item(category),
+            item(foreign),
+            item(category, amount="-1"),
+            item(category, type="X"),
+            "not an object",
+            item(category, amount="3.00"),
+        ]
+    }
+    res = auth_client.post(bulk_url(), payload, format="json")
+
+    assert res.status_code == 201
+    body = res.json()
+    assert body["created"] == 2
+    assert [error["index"] for error in body["errors"]] == [1, 2, 3, 4]
+    assert "category" in body["errors"][0]["errors"]
+    assert not Transaction.objects.filter(category=foreign).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_create_validates_ownership_with_one_query(auth_client, category, django_assert_max_num_queries):
+    second = Category.objects.create(user=category.user, name="Rent")
+    payload = [item(category if i % 2 else second) for i in range(200)]
+    # category lookup + one INSERT and one rollup upsert per chunk, plus savepoints
+    with django_assert_max_num_queries(1 + 2 * (2 + 2)):
+        res = auth_client.post(bulk_url(chunk_size=100), payload, format="json")
+    assert res.json()["created"] == 200
+
+
+@pytest.mark.django_db
+def test_bulk_create_rejects_oversized_and_empty_payloads(auth_client, category, settings):
+    settings.FINANCE_BULK_MAX_ITEMS = 3
+    res = auth_client.post(bulk_url(), [item(category)] * 4, format="json")
+    assert res.status_code == 400
+    assert "At most 3" in res.json()["detail"]
+
+    assert auth_client.post(bulk_url(), [], format="json").status_code == 400
+    assert Transaction.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_with_nothing_valid_returns_400(auth_client, category):
+    res = auth_client.post(bulk_url(), [item(category, amount="0")], format="json")
+    assert res.status_code == 400
+    assert res.json()["created"] == 0
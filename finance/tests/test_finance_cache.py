@@ -0,0 +1,93 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.cache import cache_stats, user_version
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Salary")
+
+
+def add_income(category, amount):
+    return Transaction.objects.create(
+        category=category, type=Transaction.TransactionType.INCOME, amount=Decimal(amount), date=date(2025, 1, 1)
+    )
+
+
+@pytest.mark.django_db
+def test_dashboard_second_hit_skips_database(auth_client, category, django_assert_num_queries):
+    add_income(category, "10.00")
+    url = reverse("finance:dashboard-list")
+    first = auth_client.get(url)
+    with django_assert_num_queries(0):
+        second = auth_client.get(url)
+    assert first.json() == second.json()
+
+
+@pytest.mark.django_db
+def test_transaction_write_invalidates_dashboard(auth_client, category):
+    url = reverse("finance:dashboard-list")
+    add_income(category, "10.00")
+    assert Decimal(str(auth_client.get(url).json()["total_income"])) == Decimal("10.00")
+
+    add_income(category, "5.00")
+    assert Decimal(str(auth_client.get(url).json()["total_income"])) == Decimal("15.00")
+
+
+@pytest.mark.django_db
+def test_category_rename_invalidates_by_category(auth_client, category, django_assert_num_queries):
+    add_income(category, "10.00")
+    url = reverse("finance:transaction-by-category")
+    assert auth_client.get(url).json()[0]["category__name"] == "Salary"
+    with django_assert_num_queries(0):
+        auth_client.get(url)
+
+    category.name = "Wages"
+    category.save()
+    assert auth_client.get(url).json()[0]["category__name"] == "Wages"
+
+
+@pytest.mark.django_db
+def test_versions_are_per_user(user, category):
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    other_version = user_version(other.pk)
+    version = user_version(user.pk)
+
+    add_income(category, "1.00")
+    assert user_version(user.pk) != version
+    assert user_version(other.pk) == other_version
+
+
+@pytest.mark.django_db
+def test_cache_stats_reports_hit_ratio(auth_client, user, category):
+    url = reverse("finance:dashboard-list")
+    auth_client.get(url)
+    auth_client.get(url)
+    auth_client.get(url)
+    assert cache_stats() == {"hits": 2, "misses": 1, "hit_ratio": 0.6667}
+
+    stats_url = reverse("finance:dashboard-cache-stats")
+    assert auth_client.get(stats_url).status_code == 403
+    user.is_staff = True
+    user.save()
+    assert auth_client.get(stats_url).json()["hits"] == 2
@@ -0,0 +1,177 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from finance.categories import category_map
+from finance.imports import CategoryResolver
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    cache.clear()
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Salary")
+
+
+@pytest.fixture
+def foreign_category(db):
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    return Category.objects.create(user=other, name="Salary")
+
+
+def test_map_is_cached_across_and_within_requests(user, category, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert category_map(user)[category.pk].name == "Salary"
+    request = APIRequestFactory().get("/")
+    with django_assert_num_queries(0):
+        first = category_map(user, request)
+        assert category_map(user, request) is first
+        assert first[category.pk].user_id == user.pk
+
+
+def test_category_writes_invalidate_the_map(user, category):
+    category_map(user)
+    category.name = "Wages"
+    category.save()
+    assert category_map(user)[category.pk].name == "Wages"
+
+    extra = Category.objects.create(user=user, name="Rent")
+    assert set(category_map(user)) == {category.pk, extra.pk}
+
+    extra.delete()
+    assert set(category_map(user)) == {category.pk}
+
+    CategoryResolver(user).resolve(["Groceries"])
+    assert {c.name for c in category_map(user).values()} == {"Wages", "Groceries"}
+
+
+def test_transaction_writes_keep_the_map(user, category, django_assert_num_queries):
+    category_map(user)
+    Transaction.objects.create(category=category, type="I", amount=Decimal("5.00"), date=date(2025, 1, 1))
+    with django_assert_num_queries(0):
+        category_map(user)
+
+
+def test_create_transaction_resolves_category_from_map(auth_client, category, django_assert_num_queries):
+    category_map(category.user)
+    body = {"type": "I", "amount": "10.00", "date": "2025-01-01", "category": category.pk}
+    # savepoint, insert, rollup upsert, release: no category lookups
+    with django_assert_num_queries(4):
+        response = auth_client.post(reverse("finance:transaction-list"), body, format="json")
+    assert response.status_code == 201, response.data
+    assert response.data["category_name"] == "Salary"
+
+
+@pytest.mark.parametrize("value, message", [
+    ("foreign", "object does not exist"),
+    (999999, "object does not exist"),
+    ("abc", "Incorrect type"),
+])
+def test_rejects_categories_not_in_map(auth_client, category, foreign_category, value, message):
+    value = foreign_category.pk if value == "foreign" else value
+    body = {"type": "I", "amount": "10.00", "date": "2025-01-01", "category": value}
+    response = auth_client.post(reverse("finance:transaction-list"), body, format="json")
+    assert response.status_code == 400
+    assert message in str(response.data["category"])
+
+
+def test_filter_checks_category_against_map(auth_client, category, foreign_category):
+    Transaction.objects.create(category=category, type="I", amount=Decimal("5.00"), date=date(2025, 1, 1))
+    url = reverse("finance:transaction-list")
+    response = auth_client.get(url, {"category": category.pk})
+    assert response.status_code == 200 and response.data["count"] == 1
+    assert auth_client.get(url, {"category": foreign_category.pk}).status_code == 400
+
+
+def test_category_names_unique_case_insensitively(auth_client, category):
+    url = reverse("finance:category-list")
+    response = auth_client.post(url, {"name": "salary"}, format="json")
+    assert response.status_code == 400
+    assert "You already have a category with this name." in response.data["name"]
+
+    # Saving a category under its own name is not a duplicate
+    detail = reverse("finance:category-detail", kwargs={"pk": category.pk})
+    assert auth_client.put(detail, {"name": "Salary"}, format="json").status_code == 200
+
+
+def add_expenses(category, count, amount="2.00"):
+    Transaction.objects.bulk_create([
+        Transaction(user=category.user, category=category, type="E", amount=Decimal(amount), date=date(2025, 1, 2))
+        for _ in range(count)
+    ])
+
+
+def test_merge_moves_transactions_and_deletes_sources(auth_client, user, category):
+    rent = Category.objects.create(user=user, name="Rent")
+    misc = Category.objects.create(user=user, name="Misc")
+    add_expenses(rent, 3)
+    add_expenses(misc, 2)
+    add_expenses(category, 1)
+    by_category = reverse("finance:transaction-by-category")
+    assert len(auth_client.get(by_category).data) == 3  # now cached
+
+    response = auth_client.post(
+        reverse("finance:category-merge", kwargs={"pk": category.pk}), {"sources": [rent.pk, misc.pk, rent.pk]}, format="json"
+    )
+    assert response.status_code == 200, response.data
+    assert response.data == {"target": category.pk, "merged": [rent.pk, misc.pk], "moved": 5}
+    assert not Category.objects.filter(pk__in=[rent.pk, misc.pk]).exists()
+    assert Transaction.objects.filter(category=category).count() == 6
+    assert set(category_map(user)) == {category.pk}
+    rows = auth_client.get(by_category).data
+    assert [(row["category"], row["txn_count"]) for row in rows] == [(category.pk, 6)]
+
+
+def test_merge_in_batches(user, category):
+    from finance.services import merge_categories
+
+    source = Category.objects.create(user=user, name="Rent")
+    add_expenses(source, 10)
+    assert merge_categories(target=category, source_ids=[source.pk], batch_size=3) == 10
+    assert Transaction.objects.filter(category=category).count() == 10
+
+
+def test_merge_is_all_or_nothing(user, category, monkeypatch):
+    from finance import services
+
+    source = Category.objects.create(user=user, name="Rent")
+    add_expenses(source, 4)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("delete failed")
+    monkeypatch.setattr(services.Category.objects.none().__class__, "delete", fail)
+    with pytest.raises(RuntimeError):
+        services.merge_categories(target=category, source_ids=[source.pk], batch_size=2)
+    assert Transaction.objects.filter(category=source).count() == 4
+
+
+@pytest.mark.parametrize("sources", ["foreign", "self", "empty"])
+def test_merge_validates_sources(auth_client, category, foreign_category, sources):
+    sources = {"foreign": [foreign_category.pk], "self": [category.pk], "empty": []}[sources]
+    url = reverse("finance:category-merge", kwargs={"pk": category.pk})
+    response = auth_client.post(url, {"sources": sources}, format="json")
+    assert response.status_code == 400
+    assert "sources" in response.data
+
+
+def test_merge_into_foreign_category_is_not_found(auth_client, category, foreign_category):
+    url = reverse("finance:category-merge", kwargs={"pk": foreign_category.pk})
+    assert auth_client.post(url, {"sources": [category.pk]}, format="json").status_code == 404
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+import tracemalloc
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Food, drinks")
+
+
+def seed(user, category, count):
+    Transaction.objects.bulk_create(
+        (
+            Transaction(
+                user=user,
+                category=category,
+                type=Transaction.TransactionType.EXPENSE if i % 2 else Transaction.TransactionType.INCOME,
+                amount=Decimal(i % 1000) + Decimal("0.50"),
+                date=date(2020, 1, 1) + timedelta(days=i % 1500),
+                note=f"row {i}" if i % 5 else None,
+            )
+            for i in range(count)
+        ),
+        batch_size=5000,
+    )
+
+
+def export_url(**params):
+    return reverse("finance:transaction-export") + ("?" + "&".join(f"{k}={v}" for k, v in params.items()) if params else "")
+
+
+def consume(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_filtered_rows(auth_client, user, category):
+    seed(user, category, 30)
+    res = auth_client.get(export_url(type="I", ordering="date"))
+
+    assert res.status_code == 200
+    assert res.streaming
+    assert res["Content-Type"] == "text/csv"
+    assert 'filename="transactions.csv"' in res["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(consume(res))))
+    assert len(rows) == 15
+    assert {row["type"] for row in rows} == {"I"}
+    assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+    assert rows[0]["category_name"] == "Food, drinks"
+    assert rows[0]["amount"].endswith(".50")
+
+
+@pytest.mark.django_db
+def test_ndjson_export_matches_list_schema(auth_client, user, category):
+    seed(user, category, 3)
+    res = auth_client.get(export_url(output="ndjson"))
+    assert res["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in consume(res).splitlines()]
+
+    listed = auth_client.get(reverse("finance:transaction-list"), {"page_size": 10}).json()["results"]
+    assert lines == listed
+
+
+@pytest.mark.django_db
+def test_export_only_includes_own_rows(auth_client, user, category):
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    seed(other, Category.objects.create(user=other, name="Other"), 5)
+    seed(user, category, 2)
+    assert len(consume(auth_client.get(export_url(output="ndjson"))).splitlines()) == 2
+
+
+@pytest.mark.django_db
+def test_unknown_output_is_rejected(auth_client):
+    assert auth_client.get(export_url(output="xml")).status_code == 400
+
+
+def peak_memory_of_export(client, settings):
+    tracemalloc.start()
+    try:
+        res = client.get(export_url())
+        lines = 0
+        for chunk in res.streaming_content:
+            lines += chunk.count(b"\n")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return lines, peak
+
+
+@pytest.mark.django_db
+def test_export_memory_stays_flat_as_history_grows(auth_client, user, category, settings):
+    settings.FINANCE_EXPORT_CHUNK_SIZE = 1000
+    seed(user, category, 1000)
+    peak_memory_of_export(auth_client, settings)  # warm-up: imports, compiled SQL, etc.
+    small_lines, small_peak = peak_memory_of_export(auth_client, settings)
+
+    seed(user, category, 49000)
+    large_lines, large_peak = peak_memory_of_export(auth_client, settings)
+
+    assert (small_lines, large_lines) == (1001, 50001)
+    # 50x the rows must not mean 50x the memory: only one chunk is held at a time
+    assert large_peak < small_peak * 3, (small_peak, large_peak)
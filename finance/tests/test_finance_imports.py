@@ -0,0 +1,172 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance import imports, rollups
+from finance.models import Category, ImportJob, Transaction
+from finance.tasks import process_import_job
+
+User = get_user_model()
+
+CSV_BODY = (
+    "date,amount,type,category,note\n"
+    "2025-01-02,1200.00,income,Salary,January pay\n"
+    "2025-01-03,-45.10,,Groceries,\"Market, weekly\"\n"
+    "2025-01-04,oops,,Groceries,bad amount\n"
+    "2025-01-05,12.00,expense,groceries,case-insensitive category\n"
+    "not-a-date,3.00,,Fun,bad date\n"
+    "2025-01-06,8.50,E,,no category\n"
+)
+
+OFX_BODY = (
+    "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250110120000<TRNAMT>-19.99<NAME>Coffee shop<MEMO>card 1234</STMTTRN>\n"
+    "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20250111\n<TRNAMT>250.00\n<NAME>Refund\n</STMTTRN>\n"
+    "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def make_job(user, body, name="statement.csv", fmt=ImportJob.Format.CSV):
+    upload = SimpleUploadedFile(name, body if isinstance(body, bytes) else body.encode())
+    return ImportJob.objects.create(user=user, file=upload, format=fmt, bytes_total=upload.size)
+
+
+@pytest.mark.django_db
+def test_upload_creates_job_and_enqueues_after_commit(auth_client, user, monkeypatch, django_capture_on_commit_callbacks):
+    queued = []
+    monkeypatch.setattr(process_import_job, "delay", lambda job_id, user_id=None: queued.append(job_id))
+    with django_capture_on_commit_callbacks(execute=True):
+        res = auth_client.post(
+            reverse("finance:import-list"),
+            {"file": SimpleUploadedFile("bank.OFX", OFX_BODY.encode())},
+            format="multipart",
+        )
+    assert res.status_code == 201, res.content
+    body = res.json()
+    assert body["format"] == "ofx"
+    assert body["status"] == "P"
+    assert "file" not in body
+    assert queued == [body["id"]]
+
+
+@pytest.mark.django_db
+def test_csv_import_loads_rows_and_reports_errors(user):
+    Category.objects.create(user=user, name="Groceries")
+    job = make_job(user, CSV_BODY)
+
+    process_import_job(job.pk)
+    job.refresh_from_db()
+
+    assert job.status == ImportJob.Status.COMPLETED
+    assert job.progress == 1.0
+    assert (job.rows_processed, job.rows_imported, job.rows_failed) == (6, 4, 2)
+    assert [error["row"] for error in job.errors] == [3, 5]
+
+    txns = Transaction.objects.filter(user=user).order_by("date")
+    assert [(t.type, t.amount, t.category.name) for t in txns] == [
+        ("I", Decimal("1200.00"), "Salary"),
+        ("E", Decimal("45.10"), "Groceries"),
+        ("E", Decimal("12.00"), "Groceries"),
+        ("E", Decimal("8.50"), "Uncategorized"),
+    ]
+    assert txns[1].note == "Market, weekly"
+    assert Category.objects.filter(user=user).count() == 3
+    assert rollups.find_drift() == []
+
+
+@pytest.mark.django_db
+def test_ofx_import(user, monkeypatch):
+    job = make_job(user, OFX_BODY, name="bank.ofx", fmt=ImportJob.Format.OFX)
+    # tiny reads so tags get split across read boundaries
+    parse = imports.ofx_records
+    monkeypatch.setitem(imports.PARSERS, ImportJob.Format.OFX, lambda f, c: parse(f, c, read_size=7))
+    imports.run_import(job.pk)
+
+    rows = list(Transaction.objects.filter(user=user).order_by("date").values_list("date", "type", "amount", "note"))
+    assert rows == [
+        (date(2025, 1, 10), "E", Decimal("19.99"), "Coffee shop - card 1234"),
+        (date(2025, 1, 11), "I", Decimal("250.00"), "Refund"),
+    ]
+
+
+@pytest.mark.django_db
+def test_missing_columns_fail_the_job(user):
+    job = imports.run_import(make_job(user, "when,how much\n2025-01-01,3\n").pk)
+    assert job.status == ImportJob.Status.FAILED
+    assert "amount" in job.errors[0]["error"]
+    assert not Transaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_non_utf8_file_fails_the_job(user):
+    body = "date,amount,category\n2025-01-01,3.00,Café\n".encode("latin-1")
+    job = imports.run_import(make_job(user, body).pk)
+    assert job.status == ImportJob.Status.FAILED
+    assert "Line 2 is not valid UTF-8" in job.errors[0]["error"]
+    assert not Transaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_malformed_csv_fails_the_job(user):
+    body = f"date,amount,note\n2025-01-01,3.00,{'x' * 200_000}\n"
+    job = imports.run_import(make_job(user, body).pk)
+    assert job.status == ImportJob.Status.FAILED
+    assert "malformed after line 1" in job.errors[0]["error"]
+
+
+@pytest.mark.django_db
+def test_resumes_from_last_committed_chunk_after_crash(user, monkeypatch):
+    body = "date,amount,category\n" + "".join(f"2025-02-{i % 28 + 1:02d},{i + 1}.00,Bulk\n" for i in range(10))
+    job = make_job(user, body)
+
+    real_commit = imports._commit_chunk
+    calls = {"n": 0}
+
+    def crash_on_third_chunk(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("worker lost")
+        return real_commit(*args, **kwargs)
+
+    monkeypatch.setattr(imports, "_commit_chunk", crash_on_third_chunk)
+    with pytest.raises(RuntimeError):
+        imports.run_import(job.pk, chunk_size=3)
+    job.refresh_from_db()
+    assert (job.status, job.rows_processed, job.rows_imported) == (ImportJob.Status.RUNNING, 6, 6)
+    assert 0 < job.progress < 1
+
+    monkeypatch.setattr(imports, "_commit_chunk", real_commit)
+    job = imports.run_import(job.pk, chunk_size=3)
+    assert (job.status, job.rows_processed, job.rows_imported) == (ImportJob.Status.COMPLETED, 10, 10)
+    amounts = sorted(Transaction.objects.filter(user=user).values_list("amount", flat=True))
+    assert amounts == [Decimal(i) for i in range(1, 11)]
+
+
+@pytest.mark.django_db
+def test_jobs_are_private(auth_client, user):
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    mine = make_job(user, CSV_BODY)
+    theirs = make_job(other, CSV_BODY)
+    assert [job["id"] for job in auth_client.get(reverse("finance:import-list")).json()["results"]] == [mine.pk]
+    assert auth_client.get(reverse("finance:import-detail", args=[theirs.pk])).status_code == 404
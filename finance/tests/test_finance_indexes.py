@@ -0,0 +1,147 @@
+"""
+Query plans of the transaction list for a user with half the rows of a
+seeded table: no supported filter, pair of filters or ordering, in either
+pagination, may fall back to a sequential scan of finance_transaction
+(see the indexes on ``Transaction``).
+"""
+import itertools
+import json
+import re
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance import partitions, search
+from finance.models import Category
+
+User = get_user_model()
+
+pytestmark = [
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="EXPLAIN plans are PostgreSQL's"),
+    # Outside a transaction, to VACUUM the seeded table as autovacuum would
+    # (index-only scans need its visibility map)
+    pytest.mark.django_db(transaction=True),
+]
+
+USERS = 200
+CATEGORIES_PER_USER = 5
+ROWS_PER_CATEGORY = 150
+# The user whose list is planned, with as many rows as the others together
+HEAVY_ROWS_PER_CATEGORY = USERS * ROWS_PER_CATEGORY
+START = date(2024, 1, 1)
+DAYS = 730
+
+SINGLE_FILTERS = {
+    "date": {"date_after": "2024-06-01", "date_before": "2024-08-31"},
+    "amount": {"amount_min": "100", "amount_max": "150"},
+    "type": {"type": "I"},
+    "category": {"category": None},
+}
+FILTERS = {
+    "none": {},
+    **SINGLE_FILTERS,
+    **{
+        f"{first}+{second}": {**SINGLE_FILTERS[first], **SINGLE_FILTERS[second]}
+        for first, second in itertools.combinations(SINGLE_FILTERS, 2)
+    },
+    "category_name": {"category_name": "Category 2"},
+}
+# Only the trigram index on UPPER(note) (migration 0009, with pg_trgm) can
+# serve an unanchored match on a column the other indexes don't carry
+TRIGRAM_FILTERS = {
+    "note": {"note": "77"},
+    "search": {"search": "Category 2"},
+}
+ORDERINGS = [None, "date", "-date", "amount", "-amount", "type", "-type"]
+TABLE = re.compile(rf"^{partitions.TABLE}(_p\d{{4}}(_\d{{2}})?|_default)?$")
+
+
+@pytest.fixture
+def seeded():
+    """
+    USERS users with CATEGORIES_PER_USER categories of ROWS_PER_CATEGORY
+    transactions each, plus a heavy user with HEAVY_ROWS_PER_CATEGORY per
+    category, spread over two years of monthly partitions. Returns the
+    heavy user.
+    """
+    users = User.objects.bulk_create(
+        User(username=f"user{n}", email=f"user{n}@example.com", password="!") for n in range(USERS + 1)
+    )
+    Category.objects.bulk_create(
+        Category(user=user, name=f"Category {n}") for user in users for n in range(CATEGORIES_PER_USER)
+    )
+    partitions.ensure_partitions(START, date(2025, 12, 31), interval="month")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {partitions.TABLE} (type, amount, note, category_id, user_id, date, created_at, updated_at)
+            SELECT CASE WHEN g %% 4 = 0 THEN 'I' ELSE 'E' END, 1 + (g * 37 + c.id) %% 50000 / 100.0, 'Payment ' || g,
+                   c.id, c.user_id, %s::date + ((g * 7919 + c.id * 31) %% %s)::int,
+                   NOW() - (g * 1000 + c.id) * INTERVAL '1 second', NOW()
+            FROM finance_category c
+            CROSS JOIN LATERAL generate_series(1, CASE WHEN c.user_id = %s THEN %s ELSE %s END) g
+            """,
+            [START, DAYS, users[-1].pk, HEAVY_ROWS_PER_CATEGORY, ROWS_PER_CATEGORY],
+        )
+        cursor.execute(f"VACUUM ANALYZE {partitions.TABLE}")
+        cursor.execute("VACUUM ANALYZE finance_category")
+    return users[-1]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def populated_partitions():
+    # An empty partition is cheapest to scan whole, whatever the indexes
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relname FROM pg_class WHERE reltuples > 0")
+        return {name for (name,) in cursor.fetchall() if TABLE.match(name)}
+
+
+def seq_scans(sql, populated):
+    """
+    The ``populated`` partitions that ``sql``'s plan reads with a
+    sequential scan.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return sorted(
+        node["Relation Name"] for node in plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in populated
+    )
+
+
+def test_no_filter_or_ordering_scans_the_whole_table(seeded):
+    client = APIClient()
+    client.force_authenticate(seeded)
+    category = Category.objects.filter(user=seeded).first()
+    populated = populated_partitions()
+    filters = {**FILTERS, **(TRIGRAM_FILTERS if search.trigram_search_available(connection.alias) else {})}
+
+    offenders = []
+    for (name, params), ordering in itertools.product(filters.items(), ORDERINGS):
+        params = {key: value or category.pk for key, value in params.items()}
+        if ordering:
+            params["ordering"] = ordering
+        for pagination in ({}, {"pagination": "cursor"}):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse("finance:transaction-list"), {**params, **pagination})
+            assert response.status_code == 200, response.content
+            for query in queries.captured_queries:
+                if partitions.TABLE not in query["sql"]:
+                    continue
+                scans = seq_scans(query["sql"], populated)
+                if scans:
+                    offenders.append((name, ordering, pagination, scans[0], query["sql"]))
+    assert not offenders, offenders
@@ -0,0 +1,115 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def seeded(user):
+    """
+    23 transactions with plenty of duplicate dates, amounts and types,
+    so every ordering has ties that only the id tiebreaker resolves.
+    """
+    food = Category.objects.create(user=user, name="Food")
+    rent = Category.objects.create(user=user, name="Rent")
+    for i in range(23):
+        Transaction.objects.create(
+            category=food if i % 3 else rent,
+            type=Transaction.TransactionType.INCOME if i % 4 == 0 else Transaction.TransactionType.EXPENSE,
+            amount=Decimal(10 + i % 5),
+            date=date(2025, 1, 1) + timedelta(days=i % 6),
+            note=f"note {i}",
+        )
+    return food, rent
+
+
+def walk(client, params):
+    url = reverse("finance:transaction-list")
+    ids, pages = [], 0
+    res = client.get(url, {"pagination": "cursor", **params})
+    while True:
+        assert res.status_code == 200, res.content
+        body = res.json()
+        assert set(body) == {"next", "results"}
+        ids.extend(row["id"] for row in body["results"])
+        pages += 1
+        if not body["next"]:
+            return ids, pages
+        res = client.get(body["next"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", [None, "date", "-date", "amount", "-amount", "type", "-type"])
+def test_cursor_walk_matches_offset_walk(auth_client, seeded, ordering):
+    params = {"page_size": 4}
+    if ordering:
+        params["ordering"] = ordering
+    ids, pages = walk(auth_client, params)
+
+    expected_order = [ordering] if ordering else ["-created_at"]
+    tiebreaker = "-id" if expected_order[-1].startswith("-") else "id"
+    expected = list(
+        Transaction.objects.order_by(*expected_order, tiebreaker).values_list("id", flat=True)
+    )
+    assert ids == expected
+    assert pages == 6
+
+
+@pytest.mark.django_db
+def test_cursor_walk_honours_filters(auth_client, seeded):
+    food, _ = seeded
+    params = {"page_size": 3, "category": food.pk, "type": "E", "date_after": "2025-01-02", "ordering": "-amount"}
+    ids, _ = walk(auth_client, params)
+    expected = Transaction.objects.filter(
+        category=food, type="E", date__gte=date(2025, 1, 2)
+    ).order_by("-amount", "-id")
+    assert ids == list(expected.values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+def test_cursor_pages_issue_no_count_or_offset(auth_client, seeded):
+    first = auth_client.get(reverse("finance:transaction-list"), {"pagination": "cursor", "page_size": 4})
+    with CaptureQueriesContext(connection) as ctx:
+        res = auth_client.get(first.json()["next"])
+    assert res.status_code == 200
+    sql = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert "COUNT(" not in sql
+    assert "OFFSET" not in sql
+    assert len(ctx.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_default_list_still_uses_page_numbers(auth_client, seeded):
+    body = auth_client.get(reverse("finance:transaction-list")).json()
+    assert body["count"] == 23
+    assert "page=2" in body["next"]
+
+
+@pytest.mark.django_db
+def test_tampered_or_mismatched_cursor_is_rejected(auth_client, seeded):
+    url = reverse("finance:transaction-list")
+    assert auth_client.get(url, {"cursor": "not-a-cursor"}).status_code == 404
+
+    next_url = auth_client.get(url, {"pagination": "cursor", "ordering": "amount"}).json()["next"]
+    cursor = next_url.split("cursor=")[1].split("&")[0]
+    assert auth_client.get(url, {"cursor": cursor, "ordering": "date"}).status_code == 404
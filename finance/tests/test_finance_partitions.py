@@ -0,0 +1,109 @@
+import re
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from core import tasks
+from finance import partitions, rollups
+from finance.filters import TransactionFilter
+from finance.models import Category, Transaction
+from finance.services import financial_summary
+
+User = get_user_model()
+
+PARTITION = re.compile(r"finance_transaction_(p\d{4}(?:_\d{2})?|default)\b")
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="General")
+
+
+@pytest.fixture
+def history(category):
+    """
+    Monthly partitions for 2023 through 2025 with a transaction in each.
+    """
+    partitions.ensure_partitions(date(2023, 1, 1), date(2025, 12, 31), interval="month")
+    Transaction.objects.bulk_create([
+        Transaction(user=category.user, category=category, type="E", amount=Decimal("1.00"), date=date(year, month, 15))
+        for year in (2023, 2024, 2025) for month in range(1, 13)
+    ])
+    rollups.rebuild()
+
+
+def scanned(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    return {match[1] for match in PARTITION.finditer(plan)}
+
+
+def test_table_is_partitioned(db):
+    assert partitions.is_partitioned()
+    names = [name for name, _, _ in partitions.existing_partitions()]
+    assert partitions.partition_name(date.today().replace(day=1), "month") in names
+
+
+def test_ensure_partitions_is_idempotent_and_skips_overlaps(db):
+    created = partitions.ensure_partitions(date(2031, 1, 1), date(2031, 3, 31), interval="month")
+    assert created == ["finance_transaction_p2031_01", "finance_transaction_p2031_02", "finance_transaction_p2031_03"]
+    assert partitions.ensure_partitions(date(2031, 1, 1), date(2031, 3, 31), interval="month") == []
+    # 2031 is partly covered by months already, so no yearly partition for it
+    assert partitions.ensure_partitions(date(2031, 1, 1), date(2032, 6, 1), interval="year") == ["finance_transaction_p2032"]
+
+
+def test_new_partition_takes_rows_from_default(category):
+    txn = Transaction.objects.create(category=category, type="E", amount=Decimal("5.00"), date=date(2040, 2, 3))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION} WHERE id = %s", [txn.pk])
+        assert cursor.fetchone()[0] == 1
+
+    partitions.ensure_partitions(date(2040, 2, 1), date(2040, 2, 1), interval="month")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM finance_transaction_p2040_02")
+        assert cursor.fetchall() == [(txn.pk,)]
+    assert Transaction.objects.get(pk=txn.pk).amount == Decimal("5.00")
+
+
+def test_beat_task_creates_partitions_ahead(db, settings, monkeypatch):
+    settings.FINANCE_PARTITIONS_AHEAD = 2
+    monkeypatch.setattr(partitions.timezone, "localdate", lambda: date(2035, 11, 20))
+    assert tasks.create_transaction_partitions() == [
+        "finance_transaction_p2035_11", "finance_transaction_p2035_12", "finance_transaction_p2036_01",
+    ]
+
+
+def test_filter_date_range_prunes_partitions(user, history):
+    request = APIRequestFactory().get("/")
+    request.user = user
+    data = {"date_after": "2024-03-01", "date_before": "2024-04-30"}
+    qs = TransactionFilter(data, Transaction.objects.filter(user=user), request=request).qs
+    assert scanned(*qs.query.sql_with_params()) == {"p2024_03", "p2024_04"}
+    assert qs.count() == 2
+
+
+def test_report_chunk_prunes_partitions(user, history, mailoutbox):
+    with CaptureQueriesContext(connection) as ctx:
+        tasks.send_summary_reports_chunk([user.pk], "weekly", "2025-06-10", "2025-06-17")
+    transaction_queries = [q["sql"] for q in ctx.captured_queries if "finance_transaction" in q["sql"]]
+    assert len(transaction_queries) == 1
+    assert scanned(transaction_queries[0]) == {"p2025_06"}
+    assert len(mailoutbox) == 1
+
+
+def test_financial_summary_reads_rollups_only(user, history):
+    with CaptureQueriesContext(connection) as ctx:
+        summary = financial_summary(user=user, start=date(2024, 1, 1), end=date(2024, 12, 31))
+    assert summary["total_expense"] == Decimal("12.00")
+    assert not any("finance_transaction" in q["sql"] for q in ctx.captured_queries)
@@ -0,0 +1,83 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Category, Transaction
+from finance.serializers import TransactionSerializer
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def transactions(user):
+    food = Category.objects.create(user=user, name="Food & Drink")
+    salary = Category.objects.create(user=user, name="Salary")
+    rows = [
+        (salary, "I", "2500.00", date(2024, 12, 31), "December"),
+        (food, "E", "0.01", date(2025, 1, 1), None),
+        (food, "E", "1000.50", date(2025, 1, 1), ""),
+        (food, "E", "99999999.99", date(2025, 2, 28), "ünïcode note"),
+    ]
+    return [
+        Transaction.objects.create(category=category, type=type_, amount=Decimal(amount), date=day, note=note)
+        for category, type_, amount, day, note in rows
+    ]
+
+
+def full_serializer(instances):
+    return [dict(row) for row in TransactionSerializer(instances, many=True).data]
+
+
+@pytest.mark.django_db
+def test_list_matches_full_serializer(auth_client, transactions):
+    res = auth_client.get(reverse("finance:transaction-list"), {"ordering": "date", "page_size": 10})
+    assert res.status_code == 200
+    expected = full_serializer(Transaction.objects.select_related("category").order_by("date", "id"))
+    assert res.json()["results"] == expected
+
+
+@pytest.mark.django_db
+def test_retrieve_matches_full_serializer(auth_client, transactions):
+    for txn in transactions:
+        res = auth_client.get(reverse("finance:transaction-detail", args=[txn.pk]))
+        assert res.json() == full_serializer([txn])[0]
+
+
+@pytest.mark.django_db
+def test_running_balance_matches_full_serializer(auth_client, transactions):
+    res = auth_client.get(reverse("finance:transaction-list"), {"ordering": "date", "running_balance": "true"})
+    balances = [row["running_balance"] for row in res.json()["results"]]
+    assert balances == ["2500.00", "2499.99", "1499.49", "-99998500.50"]
+
+
+@pytest.mark.django_db
+def test_keyset_pages_match_full_serializer(auth_client, transactions):
+    url = reverse("finance:transaction-list")
+    res = auth_client.get(url, {"pagination": "cursor", "page_size": 2})
+    first = res.json()
+    second = auth_client.get(first["next"]).json()
+    expected = full_serializer(Transaction.objects.select_related("category").order_by("-created_at", "-id"))
+    assert first["results"] + second["results"] == expected
+
+
+@pytest.mark.django_db
+def test_writes_still_use_full_serializer(auth_client, transactions):
+    txn = transactions[1]
+    res = auth_client.patch(reverse("finance:transaction-detail", args=[txn.pk]), {"note": "edited"}, format="json")
+    assert res.status_code == 200
+    assert res.json() == {**full_serializer([txn])[0], "note": "edited"}
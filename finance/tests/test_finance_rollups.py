@@ -0,0 +1,185 @@
+import threading
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance import rollups
+from finance.models import Category, DailyRollup, Transaction
+from finance.services import financial_summary
+
+User = get_user_model()
+
+INCOME = Transaction.TransactionType.INCOME
+EXPENSE = Transaction.TransactionType.EXPENSE
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="bob", email="bob@example.com", password="password")
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Salary")
+
+
+def rollup(user, day, type_):
+    row = DailyRollup.objects.filter(user=user, date=day, type=type_).first()
+    return (row.total, row.count) if row else (Decimal("0"), 0)
+
+
+@pytest.mark.django_db
+def test_create_adds_to_rollup(user, category):
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("5.50"), date=date(2025, 1, 1))
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("15.50"), 2)
+
+
+@pytest.mark.django_db
+def test_update_moves_amount_between_buckets(user, category):
+    txn = Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+
+    txn = Transaction.objects.get(pk=txn.pk)
+    txn.amount = Decimal("20.00")
+    txn.type = EXPENSE
+    txn.date = date(2025, 1, 2)
+    txn.save()
+
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("0"), 0)
+    assert rollup(user, date(2025, 1, 2), EXPENSE) == (Decimal("20.00"), 1)
+
+
+@pytest.mark.django_db
+def test_update_without_loaded_state_still_moves_amount(user, category):
+    txn = Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+    partial = Transaction.objects.defer("amount").get(pk=txn.pk)
+    partial.amount = Decimal("4.00")
+    partial.save()
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("4.00"), 1)
+
+
+@pytest.mark.django_db
+def test_saving_a_stale_instance_moves_the_committed_amount(user, category):
+    txn = Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+    first, second = Transaction.objects.get(pk=txn.pk), Transaction.objects.get(pk=txn.pk)
+
+    first.amount = Decimal("50.00")
+    first.save()
+    # Loaded before the first save committed
+    second.amount = Decimal("70.00")
+    second.save()
+
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("70.00"), 1)
+
+
+@pytest.mark.django_db
+def test_category_change_moves_amount_between_users(user, other_user, category):
+    txn = Transaction.objects.create(category=category, type=EXPENSE, amount=Decimal("7.00"), date=date(2025, 1, 1))
+    txn.category = Category.objects.create(user=other_user, name="Food")
+    txn.save()
+    assert rollup(user, date(2025, 1, 1), EXPENSE) == (Decimal("0"), 0)
+    assert rollup(other_user, date(2025, 1, 1), EXPENSE) == (Decimal("7.00"), 1)
+
+
+@pytest.mark.django_db
+def test_delete_and_queryset_delete_remove_from_rollup(user, category):
+    first = Transaction.objects.create(category=category, type=INCOME, amount=Decimal("1.00"), date=date(2025, 1, 1))
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("2.00"), date=date(2025, 1, 1))
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("3.00"), date=date(2025, 1, 1))
+
+    first.delete()
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("5.00"), 2)
+
+    Transaction.objects.filter(category=category).delete()
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("0"), 0)
+
+
+@pytest.mark.django_db
+def test_financial_summary_matches_transactions(user, category):
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("100.00"), date=date(2025, 1, 1))
+    Transaction.objects.create(category=category, type=EXPENSE, amount=Decimal("30.00"), date=date(2025, 1, 15))
+    Transaction.objects.create(category=category, type=EXPENSE, amount=Decimal("5.00"), date=date(2025, 2, 1))
+
+    assert financial_summary(user=user) == {
+        "total_income": Decimal("100.00"),
+        "total_expense": Decimal("35.00"),
+        "balance": Decimal("65.00"),
+    }
+    january = financial_summary(user=user, start=date(2025, 1, 1), end=date(2025, 1, 31))
+    assert january["total_expense"] == Transaction.objects.filter(
+        type=EXPENSE, date__month=1
+    ).aggregate(total=Sum("amount"))["total"]
+
+
+@pytest.mark.django_db
+def test_dashboard_reads_rollups(user, category, django_assert_num_queries):
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("12.00"), date=date(2025, 1, 1))
+    client = APIClient()
+    client.force_authenticate(user)
+    with django_assert_num_queries(1):
+        res = client.get(reverse("finance:dashboard-list"))
+    assert res.status_code == 200
+    assert Decimal(str(res.json()["balance"])) == Decimal("12.00")
+
+
+@pytest.mark.django_db
+def test_check_and_rebuild_commands(user, category):
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+    DailyRollup.objects.filter(user=user).update(total=Decimal("99.00"))
+
+    assert len(rollups.find_drift()) == 1
+    with pytest.raises(CommandError):
+        call_command("check_rollups")
+
+    call_command("rebuild_rollups", "--user", str(user.pk))
+    assert rollups.find_drift() == []
+    call_command("check_rollups")
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("10.00"), 1)
+
+
+@pytest.mark.django_db
+def test_check_rollups_fix(user, category):
+    Transaction.objects.create(category=category, type=EXPENSE, amount=Decimal("3.00"), date=date(2025, 1, 1))
+    DailyRollup.objects.all().delete()
+    call_command("check_rollups", "--fix")
+    assert rollups.find_drift() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_keeps_a_write_that_lands_while_it_runs(user, category, monkeypatch):
+    Transaction.objects.create(category=category, type=INCOME, amount=Decimal("10.00"), date=date(2025, 1, 1))
+    aggregate = rollups._aggregate_transactions
+    writer = None
+
+    def aggregate_then_write(user_ids=None):
+        nonlocal writer
+        truth = aggregate(user_ids)
+
+        def write():
+            Transaction.objects.create(category=category, type=INCOME, amount=Decimal("5.00"), date=date(2025, 1, 1))
+            connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        # Room for the write to commit, were the rollups not locked
+        writer.join(timeout=1)
+        return truth
+
+    monkeypatch.setattr(rollups, "_aggregate_transactions", aggregate_then_write)
+    rollups.rebuild([user.pk])
+    writer.join(timeout=10)
+    assert not writer.is_alive()
+
+    assert rollup(user, date(2025, 1, 1), INCOME) == (Decimal("15.00"), 2)
@@ -0,0 +1,98 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def history(user):
+    """
+    Ten days alternating income 100 / expense 30, oldest first, plus a
+    second transaction on the last day.
+    """
+    salary = Category.objects.create(user=user, name="Salary")
+    food = Category.objects.create(user=user, name="Food")
+    rows = []
+    for day in range(1, 11):
+        if day % 2:
+            rows.append(Transaction.objects.create(category=salary, type="I", amount=Decimal("100.00"), date=date(2025, 1, day)))
+        else:
+            rows.append(Transaction.objects.create(category=food, type="E", amount=Decimal("30.00"), date=date(2025, 1, day)))
+    rows.append(Transaction.objects.create(category=food, type="E", amount=Decimal("5.00"), date=date(2025, 1, 10)))
+    return rows
+
+
+def expected_balances(rows):
+    balance, expected = Decimal("0"), {}
+    for txn in sorted(rows, key=lambda t: (t.date, t.pk)):
+        balance += txn.amount if txn.type == "I" else -txn.amount
+        expected[txn.pk] = balance
+    return expected
+
+
+@pytest.mark.django_db
+def test_field_is_opt_in(auth_client, history):
+    res = auth_client.get(reverse("finance:transaction-list"))
+    assert "running_balance" not in res.json()["results"][0]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [
+    {"ordering": "date", "page": 2},
+    {"ordering": "-amount", "page": 1},
+    {"ordering": "date", "pagination": "cursor"},
+])
+def test_running_balance_on_every_page(auth_client, history, params):
+    expected = expected_balances(history)
+    res = auth_client.get(reverse("finance:transaction-list"), {"running_balance": "true", **params})
+    assert res.status_code == 200, res.content
+    rows = res.json()["results"]
+    assert rows
+    for row in rows:
+        assert Decimal(row["running_balance"]) == expected[row["id"]]
+
+
+@pytest.mark.django_db
+def test_running_balance_ignores_filters(auth_client, history):
+    # Balance is over the whole history, not just the rows the filter kept
+    expected = expected_balances(history)
+    res = auth_client.get(reverse("finance:transaction-list"), {"running_balance": "1", "type": "E", "ordering": "-date"})
+    rows = res.json()["results"]
+    assert {row["type"] for row in rows} == {"E"}
+    assert [Decimal(row["running_balance"]) for row in rows] == [expected[row["id"]] for row in rows]
+    last_day = {Decimal(row["running_balance"]) for row in rows if row["date"] == "2025-01-10"}
+    assert last_day == {Decimal("350.00"), Decimal("345.00")}
+
+
+@pytest.mark.django_db
+def test_running_balance_on_retrieve(auth_client, history):
+    txn = history[4]  # 100 - 30 + 100 - 30 + 100
+    res = auth_client.get(reverse("finance:transaction-detail", args=[txn.pk]), {"running_balance": "true"})
+    assert Decimal(res.json()["running_balance"]) == Decimal("240.00")
+
+
+@pytest.mark.django_db
+def test_window_only_reads_the_page_date_span(auth_client, history, django_assert_num_queries):
+    with django_assert_num_queries(4) as ctx:
+        # count, page, opening balance from rollups, windowed span
+        auth_client.get(reverse("finance:transaction-list"), {"running_balance": "true", "ordering": "-date"})
+    window_sql = [q["sql"] for q in ctx.captured_queries if "OVER" in q["sql"]]
+    assert len(window_sql) == 1 and "BETWEEN" in window_sql[0]
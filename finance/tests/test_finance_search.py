@@ -0,0 +1,79 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance import search
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def transactions(user):
+    groceries = Category.objects.create(user=user, name="Groceries")
+    rent = Category.objects.create(user=user, name="Rent")
+    return [
+        Transaction.objects.create(category=groceries, type="E", amount=Decimal("5.00"), date=date(2025, 1, 1), note="Weekly shop"),
+        Transaction.objects.create(category=rent, type="E", amount=Decimal("900.00"), date=date(2025, 1, 2), note="January"),
+        Transaction.objects.create(category=rent, type="E", amount=Decimal("10.00"), date=date(2025, 1, 3), note="grocery top-up"),
+    ]
+
+
+def result_ids(res):
+    assert res.status_code == 200, res.content
+    return sorted(row["id"] for row in res.json()["results"])
+
+
+@pytest.mark.django_db
+def test_search_matches_note_or_category_name(auth_client, transactions):
+    url = reverse("finance:transaction-list")
+    shop, january, top_up = transactions
+    assert result_ids(auth_client.get(url, {"search": "groc"})) == sorted([shop.pk, top_up.pk])
+    assert result_ids(auth_client.get(url, {"search": "RENT"})) == sorted([january.pk, top_up.pk])
+    assert result_ids(auth_client.get(url, {"search": "nothing"})) == []
+
+
+@pytest.mark.django_db
+def test_search_does_not_leak_other_users_rows(auth_client, transactions):
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password")
+    other_rent = Category.objects.create(user=other, name="Rent")
+    Transaction.objects.create(category=other_rent, type="E", amount=Decimal("1.00"), date=date(2025, 1, 1))
+    res = auth_client.get(reverse("finance:transaction-list"), {"search": "rent"})
+    assert result_ids(res) == sorted([transactions[1].pk, transactions[2].pk])
+
+
+@pytest.mark.django_db
+def test_ranked_query_when_trigram_available(user, transactions, monkeypatch):
+    monkeypatch.setitem(search._trigram_available, "default", True)
+    qs = search.search_transactions(Transaction.objects.filter(user=user), "groc", user=user)
+    sql = str(qs.query)
+    assert "WORD_SIMILARITY" in sql.upper()
+    assert qs.query.order_by[0] == "-search_rank"
+
+
+@pytest.mark.django_db
+def test_blank_search_is_ignored(user, transactions):
+    qs = Transaction.objects.filter(user=user)
+    assert search.search_transactions(qs, "  ", user=user) is qs
+
+
+@pytest.mark.django_db
+def test_category_match_only_looks_at_the_users_categories(user, transactions):
+    qs = search.search_transactions(Transaction.objects.filter(user=user), "rent", user=user)
+    # The category subquery (aliased U0) is filtered on the owner
+    assert f'U0."user_id" = {user.pk}' in str(qs.query)
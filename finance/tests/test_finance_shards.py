@@ -0,0 +1,206 @@
+"""
+User shards against three local databases: 'default' and the stand-ins
+'shard_1' and 'shard_2'.
+"""
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import tasks
+from core.models import UserShard
+from core import routers
+from core.routers import check_shared_cache, freeze_writes, hashed_shard, shard_for, use_shard_of
+from finance import shards
+from finance.models import Category, DailyRollup, Transaction
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "shard_1", "shard_2"])
+
+
+@pytest.fixture
+def sharded(settings):
+    settings.FINANCE_SHARDS = ["default", "shard_1", "shard_2"]
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    for alias in ("shard_1", "shard_2"):
+        shards.prepare_shard(alias)
+
+
+@pytest.fixture
+def user(sharded, monkeypatch):
+    """Alice, placed on shard_1 whatever her id hashes to."""
+    monkeypatch.setattr(shards, "hashed_shard", lambda user_id: "shard_1")
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+@pytest.fixture
+def history(user):
+    with use_shard_of(user.pk):
+        salary = Category.objects.create(user=user, name="Salary")
+        food = Category.objects.create(user=user, name="Food")
+        Transaction.objects.create(category=salary, type="I", amount=Decimal("100.00"))
+        Transaction.objects.create(category=food, type="E", amount=Decimal("30.00"))
+    return salary, food
+
+
+def test_new_users_are_placed_by_hash(sharded):
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    alias = hashed_shard(bob.pk)
+    assert UserShard.objects.get(user=bob).alias == alias == shard_for(bob.pk)
+    if alias != "default":
+        assert not User.objects.using(alias).get(pk=bob.pk).has_usable_password()
+
+
+def test_api_writes_and_reads_stay_on_the_users_shard(client, user):
+    response = client.post(reverse("finance:category-list"), {"name": "Salary"}, format="json")
+    assert response.status_code == 201
+    category_id = response.json()["id"]
+    response = client.post(
+        reverse("finance:transaction-list"),
+        {"category": category_id, "type": "I", "amount": "100.00"},
+        format="json",
+    )
+    assert response.status_code == 201
+
+    assert Transaction.objects.using("shard_1").filter(user_id=user.pk).count() == 1
+    assert DailyRollup.objects.using("shard_1").filter(user_id=user.pk).count() == 1
+    assert not Category.objects.using("default").exists()
+    assert not Transaction.objects.using("default").exists()
+    # Ids come from shard_1's own range
+    assert category_id >= 10 ** 12
+
+    assert client.get(reverse("finance:transaction-list")).json()["count"] == 1
+    assert Decimal(str(client.get(reverse("finance:dashboard-list")).json()["total_income"])) == Decimal("100.00")
+
+
+def test_report_task_reads_the_users_shard(user, history):
+    tasks.send_user_summary_report(user.pk)
+    assert len(mail.outbox) == 1
+    assert "Total Income: $100.00" in mail.outbox[0].body
+    assert "Total Expenses: $30.00" in mail.outbox[0].body
+
+
+def test_move_keeps_rows_ids_and_timestamps(client, user, history):
+    before = list(
+        Transaction.objects.using("shard_1").order_by("id").values_list("id", "category_id", "amount", "created_at", "updated_at")
+    )
+
+    call_command("move_user_shard", user.pk, "shard_2", grace=0)
+
+    assert shard_for(user.pk) == "shard_2"
+    assert list(
+        Transaction.objects.using("shard_2").order_by("id").values_list("id", "category_id", "amount", "created_at", "updated_at")
+    ) == before
+    assert Category.objects.using("shard_2").filter(user_id=user.pk).count() == 2
+    assert DailyRollup.objects.using("shard_2").filter(user_id=user.pk).exists()
+    assert not Transaction.objects.using("shard_1").exists()
+    assert not Category.objects.using("shard_1").exists()
+    assert not User.objects.using("shard_1").filter(pk=user.pk).exists()
+
+    assert client.get(reverse("finance:transaction-list")).json()["count"] == 2
+    response = client.post(
+        reverse("finance:transaction-list"),
+        {"category": history[0].pk, "type": "I", "amount": "5.00"},
+        format="json",
+    )
+    assert response.status_code == 201
+    # New rows take shard_2's range, clear of the ids that moved in
+    assert response.json()["id"] >= 2 * 10 ** 12
+
+
+def test_move_refuses_the_users_own_shard(user):
+    with pytest.raises(CommandError):
+        call_command("move_user_shard", user.pk, "shard_1", grace=0)
+    with pytest.raises(CommandError):
+        call_command("move_user_shard", user.pk, "replica", grace=0)
+
+
+def test_writes_are_turned_away_while_moving(client, user, history):
+    freeze_writes(user.pk, timeout=60)
+    response = client.post(
+        reverse("finance:transaction-list"),
+        {"category": history[0].pk, "type": "I", "amount": "5.00"},
+        format="json",
+    )
+    assert response.status_code == 503
+    assert response["Retry-After"] == "30"
+    assert client.get(reverse("finance:transaction-list")).status_code == 200
+
+
+def test_move_aborts_when_a_write_lands_during_the_copy(user, history, monkeypatch):
+    copy_rows = shards.copy_rows
+
+    def copy_then_write(model, source, target, batch_size, **filters):
+        copied = copy_rows(model, source, target, batch_size, **filters)
+        if model is Transaction:
+            # A request that outlived the grace period
+            with use_shard_of(user.pk):
+                Transaction.objects.create(category=history[0], type="I", amount=Decimal("1.00"))
+        return copied
+
+    monkeypatch.setattr(shards, "copy_rows", copy_then_write)
+    with pytest.raises(CommandError, match="changed during the move"):
+        call_command("move_user_shard", user.pk, "shard_2", grace=0)
+    assert shard_for(user.pk) == "shard_1"
+    assert Transaction.objects.using("shard_1").filter(user_id=user.pk).count() == 3
+    assert not Transaction.objects.using("shard_2").exists()
+
+
+def test_move_aborts_when_the_freeze_lapses(user, history, monkeypatch):
+    monkeypatch.setattr(shards, "writes_frozen", lambda user_id: False)
+    with pytest.raises(CommandError, match="let through"):
+        call_command("move_user_shard", user.pk, "shard_2", grace=0)
+    assert shard_for(user.pk) == "shard_1"
+    assert not Category.objects.using("shard_2").exists()
+    assert Category.objects.using("shard_1").filter(user_id=user.pk).count() == 2
+
+
+def test_deleting_a_user_purges_their_shard(user, history):
+    user.delete()
+    assert not Category.objects.using("shard_1").exists()
+    assert not Transaction.objects.using("shard_1").exists()
+    assert not DailyRollup.objects.using("shard_1").exists()
+    assert not User.objects.using("shard_1").filter(pk=user.pk).exists()
+
+
+def test_rollup_commands_cover_every_shard(user, history):
+    DailyRollup.objects.using("shard_1").all().delete()
+    with pytest.raises(CommandError):
+        call_command("check_rollups")
+    call_command("check_rollups", "--database", "default")
+
+    call_command("rebuild_rollups")
+    call_command("check_rollups")
+    assert DailyRollup.objects.using("shard_1").filter(user_id=user.pk).count() == 2
+
+
+def test_a_lookup_racing_a_move_cannot_cache_the_old_shard(user, history):
+    stale_key = routers._shard_key(user.pk)
+    call_command("move_user_shard", user.pk, "shard_2", grace=0)
+    # What a lookup that started before the move would write back
+    cache.set(stale_key, "shard_1")
+    assert shard_for(user.pk) == "shard_2"
+
+
+def test_shards_need_a_shared_cache(settings):
+    settings.FINANCE_SHARDS = ["default", "shard_1"]
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    with pytest.raises(ImproperlyConfigured):
+        check_shared_cache()
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache"}}
+    check_shared_cache()
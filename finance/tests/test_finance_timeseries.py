@@ -0,0 +1,108 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Category, Transaction
+from finance.services import bucket_count, bucket_starts
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="General")
+
+
+def add(category, type_, amount, day, **kwargs):
+    return Transaction.objects.create(category=category, type=type_, amount=Decimal(amount), date=day, **kwargs)
+
+
+def as_decimals(rows):
+    return [
+        (row["period"], Decimal(str(row["income"])), Decimal(str(row["expense"])), Decimal(str(row["net"])))
+        for row in rows
+    ]
+
+
+@pytest.mark.django_db
+def test_monthly_series_fills_empty_months(auth_client, category, django_assert_max_num_queries):
+    add(category, "I", "100.00", date(2025, 1, 5))
+    add(category, "E", "30.00", date(2025, 1, 20))
+    add(category, "E", "10.00", date(2025, 3, 2))
+
+    url = reverse("finance:transaction-timeseries")
+    with django_assert_max_num_queries(1):
+        res = auth_client.get(url, {"bucket": "month", "date_after": "2025-01-01", "date_before": "2025-04-30"})
+    assert res.status_code == 200, res.content
+    assert as_decimals(res.json()["results"]) == [
+        ("2025-01-01", Decimal("100.00"), Decimal("30.00"), Decimal("70.00")),
+        ("2025-02-01", Decimal("0"), Decimal("0"), Decimal("0")),
+        ("2025-03-01", Decimal("0"), Decimal("10.00"), Decimal("-10.00")),
+        ("2025-04-01", Decimal("0"), Decimal("0"), Decimal("0")),
+    ]
+
+
+@pytest.mark.django_db
+def test_weekly_series_defaults_to_data_range_and_honours_filters(auth_client, category, user):
+    other = Category.objects.create(user=user, name="Other")
+    add(category, "E", "5.00", date(2025, 1, 1))    # Wednesday → week of 2024-12-30
+    add(category, "E", "7.00", date(2025, 1, 15))
+    add(other, "E", "99.00", date(2025, 1, 8))
+
+    res = auth_client.get(reverse("finance:transaction-timeseries"), {"bucket": "week", "category": category.pk})
+    assert res.status_code == 200, res.content
+    body = res.json()
+    assert (body["start"], body["end"]) == ("2025-01-01", "2025-01-15")
+    assert [row["period"] for row in body["results"]] == ["2024-12-30", "2025-01-06", "2025-01-13"]
+    assert [Decimal(str(row["expense"])) for row in body["results"]] == [Decimal("5.00"), 0, Decimal("7.00")]
+
+
+@pytest.mark.django_db
+def test_series_is_limited_to_max_buckets(auth_client, category, settings):
+    settings.FINANCE_TIMESERIES_MAX_BUCKETS = 366
+    url = reverse("finance:transaction-timeseries")
+    res = auth_client.get(url, {"bucket": "day", "date_after": "2015-01-01", "date_before": "2024-12-31"})
+    assert res.status_code == 400
+    assert "366" in res.json()["detail"]
+
+    res = auth_client.get(url, {"bucket": "month", "date_after": "2015-01-01", "date_before": "2024-12-31"})
+    assert res.status_code == 200
+    assert len(res.json()["results"]) == 120
+
+
+@pytest.mark.django_db
+def test_series_rejects_unknown_bucket_and_bad_dates(auth_client):
+    url = reverse("finance:transaction-timeseries")
+    assert auth_client.get(url, {"bucket": "year"}).status_code == 400
+    assert auth_client.get(url, {"date_after": "not-a-date"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_series_without_transactions_is_empty(auth_client):
+    res = auth_client.get(reverse("finance:transaction-timeseries"))
+    assert res.status_code == 200
+    assert res.json()["results"] == []
+
+
+@pytest.mark.parametrize("bucket, start, end", [
+    ("day", date(2024, 2, 27), date(2024, 3, 2)),
+    ("week", date(2024, 12, 31), date(2025, 2, 3)),
+    ("month", date(2023, 11, 30), date(2025, 1, 1)),
+])
+def test_bucket_count_matches_bucket_starts(bucket, start, end):
+    assert bucket_count(bucket, start, end) == len(bucket_starts(bucket, start, end))
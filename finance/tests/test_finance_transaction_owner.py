@@ -0,0 +1,119 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.tasks import send_user_summary_report
+from finance.models import Category, Transaction
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="alice", email="alice@example.com", password="password")
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="bob", email="bob@example.com", password="password")
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def category(user):
+    return Category.objects.create(user=user, name="Groceries")
+
+
+def make_transaction(category, **kwargs):
+    kwargs.setdefault("type", Transaction.TransactionType.EXPENSE)
+    kwargs.setdefault("amount", Decimal("10.00"))
+    kwargs.setdefault("date", date.today())
+    return Transaction.objects.create(category=category, **kwargs)
+
+
+def transaction_queries(queries):
+    return [q["sql"] for q in queries if '"finance_transaction"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_user_copied_from_category_on_write(user, other_user, category):
+    txn = make_transaction(category)
+    assert txn.user_id == user.pk
+
+    txn.category = Category.objects.create(user=other_user, name="Rent")
+    txn.save(update_fields=["category"])
+    txn.refresh_from_db()
+    assert txn.user_id == other_user.pk
+
+
+@pytest.mark.django_db
+def test_api_create_sets_user(auth_client, user, category):
+    res = auth_client.post(
+        reverse("finance:transaction-list"),
+        {"type": "E", "amount": "12.50", "category": category.pk},
+    )
+    assert res.status_code == 201, res.content
+    assert Transaction.objects.get(pk=res.json()["id"]).user_id == user.pk
+
+
+@pytest.mark.django_db
+def test_list_filters_on_user_column_without_category_join(auth_client, category):
+    make_transaction(category)
+    with CaptureQueriesContext(connection) as ctx:
+        res = auth_client.get(reverse("finance:transaction-list"))
+    assert res.status_code == 200
+    count_sql = [sql for sql in transaction_queries(ctx.captured_queries) if "COUNT(" in sql]
+    assert count_sql and all("JOIN" not in sql for sql in count_sql)
+    assert all('"finance_transaction"."user_id" =' in sql for sql in transaction_queries(ctx.captured_queries))
+
+
+@pytest.mark.django_db
+def test_by_category_groups_without_join(auth_client, category):
+    make_transaction(category, amount=Decimal("4.00"))
+    make_transaction(category, amount=Decimal("6.00"))
+    with CaptureQueriesContext(connection) as ctx:
+        res = auth_client.get(reverse("finance:transaction-by-category"))
+    assert res.json() == [
+        {"category": category.pk, "category__name": "Groceries", "total_amount": 10.0, "txn_count": 2}
+    ]
+    assert all("JOIN" not in sql for sql in transaction_queries(ctx.captured_queries))
+
+
+@pytest.mark.django_db
+def test_report_task_filters_on_user_column(user, category, mailoutbox):
+    make_transaction(category)
+    with CaptureQueriesContext(connection) as ctx:
+        send_user_summary_report(user.pk)
+    assert len(mailoutbox) == 1
+    for sql in transaction_queries(ctx.captured_queries):
+        assert '"finance_transaction"."user_id" =' in sql
+        assert '"finance_category"."user_id" =' not in sql
+
+
+@pytest.mark.django_db
+def test_is_owner_does_not_load_owner(auth_client, category, django_assert_num_queries):
+    txn = make_transaction(category)
+    # one query for the transaction (with its category), none for the owner
+    with django_assert_num_queries(1):
+        res = auth_client.get(reverse("finance:transaction-detail", args=[txn.pk]))
+    assert res.status_code == 200
+
+
+@pytest.mark.django_db
+def test_other_users_transaction_is_hidden(category, other_user):
+    txn = make_transaction(category)
+    client = APIClient()
+    client.force_authenticate(other_user)
+    res = client.get(reverse("finance:transaction-detail", args=[txn.pk]))
+    assert res.status_code == 404
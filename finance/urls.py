@@ -2,7 +2,8 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from .views import CategoryViewSet, TransactionViewSet, DashboardViewSet
+from . import async_views
+from .views import CategoryViewSet, TransactionViewSet, DashboardViewSet, ImportJobViewSet
 
 app_name = "finance"
 
@@ -10,8 +11,14 @@ router = routers.DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"transactions", TransactionViewSet, basename="transaction")
 router.register(r"dashboard", DashboardViewSet, basename="dashboard")
+router.register(r"imports", ImportJobViewSet, basename="import")
 
 urlpatterns = [
-    # /api/categories/, /api/transactions/, /api/dashboard/
+    # /api/categories/, /api/transactions/, /api/dashboard/, /api/imports/
     path("", include(router.urls)),
+
+    # Async (ASGI) read endpoints: /api/async/...
+    path("async/dashboard/", async_views.dashboard, name="async-dashboard"),
+    path("async/dashboard/overview/", async_views.overview, name="async-dashboard-overview"),
+    path("async/transactions/by-category/", async_views.by_category, name="async-transaction-by-category"),
 ]
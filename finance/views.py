@@ -2,20 +2,45 @@
 
 from rest_framework import viewsets, filters, mixins, status
 from django_filters.rest_framework import DjangoFilterBackend               
+from django_filters.utils import translate_validation
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
-from django.db.models import Sum, Count
-from .models import Category, Transaction
+from django.conf import settings
+from django.db.models import Min, Max, OuterRef, Subquery
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.db import transaction
+from .models import ArchivedTransaction, Category, Transaction, ImportJob
 from .serializers import (
     CategorySerializer,
+    CategoryMergeSerializer,
     TransactionSerializer,
+    TransactionReadSerializer,
     DashboardSummarySerializer,
+    ImportJobSerializer,
 )
+from .tasks import process_import_job
 from .permissions import IsOwner
-from .services import financial_summary
+from .services import (
+    financial_summary,
+    category_totals,
+    bulk_create_transactions,
+    merge_categories,
+    bucket_count,
+    running_balances,
+    bucket_starts,
+    transaction_timeseries,
+    TIMESERIES_BUCKETS,
+)
+from .cache import cached_response, cache_stats
 from .filters import TransactionFilter
+from .pagination import KeysetPagination
+from core.budgets import QueryBudget
+from .exports import FORMATS as EXPORT_FORMATS
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -29,10 +54,25 @@ class DashboardViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = DashboardSummarySerializer   # just for schema
+    # Served from a read replica when there is one (core.routers)
+    replica_actions = ('list',)
+    query_budgets = {
+        'list': QueryBudget(queries=1, p95_ms=50),
+        'cache_stats': QueryBudget(queries=0, p95_ms=25),
+    }
 
     def list(self, request, *args, **kwargs):
-        data = financial_summary(user=request.user)          # ← single call
+        data = cached_response(
+            "dashboard", request, lambda: financial_summary(user=request.user)
+        )
         return Response(data)
+
+    @action(detail=False, url_path='cache-stats', permission_classes=[IsAuthenticated, IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the shared response cache.
+        """
+        return Response(cache_stats())
     
 
 
@@ -59,6 +99,15 @@ class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class   = CategorySerializer
     permission_classes = [IsAuthenticated, IsOwner]
     pagination_class   = None  # usually small enough to not paginate
+    query_budgets = {
+        'list': QueryBudget(queries=1, p95_ms=50),
+        'create': QueryBudget(queries=2, p95_ms=75),
+        'retrieve': QueryBudget(queries=1, p95_ms=50),
+        'update': QueryBudget(queries=3, p95_ms=75),
+        'partial_update': QueryBudget(queries=3, p95_ms=75),
+        'destroy': QueryBudget(queries=4, p95_ms=75),
+        'merge': QueryBudget(queries=12, p95_ms=100),
+    }
 
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user)
@@ -134,10 +183,38 @@ class CategoryViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Merge Categories",
+        operation_description=(
+            "Move every transaction of the source categories into this one, then delete "
+            "the sources. All or nothing; rows are moved FINANCE_MERGE_BATCH_SIZE at a time."
+        ),
+        request_body=CategoryMergeSerializer,
+        responses={200: "Target id, merged source ids and transactions moved", 400: "Validation errors"},
+    )
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        target = self.get_object()
+        serializer = CategoryMergeSerializer(
+            data=request.data, context={**self.get_serializer_context(), 'target': target}
+        )
+        serializer.is_valid(raise_exception=True)
+        sources = serializer.validated_data['sources']
+        moved = merge_categories(
+            target=target, source_ids=sources, batch_size=settings.FINANCE_MERGE_BATCH_SIZE
+        )
+        return Response({"target": target.pk, "merged": sources, "moved": moved})
+
+
 class TransactionViewSet(viewsets.ModelViewSet):
     """
     CRUD transactions with pagination and optional filtering
     by date or category:contentReference[oaicite:2]{index=2}.
+
+    ``?include_archived=true`` on list, detail, export and timeseries also
+    serves transactions moved to cold storage (finance.archive); the list
+    then takes page numbers only.
     """
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated, IsOwner]
@@ -145,41 +222,296 @@ class TransactionViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = TransactionFilter
     ordering_fields = ['date', 'amount', 'type']
+    # Served from a read replica when there is one (core.routers)
+    replica_actions = ('list', 'by_category')
+    query_budgets = {
+        'list': QueryBudget(queries=2, p95_ms=75),
+        'create': QueryBudget(queries=5, p95_ms=75),
+        'retrieve': QueryBudget(queries=1, p95_ms=50),
+        'update': QueryBudget(queries=7, p95_ms=100),
+        'partial_update': QueryBudget(queries=6, p95_ms=75),
+        'destroy': QueryBudget(queries=3, p95_ms=75),
+        'by_category': QueryBudget(queries=2, p95_ms=50),
+        'timeseries': QueryBudget(queries=2, p95_ms=100),
+        'bulk_create': QueryBudget(queries=5, p95_ms=150),
+        'export': QueryBudget(queries=1, p95_ms=150),
+    }
+
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; ``?pagination=cursor`` (or any
+        request carrying a ``cursor``) switches to keyset pagination, which
+        skips the COUNT(*) and OFFSET for clients walking the full history.
+        """
+        if not hasattr(self, '_paginator'):
+            params = getattr(self.request, 'query_params', {})
+            if params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     ## Custom actions for aggregating data, implemented before using DjangoFilterBackend
     @action(detail=False, url_path='by-category')
     def by_category(self, request):
-        qs = Transaction.objects.filter(category__user=request.user)
-        grouped = (
-            qs
-            .values('category', 'category__name')
-            .annotate(total_amount=Sum('amount'), txn_count=Count('id'))
-            .order_by('category__name')
+        return Response(cached_response("by-category", request, lambda: category_totals(user=request.user)))
+
+    @swagger_auto_schema(
+        operation_summary="Transaction time series",
+        operation_description=(
+            "Income, expense and net per day, week or month for the transactions matching "
+            "the usual filters, with empty periods included as zeros. Without date_after / "
+            "date_before the range spans the matching transactions; include_archived=true "
+            "counts archived ones as well. At most "
+            "FINANCE_TIMESERIES_MAX_BUCKETS periods are returned per request."
+        ),
+        manual_parameters=[
+            openapi.Parameter('bucket', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(TIMESERIES_BUCKETS)),
+        ],
+    )
+    @action(detail=False, url_path='timeseries', pagination_class=None)
+    def timeseries(self, request):
+        bucket = request.query_params.get('bucket', 'month')
+        if bucket not in TIMESERIES_BUCKETS:
+            return Response(
+                {"detail": f"Unsupported bucket '{bucket}'. Choose one of: {', '.join(TIMESERIES_BUCKETS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        filterset = DjangoFilterBackend().get_filterset(request, self.get_queryset(), self)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        querysets = [filterset.qs]
+        if self.includes_archived:
+            querysets.append(self._filtered(self.get_archived_queryset()))
+
+        def compute():
+            start = filterset.form.cleaned_data.get('date_after')
+            end = filterset.form.cleaned_data.get('date_before')
+            if start is None or end is None:
+                bounds = [qs.order_by().aggregate(first=Min('date'), last=Max('date')) for qs in querysets]
+                firsts = [b['first'] for b in bounds if b['first'] is not None]
+                lasts = [b['last'] for b in bounds if b['last'] is not None]
+                start = start or min(firsts, default=None)
+                end = end or max(lasts, default=None)
+            if start is None or end is None or start > end:
+                return {"bucket": bucket, "start": start, "end": end, "results": []}
+
+            count = bucket_count(bucket, start, end)
+            max_buckets = settings.FINANCE_TIMESERIES_MAX_BUCKETS
+            if count > max_buckets:
+                raise ValidationError({
+                    "detail": f"The range covers {count} periods of one {bucket}; at most "
+                              f"{max_buckets} are allowed. Narrow date_after / date_before or use a coarser bucket."
+                })
+            return {
+                "bucket": bucket,
+                "start": start,
+                "end": end,
+                "results": transaction_timeseries(
+                    *querysets, bucket=bucket, periods=bucket_starts(bucket, start, end)
+                ),
+            }
+
+        return Response(cached_response("timeseries", request, compute))
+
+    @swagger_auto_schema(
+        operation_summary="Bulk create transactions",
+        operation_description=(
+            "Create up to FINANCE_BULK_MAX_ITEMS (default 5000) transactions in one request. "
+            "The body is a list of transaction objects (or {'transactions': [...]}). "
+            "Invalid items are reported by index and do not stop the valid ones from being saved. "
+            "Rows are inserted in batches of FINANCE_BULK_CHUNK_SIZE, overridable with ?chunk_size=."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={201: "Created ids and per-item errors", 400: "Nothing valid to create"},
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        items = request.data.get('transactions') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": "Expected a non-empty list of transactions."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_items = settings.FINANCE_BULK_MAX_ITEMS
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"At most {max_items} transactions can be created per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        chunk_size = settings.FINANCE_BULK_CHUNK_SIZE
+        try:
+            chunk_size = max(1, min(int(request.query_params.get('chunk_size', chunk_size)), max_items))
+        except ValueError:
+            pass
+
+        created_ids, errors = bulk_create_transactions(user=request.user, items=items, chunk_size=chunk_size)
+        return Response(
+            {"created": len(created_ids), "ids": created_ids, "errors": errors},
+            status=status.HTTP_201_CREATED if created_ids else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @swagger_auto_schema(
+        operation_summary="Export transactions",
+        operation_description=(
+            "Stream every transaction matching the usual filters as CSV (default) "
+            "or newline-delimited JSON (?output=ndjson); include_archived=true adds "
+            "archived ones."
+        ),
+        manual_parameters=[
+            openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ],
+    )
+    @action(detail=False, url_path='export', pagination_class=None)
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Unsupported output '{output}'. Choose one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        lines, content_type, extension = EXPORT_FORMATS[output]
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            lines(queryset, chunk_size=settings.FINANCE_EXPORT_CHUNK_SIZE), content_type=content_type
         )
-        return Response(grouped)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{extension}"'
+        return response
 
     def get_queryset(self):
+        return self._scoped(Transaction.objects.all())
+
+    def get_archived_queryset(self):
+        """
+        The user's archived transactions (finance.archive), as read rows.
+        """
+        return self._scoped(ArchivedTransaction.objects.all())
+
+    def _scoped(self, queryset):
         category_id = self.request.query_params.get('category_id')
         
-        # Start with a filtered queryset based on the logged-in user's categories
-        queryset = Transaction.objects.filter(category__user=self.request.user)
+        # Owner is denormalised onto the transaction, so this needs no join
+        queryset = queryset.filter(user=self.request.user)
         
         if category_id:
             # If category_id is provided, filter by that category as well
             queryset = queryset.filter(category__id=category_id)
+
+        if self.is_fast_read:
+            # Plain dicts for TransactionReadSerializer; no model instances.
+            # The name is a scalar subquery rather than a join so that the
+            # paginator's COUNT(*) (which drops unused annotations) stays
+            # on the transactions table alone.
+            category_name = Category.objects.filter(pk=OuterRef('category')).values('name')[:1]
+            return queryset.annotate(category_name=Subquery(category_name)).values(
+                *TransactionReadSerializer.values_fields
+            )
         
         # Eagerly load related categories to avoid N+1 queries
         return queryset.select_related('category')
-    
-    
-    ## Override get_serializer_context to pre-fetch user categories and pass them to the serializer
+
+    @property
+    def includes_archived(self):
+        value = getattr(self.request, 'query_params', {}).get('include_archived', '')
+        return self.action in ('list', 'retrieve', 'export', 'timeseries') and value.lower() in ('1', 'true', 'yes')
+
+    def filter_queryset(self, queryset):
+        if not (self.includes_archived and self.action in ('list', 'export')):
+            return super().filter_queryset(queryset)
+        if self.action == 'list' and isinstance(self.paginator, KeysetPagination):
+            raise ValidationError({
+                "detail": "include_archived cannot be combined with cursor pagination; use page numbers."
+            })
+
+        # The same filters on both tables, then UNION ALL; a combined query
+        # can only be ordered by its column names
+        live, archived = (
+            self._filtered(queryset),
+            self._filtered(self.get_archived_queryset()),
+        )
+        ordering = filters.OrderingFilter().get_ordering(self.request, queryset, self)
+        if not ordering:
+            ordering = ['-search_rank'] if 'search_rank' in live.query.annotations else []
+            ordering += ['-date']
+        tiebreaker = '-id' if ordering[-1].startswith('-') else 'id'
+        return live.order_by().union(archived.order_by(), all=True).order_by(*ordering, tiebreaker)
+
+    def _filtered(self, queryset):
+        # TransactionFilter directly: DjangoFilterBackend only accepts
+        # querysets of its Meta.model
+        filterset = self.filterset_class(self.request.query_params, queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.qs
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if not self.includes_archived:
+                raise
+        row = get_object_or_404(self.get_archived_queryset(), pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        self.check_object_permissions(self.request, row)
+        return row
+
+    @property
+    def is_fast_read(self):
+        return self.action in ('list', 'retrieve') and not getattr(self, 'swagger_fake_view', False)
+
+    @property
+    def wants_running_balance(self):
+        value = getattr(self.request, 'query_params', {}).get('running_balance', '')
+        return self.action in ('list', 'retrieve') and value.lower() in ('1', 'true', 'yes')
+
+    def get_serializer(self, *args, **kwargs):
+        if not (args and self.is_fast_read):
+            # Writes (and the schema) go through the full TransactionSerializer
+            return super().get_serializer(*args, **kwargs)
+
+        rows = args[0] if kwargs.get('many') else [args[0]]
+        if self.wants_running_balance:
+            # ``?running_balance=true``: attach the balance after each served row
+            balances = running_balances(
+                user=self.request.user, keys=[(row['id'], row['date']) for row in rows]
+            )
+            for row in rows:
+                row['running_balance'] = balances.get(row['id'])
+        return TransactionReadSerializer(
+            args[0], many=kwargs.get('many', False), context=self.get_serializer_context()
+        )
+
     def get_serializer_context(self):
+        # Category ids are resolved against the request's category map
+        # (finance.categories), loaded on first use
         context = super().get_serializer_context()
-        # Only pre-fetch categories for write operations (POST/PUT/PATCH)
-        if self.request.method in ['POST', 'PUT', 'PATCH']:
-            user_categories = Category.objects.filter(user=self.request.user).only('id', 'name')
-            context['user_categories'] = user_categories
+        context['running_balance'] = self.wants_running_balance
         return context
 
 
+class ImportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    POST /imports/        → upload a CSV/OFX statement (multipart ``file``)
+    GET  /imports/{id}/   → status, progress and row-level errors
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated, IsOwner]
+    parser_classes = [MultiPartParser, FormParser]
+    pagination_class = StandardResultsSetPagination
+    query_budgets = {
+        'list': QueryBudget(queries=2, p95_ms=50),
+        'create': QueryBudget(queries=1, p95_ms=75),
+        'retrieve': QueryBudget(queries=1, p95_ms=50),
+    }
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        job = serializer.save()
+        transaction.on_commit(lambda: process_import_job.delay(job.pk, job.user_id), using=job._state.db)
 
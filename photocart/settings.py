@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     'rest_framework_simplejwt.token_blacklist',
     "django_filters",
     "debug_toolbar",
@@ -67,13 +68,17 @@ CORS_ALLOW_HEADERS = []
 CORS_ALLOW_METHODS= []
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',  # ← for file uploads
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication', 
+        'core.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
 
     ],
@@ -101,6 +106,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ShardMiddleware",
+    "core.middleware.ReplicaMiddleware",
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -141,6 +148,43 @@ DATABASES = {
     }
 }
 
+# Read replicas (core/routers.py): DATABASE_REPLICA_HOSTS=host1,host2 adds an
+# alias per host ('replica_1', ...) with the primary's name and credentials.
+# The API reads that opt in and the report tasks go to a random one; a user
+# stays on the primary for REPLICA_PIN_SECONDS after each of their writes.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+# User shards (core/routers.py, finance/shards.py): FINANCE_SHARD_HOSTS=host1,host2
+# adds an alias per host ('shard_1', ...) holding the finance data of the
+# users placed there; 'default' keeps everything else (and its own users'
+# finance data). Each shard gives new rows ids from its own range of
+# FINANCE_SHARD_ID_SPACE so that users can move between shards.
+FINANCE_SHARDS = []
+for number, host in enumerate(filter(None, os.environ.get('FINANCE_SHARD_HOSTS', '').split(',')), 1):
+    DATABASES[f'shard_{number}'] = {**DATABASES['default'], 'HOST': host.strip()}
+    FINANCE_SHARDS.append(f'shard_{number}')
+if FINANCE_SHARDS:
+    FINANCE_SHARDS.insert(0, 'default')
+FINANCE_SHARD_ID_SPACE = 10 ** 12
+# How long move_user_shard waits, with the user's writes turned away, for
+# their requests in flight to finish before it copies their data
+FINANCE_SHARD_MOVE_GRACE_SECONDS = int(os.environ.get('FINANCE_SHARD_MOVE_GRACE_SECONDS', 5))
+
+# Separate local databases standing in for a replica and two shards in the
+# test suite (core/tests/test_core_routers.py, finance/tests/test_finance_shards.py);
+# nothing is routed to them unless listed in DATABASE_REPLICAS / FINANCE_SHARDS
+for alias in ('replica', 'shard_1', 'shard_2'):
+    DATABASES.setdefault(alias, {
+        **DATABASES['default'],
+        'TEST': {'NAME': f"test_{DATABASES['default']['NAME']}_{alias}"},
+    })
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter', 'core.routers.ShardRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 15))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -177,6 +221,10 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded files (statement imports)
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -189,11 +237,66 @@ import socket
 hostname, _, ips = socket.gethostbyname_ex(socket.gethostname())
 INTERNAL_IPS = [ip[: ip.rfind(".")] + ".1" for ip in ips] + ["127.0.0.1"]
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Shared Redis cache so every worker sees the same entries; falls back to a
+# per-process cache when no Redis URL is configured (local runs, tests).
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Longest a cached JWT user (core.authentication) can miss a change made
+# without Model.save(), e.g. QuerySet.update(); saves invalidate it at once.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 5 * 60))
+
+# Where rotated / logged-out refresh tokens are blacklisted (core.tokens):
+# 'cache' needs the shared Redis cache, 'database' is simplejwt's tables,
+# purged of expired rows TOKEN_PURGE_BATCH_SIZE at a time by a daily task.
+TOKEN_BLACKLIST_BACKEND = os.environ.get('TOKEN_BLACKLIST_BACKEND', 'cache' if REDIS_CACHE_URL else 'database')
+TOKEN_PURGE_BATCH_SIZE = int(os.environ.get('TOKEN_PURGE_BATCH_SIZE', 10000))
+
+# Upper bound on how long a cached dashboard / by-category payload is kept.
+# Entries are invalidated by version bumps, so this only limits memory.
+FINANCE_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('FINANCE_RESPONSE_CACHE_TIMEOUT', 60 * 60))
+
+# POST /api/transactions/bulk/: largest accepted payload and rows per INSERT batch
+FINANCE_BULK_MAX_ITEMS = int(os.environ.get('FINANCE_BULK_MAX_ITEMS', 5000))
+FINANCE_BULK_CHUNK_SIZE = int(os.environ.get('FINANCE_BULK_CHUNK_SIZE', 500))
+
+# finance_transaction partitions (finance/partitions.py): one per 'month' or
+# 'year' of ``date``, created this many intervals ahead by a daily task
+FINANCE_PARTITION_INTERVAL = os.environ.get('FINANCE_PARTITION_INTERVAL', 'month')
+FINANCE_PARTITIONS_AHEAD = int(os.environ.get('FINANCE_PARTITIONS_AHEAD', 3))
+
+# Cold storage (finance/archive.py): transactions dated before the first of
+# the month this many months back are moved to the archive table by a weekly
+# task, this many rows per database transaction
+FINANCE_ARCHIVE_AFTER_MONTHS = int(os.environ.get('FINANCE_ARCHIVE_AFTER_MONTHS', 24))
+FINANCE_ARCHIVE_BATCH_SIZE = int(os.environ.get('FINANCE_ARCHIVE_BATCH_SIZE', 5000))
+
+# POST /api/categories/{id}/merge/: transactions moved per UPDATE
+FINANCE_MERGE_BATCH_SIZE = int(os.environ.get('FINANCE_MERGE_BATCH_SIZE', 10000))
+
+# Rows fetched per round trip of the server-side cursor behind /api/transactions/export/
+FINANCE_EXPORT_CHUNK_SIZE = int(os.environ.get('FINANCE_EXPORT_CHUNK_SIZE', 2000))
+
+# GET /api/transactions/timeseries/: most periods (days, weeks or months) one request may span
+FINANCE_TIMESERIES_MAX_BUCKETS = int(os.environ.get('FINANCE_TIMESERIES_MAX_BUCKETS', 1000))
+
+# Statement imports (POST /api/imports/, processed by finance.tasks.process_import_job)
+FINANCE_IMPORT_CHUNK_SIZE = int(os.environ.get('FINANCE_IMPORT_CHUNK_SIZE', 1000))
+FINANCE_IMPORT_MAX_UPLOAD_BYTES = int(os.environ.get('FINANCE_IMPORT_MAX_UPLOAD_BYTES', 200 * 1024 * 1024))
+FINANCE_IMPORT_MAX_ERRORS = 1000           # row errors kept on the job; the count is always exact
+FINANCE_IMPORT_DEFAULT_CATEGORY = 'Uncategorized'
 
 # Cache user for 15 minutes (adjust as needed)
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
@@ -208,6 +311,9 @@ CELERY_TIMEZONE = 'UTC'
 
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Users per send_summary_reports_chunk task in the report fan-out
+REPORT_CHUNK_SIZE = int(os.environ.get('REPORT_CHUNK_SIZE', 500))
+
 
 
 USE_TZ = True
@@ -222,6 +328,8 @@ EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
 EMAIL_USE_SSL = os.environ.get('EMAIL_USE_SSL', 'False').lower() == 'true'
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
 SERVER_EMAIL = DEFAULT_FROM_EMAIL # Important for error reporting emails
+# Messages sent over one connection by core.mail.send_batched before it reconnects
+EMAIL_MESSAGES_PER_CONNECTION = int(os.environ.get('EMAIL_MESSAGES_PER_CONNECTION', 100))
 
 
 
@@ -236,6 +344,27 @@ CELERY_BEAT_SCHEDULE = {
         'options': {'expires': 3600},
     },
 
+    # every night @ 03:30: drop expired outstanding / blacklisted tokens
+    'purge-expired-tokens': {
+        'task': 'core.tasks.purge_expired_tokens',
+        'schedule': crontab(minute=30, hour=3),
+        'options': {'expires': 3600},
+    },
+
+    # every night @ 03:00: finance_transaction partitions for the coming months
+    'create-transaction-partitions': {
+        'task': 'core.tasks.create_transaction_partitions',
+        'schedule': crontab(minute=0, hour=3),
+        'options': {'expires': 3600},
+    },
+
+    # once a week, Sunday @ 04:00: move old transactions to the archive
+    'archive-old-transactions': {
+        'task': 'core.tasks.archive_old_transactions',
+        'schedule': crontab(minute=0, hour=4, day_of_week='sun'),
+        'options': {'expires': 6 * 3600},
+    },
+
     # # once a month, 1st @ 09:00
     # 'enqueue-monthly-reports': {
     #     'task': 'core.tasks.enqueue_monthly_reports',